@@ -0,0 +1,103 @@
+"""
+Check and time BusinessCalendar against the day-by-day loop it replaced
+
+Random ranges (up to `--max-days` long) are counted three ways and must
+agree: the original loop (extended to skip holidays), business_days()
+and the NumPy business_days_many(). No database needed.
+
+    python -m benchmarks.calendar_bench [--ranges 20000] [--max-days 400] [--holidays 200]
+
+Exits with status 1 if any count differs.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from leave_management_ai.business_calendar import BusinessCalendar
+
+
+def reference_business_days(start_date, end_date, holidays, include_weekends=False):
+    """DateParser.calculate_business_days as it was, skipping holidays too"""
+    days = 0
+    current = start_date
+    while current <= end_date:
+        if (include_weekends or current.weekday() < 5) and current not in holidays:
+            days += 1
+        current += timedelta(days=1)
+    return days
+
+
+def random_holidays(rng, count, first_year=2024, years=4):
+    """`count` distinct random dates over `years` years, named by index"""
+    start = date(first_year, 1, 1).toordinal()
+    ordinals = rng.sample(range(start, start + 365 * years), count)
+    return {date.fromordinal(ordinal): f"Holiday {index}" for index, ordinal in enumerate(ordinals)}
+
+
+def random_ranges(rng, count, max_days, first_year=2024, years=4):
+    """(starts, ends) of `count` ranges, some of them empty (end before start)"""
+    start = date(first_year, 1, 1).toordinal()
+    starts = [date.fromordinal(rng.randrange(start, start + 365 * years)) for _ in range(count)]
+    ends = [first + timedelta(days=rng.randint(-2, max_days)) for first in starts]
+    return starts, ends
+
+
+def timed(function):
+    """(result, seconds) of one call"""
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def main():
+    """Compare the three counts and print their timings; returns the exit status"""
+    parser = argparse.ArgumentParser(description="BusinessCalendar check and benchmark")
+    parser.add_argument('--ranges', type=int, default=20000)
+    parser.add_argument('--max-days', type=int, default=400, help='longest range, in days')
+    parser.add_argument('--holidays', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    holidays = random_holidays(rng, args.holidays)
+    calendar = BusinessCalendar(holidays)
+    starts, ends = random_ranges(rng, args.ranges, args.max_days)
+    (start_array, end_array), convert_seconds = timed(lambda: (
+        np.array(starts, dtype='datetime64[D]'), np.array(ends, dtype='datetime64[D]')
+    ))
+
+    mismatches = 0
+    print(f"{args.ranges} ranges of up to {args.max_days} days, {args.holidays} holidays\n")
+    print(f"{'weekends':<10} {'loop ms':>9} {'bisect ms':>10} {'bulk ms':>9}")
+    for include_weekends in (False, True):
+        expected, loop_seconds = timed(lambda: [
+            reference_business_days(first, last, holidays, include_weekends) for first, last in zip(starts, ends)
+        ])
+        scalar, scalar_seconds = timed(lambda: [
+            calendar.business_days(first, last, include_weekends) for first, last in zip(starts, ends)
+        ])
+        bulk, bulk_seconds = timed(lambda: calendar.business_days_many(start_array, end_array, include_weekends))
+
+        for first, last, want, got, got_bulk in zip(starts, ends, expected, scalar, bulk):
+            if not want == got == got_bulk:
+                mismatches += 1
+                if mismatches <= 10:
+                    print(f"✗ {first} → {last} (weekends {include_weekends}): "
+                          f"loop {want}, business_days {got}, business_days_many {got_bulk}")
+        print(f"{'counted' if include_weekends else 'skipped':<10} {loop_seconds * 1000:>9.1f} "
+              f"{scalar_seconds * 1000:>10.1f} {bulk_seconds * 1000:>9.1f}")
+    print(f"(bulk takes datetime64[D] arrays; converting the date lists took {convert_seconds * 1000:.1f} ms)")
+
+    if mismatches:
+        print(f"\n✗ {mismatches} counts differ from the reference loop")
+        return 1
+    print(f"\n✓ All {2 * args.ranges} counts match the reference loop")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Fixed utterance corpus for the NLP benchmarks
+
+Covers every intent the classifier knows, every date format the date
+parser handles, and messages that are long or built to hit slow paths
+(e.g. no parsable date, so parse_date_range falls back to trying every
+short phrase with fuzzy dateutil parsing). Never reorder or edit entries
+in place: baselines are only comparable on the same corpus. Add new
+entries at the end and save a new baseline.
+"""
+from datetime import date
+
+
+# DateParser.today is pinned to this date while benchmarking, so relative
+# dates ("next Monday") resolve the same way on every run
+REFERENCE_DATE = date(2026, 1, 12)    # a Monday
+
+_FILLER = (
+    "I have been thinking about my workload this quarter and I discussed it with my manager "
+    "yesterday afternoon after the planning meeting, and we agreed that it makes sense "
+)
+
+_NO_DATES = (
+    "please could you help me understand how the process works for my team because "
+    "several people asked me about it during the weekly sync and I was not sure what to say "
+)
+
+# category: what the entry exercises; intent: the intent a reader would expect
+CORPUS = [
+    # apply_leave
+    {'category': 'apply', 'intent': 'apply_leave', 'text': "I need leave tomorrow"},
+    {'category': 'apply', 'intent': 'apply_leave', 'text': "I want to apply for sick leave on 20th Jan"},
+    {'category': 'apply', 'intent': 'apply_leave', 'text': "apply casual leave from 13-01-2026 to 15-01-2026"},
+    {'category': 'apply', 'intent': 'apply_leave', 'text': "I will be on leave from 3rd Feb to 6th Feb 2026"},
+    {'category': 'apply', 'intent': 'apply_leave', 'text': "I need leave on Monday and Tuesday"},
+    {'category': 'apply', 'intent': 'apply_leave', 'text': "book vacation leave from next monday to next friday"},
+    {'category': 'apply', 'intent': 'apply_leave', 'text': "I will not be available on 25/01/26"},
+    {'category': 'apply', 'intent': 'apply_leave', 'text': "I'll be off on friday"},
+    {'category': 'apply', 'intent': 'apply_leave', 'text': "request leave for 20th and 21st"},
+    {'category': 'apply', 'intent': 'apply_leave', 'text': "medical leave today, feeling unwell"},
+    {'category': 'apply', 'intent': 'apply_leave', 'text': "I will be away from this wednesday till this friday"},
+    {'category': 'apply', 'intent': 'apply_leave', 'text': "need time off March 5"},
+
+    # check_eligibility
+    {'category': 'eligibility', 'intent': 'check_eligibility', 'text': "Can I take leave tomorrow?"},
+    {'category': 'eligibility', 'intent': 'check_eligibility', 'text': "could I get 3 days off next week"},
+    {'category': 'eligibility', 'intent': 'check_eligibility', 'text': "am I eligible for leave on 14th Feb"},
+    {'category': 'eligibility', 'intent': 'check_eligibility', 'text': "is it possible to take leave from 2nd Mar to 4th Mar"},
+
+    # cancel_approved_leave
+    {'category': 'cancel', 'intent': 'cancel_approved_leave', 'text': "cancel my leave on 20th"},
+    {'category': 'cancel', 'intent': 'cancel_approved_leave', 'text': "cancel sick leave from 13-01-2026 to 14-01-2026"},
+    {'category': 'cancel', 'intent': 'cancel_approved_leave', 'text': "withdraw my leave for next monday"},
+    {'category': 'cancel', 'intent': 'cancel_approved_leave', 'text': "please remove my leave on thursday and friday"},
+
+    # confirm_leave / cancel_request
+    {'category': 'confirm', 'intent': 'confirm_leave', 'text': "yes"},
+    {'category': 'confirm', 'intent': 'confirm_leave', 'text': "ok"},
+    {'category': 'confirm', 'intent': 'confirm_leave', 'text': "sure, go ahead"},
+    {'category': 'confirm', 'intent': 'confirm_leave', 'text': "Yes please proceed"},
+    {'category': 'decline', 'intent': 'cancel_request', 'text': "no"},
+    {'category': 'decline', 'intent': 'cancel_request', 'text': "nope, I don't want it anymore"},
+    {'category': 'decline', 'intent': 'cancel_request', 'text': "nevermind"},
+
+    # check_balance / leave_history
+    {'category': 'balance', 'intent': 'check_balance', 'text': "what's my leave balance"},
+    {'category': 'balance', 'intent': 'check_balance', 'text': "how many leaves do I have left"},
+    {'category': 'balance', 'intent': 'check_balance', 'text': "remaining days"},
+    {'category': 'history', 'intent': 'leave_history', 'text': "show my leave history"},
+    {'category': 'history', 'intent': 'leave_history', 'text': "view my past leaves"},
+    {'category': 'history', 'intent': 'leave_history', 'text': "my leave requests"},
+
+    # unknown / out of scope
+    {'category': 'unknown', 'intent': 'unknown', 'text': "hello"},
+    {'category': 'unknown', 'intent': 'unknown', 'text': "what is the weather like"},
+    {'category': 'unknown', 'intent': 'unknown', 'text': ""},
+
+    # long messages
+    {'category': 'long', 'intent': 'apply_leave',
+     'text': _FILLER * 4 + "I need leave from 3rd Feb to 6th Feb 2026 to rest"},
+    {'category': 'long', 'intent': 'check_balance',
+     'text': _FILLER * 6 + "so could you tell me what's my leave balance"},
+    {'category': 'long', 'intent': 'unknown', 'text': _NO_DATES * 5},
+
+    # adversarial: slow paths and odd input
+    {'category': 'adversarial', 'intent': None, 'text': "and and and and and and and and and and and and"},
+    {'category': 'adversarial', 'intent': None, 'text': " ".join(str(n) for n in range(1, 80))},
+    {'category': 'adversarial', 'intent': None, 'text': "on " * 60},
+    {'category': 'adversarial', 'intent': None, 'text': "from a to b to c to d to e to f to g to h to i to j"},
+    {'category': 'adversarial', 'intent': None, 'text': "leave " + "monday tuesday " * 30},
+    {'category': 'adversarial', 'intent': None, 'text': "99/99/9999 to 31-02-2026 and 00/00/00"},
+    {'category': 'adversarial', 'intent': None, 'text': "congé le 20 janvier 🏖️ — merci!"},
+    {'category': 'adversarial', 'intent': None, 'text': "x" * 2000},
+    {'category': 'adversarial', 'intent': None, 'text': _NO_DATES * 12},
+]
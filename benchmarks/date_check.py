@@ -0,0 +1,237 @@
+"""
+Equivalence and scaling check for DateParser's single-pass date lexer
+
+Compares parse_date_range() against the original implementation (kept
+below as the reference), whose last resort tried every 1-5 word window
+of the message with parse_single_date and its fuzzy dateutil fallback.
+Both parsers use the real current date, because the reference's
+dateutil fallback fills missing fields from the wall clock.
+
+    python -m benchmarks.date_check          # exit 1 on an unexpected difference
+
+Texts in INTENDED_DIFFERENCES are the cases the lexer changes on purpose.
+They are not compared with the reference; instead the lexer, with its date
+pinned to RECORDED_TODAY, must return exactly the range recorded for them.
+"""
+import re
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from dateutil import parser as dateutil_parser
+
+from benchmarks.corpus import CORPUS
+from leave_management_ai.nlp.date_parser import DateParser
+
+
+EXAMPLES = [
+    # README "Supported Date Formats" and the documented sessions
+    "tomorrow", "next Monday", "this Friday", "20th Jan", "January 25", "25/01/2026",
+    "from 20th to 25th", "20-25 Jan", "Jan 20 to Jan 25",
+    "I need leave from 20th to 25th Jan",
+    "can i take leave today?", "can i take leave tomorrow?", "i want to take leave today",
+    "i need leave tomorrow",
+    # Messages that reach the last resort
+    "I need leave monday", "book me off for friday please", "leave for 3rd march 2026",
+    "taking next tuesday off", "I would like 21st feb off", "off this thursday then back",
+    "out sick yesterday", "Off 5 jan 2027 to recover", "holiday on the 14th",
+    "wed 20th dec", "going away sat", "need leave 02/03/26 for a wedding",
+]
+
+_LONG_REQUEST = next(entry['text'] for entry in CORPUS if entry['text'].endswith("6th Feb 2026 to rest"))
+_NUMBERS = next(entry['text'] for entry in CORPUS if entry['text'].startswith("1 2 3 4 5"))
+
+# The date the ranges in INTENDED_DIFFERENCES were recorded against (a Wednesday)
+RECORDED_TODAY = date(2026, 1, 14)
+
+_NEXT_MONDAY = (date(2026, 1, 19), date(2026, 1, 19))
+_NO_DATE = (None, None)
+
+# text -> (why the lexer differs from the reference, its range on RECORDED_TODAY)
+INTENDED_DIFFERENCES = {
+    # Weekday abbreviations matched inside words ("mon" in "month", "sat" in "satisfied")
+    "out for the whole month of mon": ("weekday inside a word", _NEXT_MONDAY),
+    "I am not satisfied with my schedule": ("weekday inside a word", _NO_DATE),
+    "friends are visiting": ("weekday inside a word", _NO_DATE),
+    "it was sunny": ("weekday inside a word", _NO_DATE),
+    "need leave 02/03/26 for a wedding": ("weekday inside a word", (date(2026, 3, 2), date(2026, 3, 2))),
+    # A relative word next to punctuation was never matched by a whole window
+    "can i take leave today?": ("relative word before punctuation", (date(2026, 1, 14), date(2026, 1, 14))),
+    "can i take leave tomorrow?": ("relative word before punctuation", (date(2026, 1, 15), date(2026, 1, 15))),
+    "Can I take leave tomorrow?": ("relative word before punctuation", (date(2026, 1, 15), date(2026, 1, 15))),
+    "medical leave today, feeling unwell": ("relative word before punctuation",
+                                            (date(2026, 1, 14), date(2026, 1, 14))),
+    # A window holding only part of a date was fuzzy-parsed on its own, so
+    # "20th Jan" also yielded the 20th of the current month as a second date
+    "20th Jan": ("day read without its month", (date(2026, 1, 20), date(2026, 1, 20))),
+    "is it possible to take leave from 2nd Mar to 4th Mar": ("day read without its month",
+                                                             (date(2026, 3, 2), date(2026, 3, 4))),
+    "leave for 3rd march 2026": ("day read without its month", (date(2026, 3, 3), date(2026, 3, 3))),
+    "I would like 21st feb off": ("day read without its month", (date(2026, 2, 21), date(2026, 2, 21))),
+    "Off 5 jan 2027 to recover": ("day read without its month", (date(2027, 1, 5), date(2027, 1, 5))),
+    "January 25": ("month read without its day", (date(2026, 1, 25), date(2026, 1, 25))),
+    "need time off March 5": ("month read without its day", (date(2026, 3, 5), date(2026, 3, 5))),
+    # The weekday names the same day as the date after it
+    "wed 20th dec": ("weekday read apart from its date", (date(2026, 12, 20), date(2026, 12, 20))),
+    # A day range within one month
+    "20-25 Jan": ("day range read as one day", (date(2026, 1, 20), date(2026, 1, 25))),
+    # Fuzzy parsing read any number as a day of the current month
+    "could I get 3 days off next week": ("bare number read as a date", _NO_DATE),
+    "congé le 20 janvier 🏖️ — merci!": ("bare number read as a date", (date(2026, 1, 20), date(2026, 1, 20))),
+    _NUMBERS: ("bare number read as a date", _NO_DATE),
+    # Known limitation: with no usable "from ... to", the last resort takes the
+    # first two dates, and "yesterday" in the preamble comes first
+    _LONG_REQUEST: ("bare number read as a date", (date(2026, 1, 13), date(2026, 2, 3))),
+}
+
+
+class ReferenceDateParser(DateParser):
+    """parse_single_date and parse_date_range as they were before the lexer"""
+
+    def parse_single_date(self, text):
+        text = text.lower().strip()
+        if text in ['today', 'now']:
+            return self.today
+        if text == 'tomorrow':
+            return self.today + timedelta(days=1)
+        if text == 'yesterday':
+            return self.today - timedelta(days=1)
+        match = re.search(r'(next|this)\s+(\w+)', text)
+        if match:
+            modifier, day = match.groups()
+            return self._get_weekday_date(day, modifier == 'next')
+        for day_name, day_num in self.weekdays.items():
+            if day_name in text:
+                return self._get_next_weekday(day_num)
+        match = re.search(r'(\d{1,2})[-/](\d{1,2})[-/](\d{2,4})', text)
+        if match:
+            day, month, year = match.groups()
+            year = int(year)
+            if year < 100:
+                year += 2000
+            try:
+                return datetime(year, int(month), int(day)).date()
+            except Exception:
+                pass
+        match = re.search(r'(\d{1,2})(st|nd|rd|th)?\s+(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)(?:\s+(\d{4}))?', text)
+        if match:
+            day = int(match.group(1))
+            month_str = match.group(3)
+            year_str = match.group(4)
+            year = int(year_str) if year_str else self.today.year
+            try:
+                result_date = dateutil_parser.parse(f"{day} {month_str} {year}").date()
+                if not year_str and result_date < self.today:
+                    result_date = result_date.replace(year=year + 1)
+                return result_date
+            except Exception:
+                pass
+        try:
+            return dateutil_parser.parse(text, fuzzy=True, default=datetime.now()).date()
+        except Exception:
+            pass
+        return None
+
+    def parse_date_range(self, text):
+        text = text.lower()
+        match = re.search(r'(?:on\s+)?(.+?)\s+and\s+(.+?)(?:\s+|$|,|\.|\band\b)', text)
+        if match:
+            first_text, second_text = (group.strip() for group in match.groups())
+            for word in ['leave', 'on', 'apply', 'want', 'need', 'request']:
+                first_text = first_text.replace(word, '').strip()
+                second_text = second_text.replace(word, '').strip()
+            first_date = self.parse_single_date(first_text)
+            second_date = self.parse_single_date(second_text)
+            if first_date and second_date:
+                return min(first_date, second_date), max(first_date, second_date)
+        match = re.search(r'(?:from\s+)?(.+?)\s+(?:to|until|till|-)\s+(.+?)(?:\s|$|,|\.)', text)
+        if match:
+            start_date = self.parse_single_date(match.group(1))
+            end_date = self.parse_single_date(match.group(2))
+            if start_date and end_date:
+                return start_date, end_date
+        match = re.search(r'on\s+(.+?)(?:\s|$|,|\.)', text)
+        if match and ' and ' not in match.group(1):
+            date = self.parse_single_date(match.group(1))
+            if date:
+                return date, date
+        dates = []
+        words = text.split()
+        for i in range(len(words)):
+            for j in range(i + 1, min(i + 6, len(words) + 1)):
+                phrase = ' '.join(words[i:j])
+                if ' and ' in phrase:
+                    continue
+                date = self.parse_single_date(phrase)
+                if date and date not in dates:
+                    dates.append(date)
+                    if len(dates) == 2:
+                        dates.sort()
+                        return dates[0], dates[1]
+        if len(dates) == 1:
+            return dates[0], dates[0]
+        return None, None
+
+
+def texts():
+    """Corpus texts, documented examples and the intended differences"""
+    samples = [entry['text'] for entry in CORPUS] + EXAMPLES
+    samples += [text for text in INTENDED_DIFFERENCES if text not in samples]
+    return list(dict.fromkeys(samples))
+
+
+def median_us(function, text, repeat=15):
+    """Median wall time of one call, in microseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(text)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def scaling(parser, reference, sizes=(25, 50, 100, 200, 400)):
+    """Time both parsers on dateless messages of growing length (parser uncached)"""
+    filler = ("please could you help me understand how the process works for my team "
+              "because several people asked me about it during the weekly sync ").split()
+    print(f"\n{'words':>6} {'lexer µs':>10} {'µs/word':>8} {'reference µs':>13} {'µs/word':>8}")
+    for size in sizes:
+        text = ' '.join((filler * (size // len(filler) + 1))[:size])
+        current, original = median_us(parser.parse_date_range, text), median_us(reference.parse_date_range, text)
+        print(f"{size:>6} {current:>10.0f} {current / size:>8.2f} {original:>13.0f} {original / size:>8.2f}")
+
+
+def main():
+    """Compare against the reference parser; returns the exit status"""
+    parser, reference = DateParser(cache_size=0), ReferenceDateParser()
+    recorded = DateParser(cache_size=0)
+    recorded.today = RECORDED_TODAY
+    samples = texts()
+
+    differences = 0
+    for text in samples:
+        if text in INTENDED_DIFFERENCES:
+            reason, expected = INTENDED_DIFFERENCES[text]
+            actual = recorded.parse_date_range(text)
+            if actual != expected:
+                differences += 1
+                print(f"✗ {text[:60]!r}: recorded {expected}, lexer {actual} ({reason})")
+            continue
+        expected, actual = reference.parse_date_range(text), parser.parse_date_range(text)
+        if actual != expected:
+            differences += 1
+            print(f"✗ {text[:60]!r}: reference {expected}, lexer {actual}")
+
+    scaling(parser, reference)
+    if differences:
+        print(f"\n✗ {differences} of {len(samples)} texts differ from the reference or recorded ranges")
+        return 1
+    intended = len(INTENDED_DIFFERENCES)
+    print(f"\n✓ {len(samples) - intended} of {len(samples)} texts parsed identically to the reference "
+          f"parser; the other {intended} match their recorded ranges")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
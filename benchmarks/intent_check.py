@@ -0,0 +1,104 @@
+"""
+Equivalence check for the compiled IntentClassifier
+
+Compares classify() and classify_many() against the original
+pattern-by-pattern implementation (kept below as the reference), and
+get_confidence() against a pattern-by-pattern version of its single scan,
+on the benchmark corpus plus upper-case and multi-line variants of it.
+
+    python -m benchmarks.intent_check      # exit 1 on any difference
+"""
+import re
+import sys
+
+from benchmarks.corpus import CORPUS
+from leave_management_ai.nlp.intent_classifier import IntentClassifier
+
+
+def reference_classify(intent_patterns, text):
+    """The classifier as it was before compile(): re.search per pattern, in priority order"""
+    text_lower = text.lower()
+
+    for pattern in intent_patterns.get('cancel_approved_leave', []):
+        if re.search(pattern, text_lower):
+            return 'cancel_approved_leave'
+
+    for pattern in intent_patterns.get('check_eligibility', []):
+        if re.search(pattern, text_lower):
+            return 'check_eligibility'
+
+    if text_lower.strip() in ['yes', 'yep', 'yeah', 'ok', 'okay', 'confirm', 'sure']:
+        return 'confirm_leave'
+
+    if text_lower.strip() in ['no', 'nope', 'nah']:
+        return 'cancel_request'
+
+    for intent, patterns in intent_patterns.items():
+        if intent in ['check_eligibility', 'cancel_approved_leave']:
+            continue
+        for pattern in patterns:
+            if re.search(pattern, text_lower):
+                return intent
+
+    return 'unknown'
+
+
+def reference_confidence(intent_patterns, text, intent):
+    """
+    get_confidence as one left-to-right scan of the intent's patterns: at
+    each position the first pattern that matches there is counted and the
+    scan resumes after it; the score grows with the distinct patterns seen
+    """
+    if intent == 'unknown':
+        return 0.0
+    text_lower = text.lower()
+    compiled = [re.compile(pattern) for pattern in intent_patterns.get(intent, [])]
+    matched = set()
+    position = 0
+    while position <= len(text_lower):
+        for index, pattern in enumerate(compiled):
+            match = pattern.match(text_lower, position)
+            if match:
+                matched.add(index)
+                position = max(match.end(), position + 1)
+                break
+        else:
+            position += 1
+    return min(0.6 + (len(matched) * 0.2), 1.0) if matched else 0.0
+
+
+def texts():
+    """Corpus texts plus variants that exercise case folding, anchors and newlines"""
+    base = [entry['text'] for entry in CORPUS]
+    return (base
+            + [text.upper() for text in base]
+            + [f"hello\n{text}" for text in base]
+            + [f"  {text}  " for text in base])
+
+
+def main():
+    """Compare the compiled classifier with the reference; returns the exit status"""
+    classifier = IntentClassifier()
+    samples = texts()
+    batch = classifier.classify_many(samples, with_confidence=True)
+
+    differences = 0
+    for text, (intent, confidence) in zip(samples, batch):
+        expected = reference_classify(classifier.intent_patterns, text)
+        expected_confidence = reference_confidence(classifier.intent_patterns, text, expected)
+        actual = (classifier.classify(text), intent, confidence,
+                  classifier.get_confidence(text, expected))
+        if actual != (expected, expected, expected_confidence, expected_confidence):
+            differences += 1
+            print(f"✗ {text[:60]!r}: expected {expected} ({expected_confidence}), "
+                  f"got classify={actual[0]} classify_many={intent} ({confidence})")
+
+    if differences:
+        print(f"\n✗ {differences} of {len(samples)} texts differ from the reference classifier")
+        return 1
+    print(f"✓ {len(samples)} texts classified identically to the reference classifier")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+Micro-benchmarks for the NLP pipeline (no database needed)
+
+    python -m benchmarks.nlp_bench                          # run and print the report
+    python -m benchmarks.nlp_bench --save-baseline          # also write the baseline JSON
+    python -m benchmarks.nlp_bench --compare [--threshold 0.25]
+
+--compare exits with status 1 when the median or p90 latency of any
+function is more than `threshold` (a fraction) above the baseline.
+Baselines are machine-specific: record and compare on the same host.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.corpus import CORPUS, REFERENCE_DATE
+from leave_management_ai.nlp.date_parser import DateParser
+from leave_management_ai.nlp.entity_character import EntityExtractor
+from leave_management_ai.nlp.intent_classifier import IntentClassifier
+from leave_management_ai.nlp.utterance import Utterance
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baselines', 'nlp.json')
+DEFAULT_THRESHOLD = 0.25
+COMPARED_METRICS = ('p50_us', 'p90_us')
+
+
+def build_targets():
+    """Functions to benchmark, by name"""
+    classifier = IntentClassifier()
+    # Every text is timed repeatedly, so the parse cache is disabled except
+    # for the target that measures it
+    date_parser = DateParser(cache_size=0)
+    date_parser.today = REFERENCE_DATE
+    cached_date_parser = DateParser()
+    cached_date_parser.today = REFERENCE_DATE
+    extractor = EntityExtractor()
+    extractor.date_parser = DateParser(cache_size=0)
+    extractor.date_parser.today = REFERENCE_DATE
+
+    def nlp_stages(text):
+        # What process_query runs before routing: one Utterance for both stages
+        utterance = Utterance(text)
+        return classifier.classify(utterance), extractor.extract_all_entities(utterance)
+
+    return {
+        'IntentClassifier.classify': classifier.classify,
+        'DateParser.parse_date_range': date_parser.parse_date_range,
+        'DateParser.parse_date_range (cached)': cached_date_parser.parse_date_range,
+        'EntityExtractor.extract_all_entities': extractor.extract_all_entities,
+        'classify + extract (shared Utterance)': nlp_stages,
+    }
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def measure(function, texts, repeat, warmup=2):
+    """
+    Time every text `repeat` times (after `warmup` untimed passes)
+    Returns (all samples in ns, per-text median in ns)
+    """
+    for _ in range(warmup):
+        for text in texts:
+            function(text)
+
+    samples = []
+    per_text = [[] for _ in texts]
+    clock = time.perf_counter_ns
+    for _ in range(repeat):
+        for index, text in enumerate(texts):
+            start = clock()
+            function(text)
+            elapsed = clock() - start
+            samples.append(elapsed)
+            per_text[index].append(elapsed)
+    return samples, [statistics.median(times) for times in per_text]
+
+
+def summarize(samples, per_text, texts, slowest=3):
+    """Latency percentiles (µs), throughput and the slowest utterances"""
+    ordered = sorted(samples)
+    total_seconds = sum(samples) / 1e9
+    ranked = sorted(zip(per_text, texts), key=lambda item: item[0], reverse=True)[:slowest]
+    return {
+        'calls': len(samples),
+        'mean_us': round(statistics.fmean(samples) / 1000, 2),
+        'p50_us': round(percentile(ordered, 0.50) / 1000, 2),
+        'p90_us': round(percentile(ordered, 0.90) / 1000, 2),
+        'p99_us': round(percentile(ordered, 0.99) / 1000, 2),
+        'max_us': round(ordered[-1] / 1000, 2),
+        'throughput_per_s': round(len(samples) / total_seconds, 1) if total_seconds else None,
+        'slowest': [[text[:60], round(median / 1000, 2)] for median, text in ranked]
+    }
+
+
+def run(repeat):
+    """Benchmark every target over the corpus; returns the report dict"""
+    texts = [entry['text'] for entry in CORPUS]
+    results = {}
+    for name, function in build_targets().items():
+        samples, per_text = measure(function, texts, repeat)
+        results[name] = summarize(samples, per_text, texts)
+
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'corpus_size': len(texts),
+            'repeat': repeat,
+            'reference_date': REFERENCE_DATE.isoformat()
+        },
+        'results': results
+    }
+
+
+def print_report(report):
+    """Print the per-function latency table"""
+    print(f"\n{'function':<40} {'p50 µs':>10} {'p90 µs':>10} {'p99 µs':>10} {'max µs':>10} {'calls/s':>10}")
+    print('━' * 95)
+    for name, stats in report['results'].items():
+        print(f"{name:<40} {stats['p50_us']:>10} {stats['p90_us']:>10} {stats['p99_us']:>10} "
+              f"{stats['max_us']:>10} {stats['throughput_per_s']:>10}")
+        for text, median in stats['slowest']:
+            print(f"    slowest: {median:>10} µs  {text!r}")
+
+
+def compare(report, baseline, threshold):
+    """
+    Compare against a baseline report
+    Returns list of (function, metric, baseline, current, ratio) regressions
+    """
+    regressions = []
+    print(f"\nComparison with baseline from {baseline['meta']['created_at']} (threshold +{threshold:.0%})")
+    for name, stats in report['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f"  {name}: not in baseline")
+            continue
+        for metric in COMPARED_METRICS:
+            ratio = stats[metric] / base[metric] if base[metric] else 1.0
+            flag = '✗' if ratio > 1 + threshold else '✓'
+            print(f"  {flag} {name} {metric}: {base[metric]} → {stats[metric]} ({ratio - 1:+.1%})")
+            if ratio > 1 + threshold:
+                regressions.append((name, metric, base[metric], stats[metric], ratio))
+    return regressions
+
+
+def main():
+    """Parse the command line, run the benchmarks and compare/save"""
+    parser = argparse.ArgumentParser(description="NLP pipeline micro-benchmarks")
+    parser.add_argument('--repeat', type=int, default=20, help='timed passes over the corpus')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON path')
+    parser.add_argument('--save-baseline', action='store_true', help='write this run as the baseline')
+    parser.add_argument('--compare', action='store_true', help='fail on regressions against the baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed slowdown as a fraction (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    report = run(args.repeat)
+    print_report(report)
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"\n✗ No baseline at {args.baseline}; run with --save-baseline first")
+            return 2
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['meta']['corpus_size'] != report['meta']['corpus_size']:
+            print("\n⚠ Corpus changed since the baseline was saved; results are not comparable")
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)} regression(s) beyond +{args.threshold:.0%}")
+            return 1
+        print("\n✓ No regressions")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Baseline saved to {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
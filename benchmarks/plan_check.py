@@ -0,0 +1,333 @@
+"""
+Query-plan regression check for every statement the operations classes issue
+
+Runs EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) for each statement against a
+local PostgreSQL loaded with the synthetic dataset, and checks the plan
+against the checked-in expectations in benchmarks/plans.json:
+
+    uses_index     index names that must appear in the plan
+    no_seq_scan    tables (or their partitions) that must not be read by a Seq Scan
+    max_relations  most distinct tables/partitions the plan may touch
+    max_cost       upper bound for the planner's total cost estimate
+    max_buffers    upper bound for shared buffers hit + read
+    shape          the plan tree without costs; a change is printed as a diff
+
+    python -m benchmarks.plan_check --load          # load the dataset first (once)
+    python -m benchmarks.plan_check                 # check; exit 1 on regressions
+    python -m benchmarks.plan_check --update        # re-record shape/cost/buffers
+
+A statement with no recorded shape has no baseline, so a change of plan
+would go unnoticed: the check fails until --update has recorded one from
+a seeded database.
+
+Tables never analyzed are analyzed first, and every statement is explained
+twice with the second run checked, so plans and buffer counts depend neither
+on autovacuum timing nor on how warm the backend's catalog caches are.
+Writes are explained inside a transaction that is rolled back. The PL/pgSQL
+functions (confirm_pending_leave, apply_leave_request) show up as a single
+Function Scan, so only their cost and buffers are checked.
+"""
+import argparse
+import difflib
+import inspect
+import json
+import os
+import re
+import sys
+from datetime import timedelta
+
+from leave_management_ai.config.settings import BUSINESS_RULES
+from leave_management_ai.database import operations, pending_store, queries
+from leave_management_ai.database.connection import DatabaseConnection
+from leave_management_ai.database.synthetic import SyntheticDataGenerator
+
+
+DEFAULT_EXPECTATIONS = os.path.join(os.path.dirname(__file__), 'plans.json')
+DEFAULT_EMPLOYEES = 10000
+
+# Recorded cost and buffer numbers get this much headroom on --update
+HEADROOM = 1.5
+
+_PARTITION_SUFFIX = re.compile(r'_y\d{4}m\d{2}\b')
+_REFERENCE = re.compile(r"queries\.([A-Z][A-Z_]+)")
+
+# Parameter sets are built from a sample of the loaded data (see sample_parameters)
+STATEMENTS = {
+    'GET_EMPLOYEE': lambda s: (s['employee_id'],),
+    'GET_BALANCE': lambda s: (s['employee_id'], s['leave_type']),
+    'GET_ALL_BALANCES': lambda s: (s['employee_id'],),
+    'UPSERT_BALANCE': lambda s: (s['employee_id'], s['leave_type'], 10),
+    'INSERT_LEAVE_REQUEST': lambda s: (s['employee_id'], s['leave_type'], s['free_start'],
+                                       s['free_end'], 1, None),
+    'GET_EMPLOYEE_REQUESTS': lambda s: (s['employee_id'], 10),
+    'GET_EMPLOYEE_REQUESTS_PAGE': lambda s: queries.history_page_params(
+        s['employee_id'], 10, after=(s['requested_at'], s['request_id'])),
+    'CHECK_OVERLAPPING_LEAVES': lambda s: (s['employee_id'], s['start_date'], s['end_date']),
+    'GET_FUTURE_LEAVES': lambda s: (s['employee_id'], s['start_date']),
+    'GET_LEAVES_IN_RANGE': lambda s: (s['employee_id'], s['start_date'] - timedelta(days=30),
+                                      s['end_date'] + timedelta(days=30)),
+    'CANCEL_LEAVES_IN_RANGE': lambda s: {'employee_id': s['employee_id'],
+                                         'start_date': s['start_date'], 'end_date': s['end_date']},
+    'CONFIRM_PENDING_LEAVE': lambda s: (s['employee_id'], BUSINESS_RULES['min_leave_balance']),
+    'APPLY_LEAVE_REQUEST': lambda s: (s['employee_id'], s['leave_type'], s['free_start'], s['free_end'],
+                                      1, BUSINESS_RULES['min_leave_balance']),
+    'CANCEL_LEAVE_REQUEST': lambda s: (s['request_id'],),
+    'INSERT_LEAVE_TRANSACTION': lambda s: (s['employee_id'], s['leave_type'], 'debit', 1, 10, 9, None),
+    'GET_TRANSACTIONS_IN_RANGE': lambda s: (s['month_start'], s['month_end'],
+                                            s['employee_id'], s['employee_id']),
+    'INSERT_PENDING_CONFIRMATION': lambda s: (s['employee_id'], s['leave_type'], s['free_start'],
+                                              s['free_end'], 1, s['requested_at']),
+    'GET_PENDING_CONFIRMATION': lambda s: (s['employee_id'],),
+    'DELETE_PENDING_CONFIRMATIONS': lambda s: (s['employee_id'],),
+}
+
+SAMPLE_QUERY = """
+WITH busiest AS (
+    SELECT employee_id FROM leave_requests
+    WHERE employee_id LIKE %s
+    GROUP BY employee_id ORDER BY count(*) DESC, employee_id LIMIT 1
+)
+SELECT r.employee_id, r.id, r.leave_type, r.start_date, r.end_date, r.requested_at
+FROM leave_requests r JOIN busiest b USING (employee_id)
+WHERE r.status = 'approved'
+ORDER BY r.start_date DESC
+LIMIT 1 OFFSET 3;
+"""
+
+LAST_END_DATE = "SELECT max(end_date) FROM leave_requests WHERE employee_id = %s;"
+
+NEVER_ANALYZED = """
+SELECT relid::regclass::text
+FROM pg_stat_user_tables
+WHERE last_analyze IS NULL AND last_autoanalyze IS NULL
+ORDER BY 1;
+"""
+
+
+def referenced_statements():
+    """
+    Names of the queries.py statements used by the operations modules
+    (prepared statements are registered from queries.py constants too)
+    """
+    names = set()
+    for module in (operations, pending_store):
+        names.update(_REFERENCE.findall(inspect.getsource(module)))
+    return names
+
+
+def analyze_new_tables(connection):
+    """
+    ANALYZE every table that has never been analyzed (the loader analyzes the
+    tables it fills, not e.g. an empty pending_confirmations), so plans do
+    not depend on whether autovacuum got to it yet; returns the table names
+    """
+    cursor = connection.cursor()
+    cursor.execute(NEVER_ANALYZED)
+    tables = [row[0] for row in cursor.fetchall()]
+    for table in tables:
+        cursor.execute(f"ANALYZE {table};")
+    connection.commit()
+    cursor.close()
+    return tables
+
+
+def sample_parameters(cursor, id_prefix):
+    """Pick a busy synthetic employee and one of their approved leaves"""
+    cursor.execute(SAMPLE_QUERY, (f"{id_prefix}%",))
+    row = cursor.fetchone()
+    if row is None:
+        raise RuntimeError("No synthetic data loaded; run with --load first")
+    employee_id, request_id, leave_type, start_date, end_date, requested_at = row
+    cursor.execute(LAST_END_DATE, (employee_id,))
+    last_end = cursor.fetchone()[0]
+    month_start = requested_at.date().replace(day=1)
+    return {
+        'employee_id': employee_id,
+        'request_id': request_id,
+        'leave_type': leave_type,
+        'start_date': start_date,
+        'end_date': end_date,
+        'requested_at': requested_at,
+        'free_start': last_end + timedelta(days=30),
+        'free_end': last_end + timedelta(days=30),
+        'month_start': month_start,
+        'month_end': (month_start + timedelta(days=32)).replace(day=1)
+    }
+
+
+def explain(cursor, query, params):
+    """EXPLAIN ANALYZE one statement in a savepoint that is rolled back; returns the root plan"""
+    cursor.execute("SAVEPOINT plan_check;")
+    try:
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query.strip().rstrip(';'), params)
+        return cursor.fetchone()[0][0]['Plan']
+    finally:
+        cursor.execute("ROLLBACK TO SAVEPOINT plan_check;")
+
+
+def walk(plan, depth=0):
+    """Yield (depth, node) for every node of a plan tree"""
+    yield depth, plan
+    for child in plan.get('Plans', []):
+        yield from walk(child, depth + 1)
+
+
+def relation(node):
+    """Relation read by a node, with the month suffix of ledger partitions removed"""
+    name = node.get('Relation Name')
+    return _PARTITION_SUFFIX.sub('_<month>', name) if name else None
+
+
+def plan_shape(plan):
+    """Indented node lines without costs or row counts"""
+    lines = []
+    for depth, node in walk(plan):
+        line = node['Node Type']
+        if node.get('Index Name'):
+            line += f" using {_PARTITION_SUFFIX.sub('_<month>', node['Index Name'])}"
+        if relation(node):
+            line += f" on {relation(node)}"
+        lines.append('  ' * depth + line)
+    return lines
+
+
+def summarize(plan):
+    """The numbers and names the expectations are checked against"""
+    nodes = [node for _, node in walk(plan)]
+    return {
+        'indexes': sorted({node['Index Name'] for node in nodes if node.get('Index Name')}),
+        'seq_scans': sorted({node['Relation Name'] for node in nodes if node['Node Type'] == 'Seq Scan'}),
+        'relations': len({node['Relation Name'] for node in nodes if node.get('Relation Name')}),
+        'cost': plan['Total Cost'],
+        'buffers': plan.get('Shared Hit Blocks', 0) + plan.get('Shared Read Blocks', 0),
+        'shape': plan_shape(plan)
+    }
+
+
+def check(summary, expected):
+    """Returns a list of failure messages for one statement"""
+    failures = []
+    for index in expected.get('uses_index', []):
+        if index not in summary['indexes']:
+            failures.append(f"does not use index {index} (uses {summary['indexes'] or 'none'})")
+    for table in expected.get('no_seq_scan', []):
+        scanned = [rel for rel in summary['seq_scans'] if rel == table or rel.startswith(table + '_')]
+        if scanned:
+            failures.append(f"sequential scan on {', '.join(scanned)}")
+    if 'max_relations' in expected and summary['relations'] > expected['max_relations']:
+        failures.append(f"touches {summary['relations']} relations (max {expected['max_relations']})")
+    if 'max_cost' in expected and summary['cost'] > expected['max_cost']:
+        failures.append(f"estimated cost {summary['cost']:.1f} > {expected['max_cost']}")
+    if 'max_buffers' in expected and summary['buffers'] > expected['max_buffers']:
+        failures.append(f"{summary['buffers']} shared buffers > {expected['max_buffers']}")
+    if expected.get('shape') and expected['shape'] != summary['shape']:
+        diff = difflib.unified_diff(expected['shape'], summary['shape'],
+                                    'expected', 'actual', lineterm='')
+        failures.append("plan changed shape:\n" + '\n'.join('      ' + line for line in diff))
+    return failures
+
+
+def unrecorded(expectations, only=None):
+    """Checked statements with no recorded plan shape"""
+    return [name for name in STATEMENTS
+            if (not only or name in only) and not expectations.get(name, {}).get('shape')]
+
+
+def record(summary, expected):
+    """Expectation entry for --update: keep hand-written rules, refresh measured ones"""
+    updated = dict(expected)
+    updated['max_cost'] = round(max(summary['cost'] * HEADROOM, 1.0), 1)
+    updated['max_buffers'] = max(int(summary['buffers'] * HEADROOM), 10)
+    updated['shape'] = summary['shape']
+    return updated
+
+
+def run(expectations, only=None, update=False, id_prefix='SYN'):
+    """
+    Explain every statement; returns (failures by statement, updated expectations)
+    """
+    failures = {}
+    updated = dict(expectations)
+    db = DatabaseConnection()
+    connection = db.get_connection()
+    try:
+        analyze_new_tables(connection)
+        cursor = connection.cursor()
+        sample = sample_parameters(cursor, id_prefix)
+        for name, build_params in STATEMENTS.items():
+            if only and name not in only:
+                continue
+            query, params = getattr(queries, name), build_params(sample)
+            # The first run in a backend also reads the catalog (FK and trigger
+            # metadata) into its caches; measure the second, so a check in a
+            # fresh backend sees the same buffers as the --load run that recorded them
+            explain(cursor, query, params)
+            plan = explain(cursor, query, params)
+            summary = summarize(plan)
+            expected = expectations.get(name, {})
+            if update:
+                updated[name] = record(summary, expected)
+            problems = check(summary, expected)
+            flag = '✗' if problems else '✓'
+            print(f"{flag} {name:<30} cost {summary['cost']:>10.1f}  buffers {summary['buffers']:>6}  "
+                  f"{', '.join(summary['indexes']) or 'no index'}")
+            for problem in problems:
+                print(f"    {problem}")
+            if problems:
+                failures[name] = problems
+        connection.rollback()
+        cursor.close()
+    finally:
+        db.return_connection(connection)
+    return failures, updated
+
+
+def main():
+    """Parse the command line, optionally load the dataset, check the plans"""
+    parser = argparse.ArgumentParser(description="Query-plan regression check")
+    parser.add_argument('--expectations', default=DEFAULT_EXPECTATIONS, help='expectations JSON path')
+    parser.add_argument('--load', action='store_true', help='load the synthetic dataset first')
+    parser.add_argument('--employees', type=int, default=DEFAULT_EMPLOYEES, help='employees to generate')
+    parser.add_argument('--only', nargs='+', metavar='STATEMENT', help='check only these statements')
+    parser.add_argument('--update', action='store_true',
+                        help='re-record shape, cost and buffer limits from this run')
+    args = parser.parse_args()
+
+    missing = referenced_statements() - set(STATEMENTS)
+    if missing:
+        print(f"✗ Statements used by the operations classes but not checked: {', '.join(sorted(missing))}")
+        return 2
+
+    with open(args.expectations, encoding='utf-8') as f:
+        expectations = json.load(f)
+
+    try:
+        if args.load:
+            counts = SyntheticDataGenerator(employees=args.employees).load()
+            print(f"✓ Loaded {', '.join(f'{table}={count}' for table, count in counts.items())}")
+        failures, updated = run(expectations, args.only, args.update)
+    finally:
+        if DatabaseConnection._instance is not None:
+            DatabaseConnection().close_all_connections()
+
+    if args.update:
+        with open(args.expectations, 'w', encoding='utf-8') as f:
+            json.dump(updated, f, indent=2)
+            f.write('\n')
+        print(f"\n✓ Expectations written to {args.expectations}; review the diff before committing")
+        return 0
+    if failures:
+        print(f"\n✗ {len(failures)} statement(s) regressed")
+        return 1
+    baseline_missing = unrecorded(expectations, args.only)
+    if baseline_missing:
+        print(f"\n✗ No recorded plan baseline for {len(baseline_missing)} statement(s): "
+              f"{', '.join(baseline_missing)}")
+        print("  Record one with --load --update on a seeded database and commit plans.json")
+        return 1
+    print("\n✓ All plans match expectations")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Cold-start budget report: import time, construction time and memory
+
+Each target runs in a fresh interpreter with -X importtime, so nothing is
+cached between measurements. No database is needed: constructing the
+assistant or the service must not open the pool (see
+LeaveManagementAI.warm_up).
+
+    python -m benchmarks.startup_bench                   # report every target
+    python -m benchmarks.startup_bench --budget-ms 500 --budget-mb 120
+
+Exits with status 1 when a target's wall time or peak RSS exceeds the budget.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+
+DEFAULT_BUDGET_MS = 500
+DEFAULT_BUDGET_MB = 120
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (module to import, expression constructing the entry object)
+TARGETS = {
+    'main': ('main', 'main.LeaveManagementAI()'),
+    'service': ('services.leave_service', 'services.leave_service.LeaveService()'),
+}
+
+_CHILD = """
+import json, resource, sys, time
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+{construct}
+built = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - started) * 1000,
+    'construct_ms': (built - imported) * 1000,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'spacy_loaded': 'spacy' in sys.modules
+}}))
+"""
+
+_IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+
+
+def measure(module, construct):
+    """
+    Run one target in a fresh interpreter
+    Returns (child report dict, wall ms, [(self_us, cumulative_us, depth, module)])
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _CHILD.format(module=module, construct=construct)],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"{module} failed to start:\n{completed.stderr[-2000:]}")
+
+    imports = []
+    for line in completed.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append((int(self_us), int(cumulative_us), len(indent) // 2, name))
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    return report, wall_ms, imports
+
+
+def by_package(imports):
+    """Self import time (ms) summed per top-level package"""
+    totals = defaultdict(float)
+    for self_us, _, _, name in imports:
+        totals[name.split('.')[0]] += self_us / 1000
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def print_report(name, report, wall_ms, imports, top):
+    """Print one target's timings and its slowest imports"""
+    print(f"\n{name}: wall {wall_ms:.0f} ms (import {report['import_ms']:.0f} ms, "
+          f"construct {report['construct_ms']:.0f} ms), peak RSS {report['max_rss_mb']:.0f} MB"
+          f"{', spaCy loaded' if report['spacy_loaded'] else ''}")
+    print(f"  {'package':<32} {'self ms':>8}")
+    for package, total_ms in by_package(imports)[:top]:
+        print(f"  {package:<32} {total_ms:>8.1f}")
+
+
+def main():
+    """Measure every target and compare against the budget"""
+    parser = argparse.ArgumentParser(description="Cold-start budget report")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help='max wall time per target, interpreter start included')
+    parser.add_argument('--budget-mb', type=float, default=DEFAULT_BUDGET_MB, help='max peak RSS per target')
+    parser.add_argument('--top', type=int, default=10, help='packages listed per target')
+    parser.add_argument('--target', choices=sorted(TARGETS), action='append', help='targets to measure')
+    args = parser.parse_args()
+
+    over = []
+    for name in args.target or TARGETS:
+        module, construct = TARGETS[name]
+        report, wall_ms, imports = measure(module, construct)
+        print_report(name, report, wall_ms, imports, args.top)
+        if wall_ms > args.budget_ms:
+            over.append(f"{name}: {wall_ms:.0f} ms > {args.budget_ms:.0f} ms")
+        if report['max_rss_mb'] > args.budget_mb:
+            over.append(f"{name}: {report['max_rss_mb']:.0f} MB > {args.budget_mb:.0f} MB")
+
+    if over:
+        print("\n✗ Over budget: " + '; '.join(over))
+        return 1
+    print(f"\n✓ Every target within {args.budget_ms:.0f} ms and {args.budget_mb:.0f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
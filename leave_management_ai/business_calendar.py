@@ -0,0 +1,103 @@
+"""
+Business calendars: which days are charged as leave
+
+A calendar is the set of public holidays of one region, kept as a sorted
+index of day ordinals, so counting business days between two dates is
+closed-form weekday arithmetic plus two binary searches. Calendars are
+configured in HOLIDAY_CONFIG and built once per name.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+from leave_management_ai.config.settings import HOLIDAY_CONFIG
+
+
+class BusinessCalendar:
+    """
+    Working days of one region: weekdays that are not public holidays.
+
+    `holidays` maps dates (or ISO strings) to holiday names. With
+    include_weekends=True every day counts except holidays.
+    """
+
+    def __init__(self, holidays=None, name='default'):
+        self.name = name
+        self.holidays = {}
+        for day, holiday in (holidays or {}).items():
+            day = date.fromisoformat(day) if isinstance(day, str) else day
+            self.holidays[day] = holiday
+        # Sorted ordinals of every holiday, and of those on a weekday
+        self._ordinals = sorted(day.toordinal() for day in self.holidays)
+        self._weekday_ordinals = [ordinal for ordinal in self._ordinals
+                                  if date.fromordinal(ordinal).weekday() < 5]
+        self._holiday_array = None
+
+    def holiday(self, day):
+        """Name of the holiday on `day`, or None"""
+        return self.holidays.get(day)
+
+    def is_business_day(self, day, include_weekends=False):
+        """Whether leave on `day` is charged"""
+        if not include_weekends and day.weekday() >= 5:
+            return False
+        return day not in self.holidays
+
+    def business_days(self, start_date, end_date, include_weekends=False):
+        """Charged days in [start_date, end_date]; 0 if the range is empty"""
+        if end_date < start_date:
+            return 0
+        first, last = start_date.toordinal(), end_date.toordinal()
+        if include_weekends:
+            days = last - first + 1
+            ordinals = self._ordinals
+        else:
+            days = weekdays_between(start_date, end_date)
+            ordinals = self._weekday_ordinals
+        return days - (bisect_right(ordinals, last) - bisect_left(ordinals, first))
+
+    def business_days_many(self, start_dates, end_dates, include_weekends=False):
+        """
+        business_days for arrays of ranges at once (needs NumPy)
+        Takes sequences of dates or, cheaper, datetime64[D] arrays; returns an int array
+        """
+        import numpy as np
+
+        if self._holiday_array is None:
+            self._holiday_array = np.array(sorted(self.holidays), dtype='datetime64[D]')
+        starts = np.asarray(start_dates, dtype='datetime64[D]')
+        ends = np.asarray(end_dates, dtype='datetime64[D]') + np.timedelta64(1, 'D')
+        counts = np.busday_count(starts, ends, weekmask='1111111' if include_weekends else '1111100',
+                                 holidays=self._holiday_array)
+        return np.maximum(counts, 0)
+
+
+def weekdays_between(start_date, end_date):
+    """Monday-Friday days in [start_date, end_date], in constant time"""
+    weeks, extra = divmod((end_date - start_date).days + 1, 7)
+    first = start_date.weekday()
+    return weeks * 5 + sum(1 for offset in range(extra) if (first + offset) % 7 < 5)
+
+
+_calendars = {}
+_calendars_lock = threading.Lock()
+
+
+def get_calendar(name=None):
+    """The configured calendar called `name` (default: HOLIDAY_CONFIG['default_calendar'])"""
+    name = name or HOLIDAY_CONFIG['default_calendar']
+    calendar = _calendars.get(name)
+    if calendar is None:
+        with _calendars_lock:
+            calendar = _calendars.get(name)
+            if calendar is None:
+                if name not in HOLIDAY_CONFIG['calendars']:
+                    raise KeyError(f"No holiday calendar named {name!r} in HOLIDAY_CONFIG")
+                calendar = BusinessCalendar(HOLIDAY_CONFIG['calendars'][name], name)
+                _calendars[name] = calendar
+    return calendar
+
+
+def calendar_for_department(department):
+    """Calendar of a department, falling back to the default calendar"""
+    return get_calendar(HOLIDAY_CONFIG['departments'].get(department))
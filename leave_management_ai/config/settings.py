@@ -11,6 +11,80 @@ DB_CONFIG = {
     'password': 'your_password_here'  # Change this to your PostgreSQL password
 }
 
+# Connection Pool Configuration
+POOL_CONFIG = {
+    'min_connections': 2,         # Opened (prewarmed) when the pool is created
+    'max_connections': 20,
+    'acquire_timeout': 5.0,       # Seconds to wait for a free connection before failing
+    'health_check_after': 30.0    # Ping connections idle for longer than this (seconds)
+}
+
+# Query Execution Configuration
+QUERY_CONFIG = {
+    'prepared_statements': True,  # PREPARE hot queries once per connection (disable behind pgbouncer)
+    'result_cache': True,         # Cache tagged reads in execute_query, evicted on writes
+    'result_cache_size': 2000,    # Max cached results (LRU)
+    'result_cache_ttl_seconds': 30,  # Bounds staleness from writes made by other processes
+    'result_cache_max_rows': 500,  # Larger results are never cached
+    'history_page_size': 10,      # Leave history entries per page
+    'history_stream_batch_size': 500  # Rows fetched per round trip when streaming history
+}
+
+# In-process Cache Configuration
+CACHE_CONFIG = {
+    'preload_employees': True,              # Bulk-load the employee directory at startup
+    'employee_cache_size': 50000,           # Max employee rows kept in memory (LRU)
+    'employee_ttl_seconds': 300,
+    'employee_negative_ttl_seconds': 60,    # How long an unknown ID is remembered
+    'bloom_false_positive_rate': 0.01,      # Negative filter for made-up employee IDs
+    'directory_refresh_seconds': 60         # Trust window of the filter: employees created by
+                                            # another process are rejected for at most this long
+}
+
+# Schema Migrations (python setup_db.py migrate)
+MIGRATION_CONFIG = {
+    'lock_timeout': '5s',              # Give up on DDL instead of queueing behind long transactions
+    'backfill_batch_size': 5000,       # Rows updated per backfill transaction
+    'backfill_pause_seconds': 0.05,    # Pause between batches to leave room for live traffic
+    'index_build_retries': 2           # Rebuilds of an index left INVALID by a failed concurrent build
+}
+
+# Leave Transactions Ledger (monthly partitions, see ledger_admin.py)
+LEDGER_CONFIG = {
+    'partition_months_ahead': 3,     # Partitions kept created ahead of the current month
+    'archive_directory': 'archive',  # Where archived partitions are written as .csv.gz
+    'retention_months': 24           # Default age for `ledger_admin.py archive`
+}
+
+# Database Instrumentation (see database/instrumentation.py)
+INSTRUMENTATION_CONFIG = {
+    'enabled': True,
+    'slow_query_ms': 200,                    # Statements at least this slow go to the slow-query log
+    'slow_query_log': 'slow_queries.jsonl',  # JSON lines, parameters redacted; None to disable
+    'stats_dump_path': None                  # Write query stats as JSON here when the chat exits
+}
+
+# Startup (see LeaveManagementAI.warm_up)
+STARTUP_CONFIG = {
+    'warm_up': 'background',   # 'background' (thread), 'blocking' or None (everything loads on first use)
+    'load_spacy_model': False  # Also load the spaCy pipeline; nothing in the chat flow uses it
+}
+
+# Per-stage Latency Tracing (see leave_management_ai/tracing.py)
+TRACING_CONFIG = {
+    'enabled': False,
+    'buckets': (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+                0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),  # Histogram bounds (seconds)
+    'exporter_port': None,   # Serve /metrics on 127.0.0.1:<port> while the chat runs
+    'dump_path': None        # Write the metrics text here when the chat exits
+}
+
+# Pending Confirmation Store
+PENDING_STORE_CONFIG = {
+    'backend': 'memory',   # 'memory' (TTL map), 'file' (memory + local file) or 'database' (table)
+    'file_path': 'pending_confirmations.json'  # Used by the 'file' backend
+}
+
 # Leave Types Configuration
 LEAVE_TYPES = {
     'casual': 'Casual Leave',
@@ -23,13 +97,27 @@ LEAVE_TYPES = {
 BUSINESS_RULES = {
     'weekend_counts': False,  # Whether weekends count towards leave days
     'min_leave_balance': 0,   # Minimum leave balance allowed (can go negative)
-    'max_consecutive_days': 30  # Maximum consecutive leave days
+    'max_consecutive_days': 30,  # Maximum consecutive leave days
+    'pending_expiry_minutes': 15  # How long a leave request awaits confirmation
+}
+
+# Public Holidays (not charged as leave; see leave_management_ai/business_calendar.py)
+HOLIDAY_CONFIG = {
+    'default_calendar': 'default',
+    'calendars': {
+        # name -> {'YYYY-MM-DD': 'Holiday name', ...}
+        'default': {}
+    },
+    'departments': {}  # department -> calendar name; others use the default calendar
 }
 
 # NLP Configuration
 NLP_CONFIG = {
     'spacy_model': 'en_core_web_sm',
-    'confidence_threshold': 0.6  # Minimum confidence for intent classification
+    'confidence_threshold': 0.6,  # Minimum confidence for intent classification
+    'intent_backend': 'regex',    # 'regex' (pattern table) or 'ngram' (trained model, needs NumPy)
+    'intent_model_path': 'models/intent_ngram.npz',  # Written by train_intent_model.py
+    'date_cache_size': 4096       # Parsed date phrases kept per DateParser; emptied at midnight
 }
 
 # Response Templates
@@ -78,6 +166,12 @@ RESPONSE_TEMPLATES = {
         "Weekends don't count as working days in our system.\n"
         "You can request leave for a weekday instead!"
     ),
+    'eligibility_no_holiday': (
+        "Not a Working Day\n\n"
+        "{date} ({day_name}) is a public holiday: {holiday}.\n\n"
+        "Holidays are not charged against your leave balance.\n"
+        "You can request leave for another working day instead!"
+    ),
     'eligibility_no_balance': (
         "Insufficient Leave Balance\n\n"
         "Date: {date} ({day_name})\n"
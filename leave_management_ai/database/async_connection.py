@@ -0,0 +1,119 @@
+"""
+Asyncio PostgreSQL connection handler (psycopg 3)
+"""
+import asyncio
+import time
+
+from psycopg_pool import AsyncConnectionPool
+
+from leave_management_ai.config.settings import DB_CONFIG, POOL_CONFIG
+from leave_management_ai.database.instrumentation import query_stats
+
+
+class AsyncDatabaseConnection:
+    """Process-wide async connection pool manager"""
+    
+    _instance = None
+    _instance_lock = None
+    
+    def __init__(self):
+        self._connection_pool = AsyncConnectionPool(
+            kwargs={
+                'host': DB_CONFIG['host'],
+                'port': DB_CONFIG['port'],
+                'dbname': DB_CONFIG['database'],
+                'user': DB_CONFIG['user'],
+                'password': DB_CONFIG['password']
+            },
+            min_size=POOL_CONFIG['min_connections'],
+            max_size=POOL_CONFIG['max_connections'],
+            timeout=POOL_CONFIG['acquire_timeout'],
+            open=False
+        )
+    
+    @classmethod
+    async def get_instance(cls):
+        """Get the shared pool, opening and prewarming it on first use"""
+        if cls._instance is None:
+            if cls._instance_lock is None:
+                cls._instance_lock = asyncio.Lock()
+            async with cls._instance_lock:
+                if cls._instance is None:
+                    instance = cls()
+                    await instance.open()
+                    cls._instance = instance
+        return cls._instance
+    
+    async def open(self):
+        """Open the pool and wait until min_connections are ready"""
+        try:
+            await self._connection_pool.open(wait=True)
+            print("✓ Async database connection pool created successfully")
+        except Exception as e:
+            print(f"✗ Error creating async connection pool: {e}")
+            raise
+    
+    def connection(self):
+        """
+        Async context manager yielding a pooled connection.
+        Commits on normal exit and rolls back if the block raises.
+        """
+        return self._connection_pool.connection()
+    
+    def get_pool_stats(self):
+        """Get pool gauges and counters"""
+        return self._connection_pool.get_stats()
+    
+    async def close_all_connections(self):
+        """Close all connections in the pool"""
+        await self._connection_pool.close()
+        AsyncDatabaseConnection._instance = None
+        print("✓ All async database connections closed")
+
+
+async def execute_query(query, params=None, fetch=False):
+    """
+    Async counterpart of connection.execute_query
+
+    Args:
+        query: SQL query string
+        params: Query parameters (tuple or dict)
+        fetch: Whether to fetch results (True for SELECT)
+
+    Returns:
+        Query results if fetch=True, else None
+    """
+    db = await AsyncDatabaseConnection.get_instance()
+    
+    try:
+        started = time.perf_counter()
+        async with db.connection() as connection:
+            query_stats.record_pool_wait(time.perf_counter() - started)
+            async with connection.cursor() as cursor:
+                with query_stats.statement(query, params) as statement:
+                    await cursor.execute(query, params)
+                    results = await cursor.fetchall() if fetch else None
+                    statement.rows = cursor.rowcount
+                return results
+    except Exception as e:
+        print(f"✗ Database error: {e}")
+        raise
+
+
+async def execute_returning(query, params=None):
+    """Execute a write with RETURNING and commit, returning the first row"""
+    db = await AsyncDatabaseConnection.get_instance()
+    
+    try:
+        started = time.perf_counter()
+        async with db.connection() as connection:
+            query_stats.record_pool_wait(time.perf_counter() - started)
+            async with connection.cursor() as cursor:
+                with query_stats.statement(query, params) as statement:
+                    await cursor.execute(query, params)
+                    row = await cursor.fetchone()
+                    statement.rows = cursor.rowcount
+                return row
+    except Exception as e:
+        print(f"✗ Database error: {e}")
+        raise
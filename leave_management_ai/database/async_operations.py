@@ -0,0 +1,237 @@
+"""
+Asyncio database CRUD operations
+
+Mirrors database/operations.py method for method and runs the same SQL
+(database/queries.py) on the async pool.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from leave_management_ai.config.settings import QUERY_CONFIG
+from leave_management_ai.database import queries
+from leave_management_ai.database.async_connection import execute_query, execute_returning, AsyncDatabaseConnection
+from leave_management_ai.database.instrumentation import query_stats
+from leave_management_ai.database.partitions import partition_guard
+from leave_management_ai.database.pending_store import get_pending_store
+
+
+class AsyncEmployeeOperations:
+    """Employee-related database operations"""
+    
+    @staticmethod
+    async def get_employee(employee_id):
+        """Get employee details by ID"""
+        results = await execute_query(queries.GET_EMPLOYEE, (employee_id,), fetch=True)
+        return results[0] if results else None
+    
+    @staticmethod
+    async def employee_exists(employee_id):
+        """Check if employee exists"""
+        employee = await AsyncEmployeeOperations.get_employee(employee_id)
+        return employee is not None
+
+
+class AsyncLeaveBalanceOperations:
+    """Leave balance operations"""
+    
+    @staticmethod
+    async def get_balance(employee_id, leave_type='general'):
+        """Get leave balance for specific type"""
+        results = await execute_query(queries.GET_BALANCE, (employee_id, leave_type), fetch=True)
+        return float(results[0][0]) if results else 0.0
+    
+    @staticmethod
+    async def get_all_balances(employee_id):
+        """Get all leave balances for an employee"""
+        results = await execute_query(queries.GET_ALL_BALANCES, (employee_id,), fetch=True)
+        return {row[0]: float(row[1]) for row in results}
+    
+    @staticmethod
+    async def update_balance(employee_id, leave_type, new_balance):
+        """Update leave balance"""
+        await execute_query(queries.UPSERT_BALANCE, (employee_id, leave_type, new_balance))
+    
+    @staticmethod
+    async def deduct_balance(employee_id, leave_type, days):
+        """Deduct days from leave balance"""
+        current = await AsyncLeaveBalanceOperations.get_balance(employee_id, leave_type)
+        new_balance = current - days
+        await AsyncLeaveBalanceOperations.update_balance(employee_id, leave_type, new_balance)
+        return new_balance
+
+
+class AsyncLeaveRequestOperations:
+    """Leave request operations"""
+    
+    @staticmethod
+    async def create_request(employee_id, leave_type, start_date, end_date, days_count, reason=None):
+        """Create a new leave request"""
+        row = await execute_returning(queries.INSERT_LEAVE_REQUEST,
+                                      (employee_id, leave_type, start_date, end_date, days_count, reason))
+        return row[0]
+    
+    @staticmethod
+    async def get_employee_requests(employee_id, limit=10):
+        """Get recent leave requests for an employee"""
+        return await execute_query(queries.GET_EMPLOYEE_REQUESTS, (employee_id, limit), fetch=True)
+    
+    @staticmethod
+    async def get_employee_requests_page(employee_id, limit=10, after=None, status=None,
+                                         leave_type=None, from_date=None, to_date=None):
+        """
+        Get one page of an employee's leave requests, newest first
+        `after` is the (requested_at, id) of the last row of the previous page
+        """
+        params = queries.history_page_params(employee_id, limit, after, status,
+                                             leave_type, from_date, to_date)
+        return await execute_query(queries.GET_EMPLOYEE_REQUESTS_PAGE, params, fetch=True)
+    
+    @staticmethod
+    async def iter_employee_requests(employee_id, batch_size=None, status=None,
+                                     leave_type=None, from_date=None, to_date=None):
+        """
+        Yield every matching leave request, newest first, one keyset page at a
+        time so memory stays bounded by `batch_size` rows
+        """
+        batch_size = batch_size or QUERY_CONFIG['history_stream_batch_size']
+        after = None
+        while True:
+            params = queries.history_page_params(employee_id, batch_size, after, status,
+                                                 leave_type, from_date, to_date)
+            rows = await execute_query(queries.GET_EMPLOYEE_REQUESTS_PAGE, params, fetch=True)
+            for row in rows:
+                yield row
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1][6], rows[-1][0])
+    
+    @staticmethod
+    async def check_overlapping_leaves(employee_id, start_date, end_date):
+        """Check if there are existing approved leaves overlapping with the date range"""
+        params = (employee_id, start_date, end_date)
+        return await execute_query(queries.CHECK_OVERLAPPING_LEAVES, params, fetch=True)
+    
+    @staticmethod
+    async def get_future_leaves(employee_id, from_date):
+        """Get future approved leaves after a specific date"""
+        return await execute_query(queries.GET_FUTURE_LEAVES, (employee_id, from_date), fetch=True)
+    
+    @staticmethod
+    async def get_leaves_in_range(employee_id, start_date, end_date):
+        """Get approved leaves in a specific date range"""
+        return await execute_query(queries.GET_LEAVES_IN_RANGE, (employee_id, start_date, end_date), fetch=True)
+    
+    @staticmethod
+    async def cancel_leaves_in_range(employee_id, start_date, end_date):
+        """
+        Cancel all approved leaves in a date range and restore their balances
+        in one transaction
+        Returns rows of (id, leave_type, start_date, end_date, days_count, balance_after)
+        """
+        if partition_guard.due():
+            await asyncio.to_thread(partition_guard.check)
+        params = {'employee_id': employee_id, 'start_date': start_date, 'end_date': end_date}
+        return await execute_query(queries.CANCEL_LEAVES_IN_RANGE, params, fetch=True)
+    
+    @staticmethod
+    async def confirm_pending_request(employee_id, min_balance):
+        """
+        Apply the employee's pending confirmation atomically in one round trip
+        Returns (outcome, request_id, leave_type, start_date, end_date,
+                 days_count, balance_before, balance_after)
+        """
+        if partition_guard.due():
+            await asyncio.to_thread(partition_guard.check)
+        return await execute_returning(queries.CONFIRM_PENDING_LEAVE, (employee_id, min_balance))
+    
+    @staticmethod
+    async def apply_leave_request(employee_id, leave_type, start_date, end_date, days_count, min_balance):
+        """
+        Apply a leave atomically in one round trip (for pending confirmations
+        held outside the database)
+        Returns the same row as confirm_pending_request
+        """
+        if partition_guard.due():
+            await asyncio.to_thread(partition_guard.check)
+        params = (employee_id, leave_type, start_date, end_date, days_count, min_balance)
+        return await execute_returning(queries.APPLY_LEAVE_REQUEST, params)
+    
+    @staticmethod
+    async def cancel_leave_request(request_id):
+        """Cancel an approved leave request"""
+        return await execute_returning(queries.CANCEL_LEAVE_REQUEST, (request_id,))
+
+
+class AsyncLeaveTransactionOperations:
+    """Leave transaction logging"""
+    
+    @staticmethod
+    async def log_transaction(employee_id, leave_type, transaction_type, amount,
+                              balance_before, balance_after, description=None):
+        """Log a leave balance transaction"""
+        if partition_guard.due():
+            await asyncio.to_thread(partition_guard.check)
+        await execute_query(queries.INSERT_LEAVE_TRANSACTION,
+                            (employee_id, leave_type, transaction_type, amount,
+                             balance_before, balance_after, description))
+    
+    @staticmethod
+    async def get_transactions_in_range(start, end, employee_id=None):
+        """Get ledger entries with start <= transaction_date < end, optionally for one employee"""
+        return await execute_query(queries.GET_TRANSACTIONS_IN_RANGE,
+                                   (start, end, employee_id, employee_id), fetch=True)
+
+
+class AsyncPendingConfirmationOperations:
+    """
+    Operations for pending leave confirmations (backed by PENDING_STORE_CONFIG)
+    The in-memory and file stores never block on the network, so only the
+    database backend goes through the async pool.
+    """
+    
+    @staticmethod
+    async def create_pending(employee_id, leave_type, start_date, end_date, days_count):
+        """Create a pending confirmation, replacing any existing one"""
+        store = get_pending_store()
+        if not store.in_database:
+            return store.put(employee_id, leave_type, start_date, end_date, days_count)
+        
+        expires_at = datetime.now() + timedelta(seconds=store.ttl_seconds)
+        
+        params = (employee_id, leave_type, start_date, end_date, days_count, expires_at)
+        db = await AsyncDatabaseConnection.get_instance()
+        started = time.perf_counter()
+        async with db.connection() as connection:
+            query_stats.record_pool_wait(time.perf_counter() - started)
+            async with connection.cursor() as cursor:
+                with query_stats.statement(queries.DELETE_PENDING_CONFIRMATIONS, (employee_id,)) as statement:
+                    await cursor.execute(queries.DELETE_PENDING_CONFIRMATIONS, (employee_id,))
+                    statement.rows = cursor.rowcount
+                with query_stats.statement(queries.INSERT_PENDING_CONFIRMATION, params) as statement:
+                    await cursor.execute(queries.INSERT_PENDING_CONFIRMATION, params)
+                    row = await cursor.fetchone()
+                    statement.rows = cursor.rowcount
+                return row[0]
+    
+    @staticmethod
+    async def get_pending(employee_id):
+        """Get pending confirmation for employee"""
+        store = get_pending_store()
+        if not store.in_database:
+            return store.get(employee_id)
+        results = await execute_query(queries.GET_PENDING_CONFIRMATION, (employee_id,), fetch=True)
+        return results[0] if results else None
+    
+    @staticmethod
+    async def clear_pending(employee_id):
+        """Clear pending confirmations for employee"""
+        store = get_pending_store()
+        if not store.in_database:
+            store.clear(employee_id)
+            return
+        await execute_query(queries.DELETE_PENDING_CONFIRMATIONS, (employee_id,))
+    
+    @staticmethod
+    def in_database():
+        """Whether pending confirmations live in the pending_confirmations table"""
+        return get_pending_store().in_database
@@ -0,0 +1,374 @@
+"""
+Bulk import of employees and leave balances
+
+Files are streamed through COPY into temporary staging tables (every
+column TEXT, so nothing is rejected by COPY itself), validated in SQL,
+and upserted into employees and leave_balance in a single transaction.
+Rows that fail validation are reported, not loaded. Memory use does not
+depend on the file size.
+"""
+import csv
+import io
+import json
+import os
+
+from leave_management_ai.config.settings import LEAVE_TYPES
+from leave_management_ai.database.connection import DatabaseConnection, query_cache
+from leave_management_ai.database.employee_directory import EmployeeDirectory
+
+
+EMPLOYEE_COLUMNS = ['employee_id', 'name', 'email', 'department', 'join_date']
+BALANCE_COLUMNS = ['employee_id', 'leave_type', 'balance']
+
+# How many rejected rows are returned in the report (all go to rejects_path)
+REJECT_SAMPLE_SIZE = 20
+
+# Casts that return NULL instead of aborting the transaction (session-local).
+# Each call opens a subtransaction, so they are only the fallback for values
+# the checks in VALUE_CHECKS cannot decide without casting
+CREATE_TRY_CAST_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION pg_temp.lm_try_date(value TEXT) RETURNS DATE
+LANGUAGE plpgsql STABLE AS $$
+BEGIN
+    RETURN value::DATE;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION pg_temp.lm_try_balance(value TEXT) RETURNS NUMERIC
+LANGUAGE plpgsql STABLE AS $$
+BEGIN
+    RETURN value::DECIMAL(5, 2);
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END;
+$$;
+"""
+
+# Set-based validity checks of the staged TEXT values, formatted into
+# REJECT_EMPLOYEES/REJECT_BALANCES. PostgreSQL 16+ tests the input with
+# pg_input_is_valid(), which does not raise. Older servers check the usual
+# shapes (YYYY-MM-DD, unsigned decimals) with string functions and
+# arithmetic, and only call the EXCEPTION-based casts for anything else
+VALUE_CHECKS = {
+    'pg_input_is_valid': {
+        'join_date_valid': "pg_input_is_valid(join_date, 'date')",
+        'balance_valid': "COALESCE(pg_input_is_valid(balance, 'numeric(5,2)'), false)",
+    },
+    'fallback': {
+        'join_date_valid': """CASE
+            WHEN translate(join_date, '0123456789', '0000000000') = '0000-00-00'
+                 AND substr(join_date, 1, 4) <> '0000' AND substr(join_date, 6, 2) BETWEEN '01' AND '12'
+                THEN substr(join_date, 9, 2)::INT BETWEEN 1 AND CASE
+                    WHEN substr(join_date, 6, 2) IN ('04', '06', '09', '11') THEN 30
+                    WHEN substr(join_date, 6, 2) <> '02' THEN 31
+                    WHEN mod(substr(join_date, 1, 4)::INT, 4) = 0
+                         AND (mod(substr(join_date, 1, 4)::INT, 100) <> 0
+                              OR mod(substr(join_date, 1, 4)::INT, 400) = 0) THEN 29
+                    ELSE 28
+                END
+            ELSE pg_temp.lm_try_date(join_date) IS NOT NULL
+        END""",
+        'balance_valid': """CASE
+            WHEN translate(balance, '0123456789', '') IN ('', '.') AND length(balance) BETWEEN 1 AND 20
+                 AND balance <> '.'
+                THEN round(balance::NUMERIC, 2) < 1000
+            ELSE pg_temp.lm_try_balance(balance) IS NOT NULL
+        END""",
+    },
+}
+
+CREATE_STAGING_TABLES = """
+CREATE TEMP TABLE staging_employees (
+    row_number BIGSERIAL,
+    employee_id TEXT, name TEXT, email TEXT, department TEXT, join_date TEXT,
+    parse_error TEXT
+) ON COMMIT DROP;
+
+CREATE TEMP TABLE staging_balances (
+    row_number BIGSERIAL,
+    employee_id TEXT, leave_type TEXT, balance TEXT,
+    parse_error TEXT
+) ON COMMIT DROP;
+
+CREATE TEMP TABLE import_rejects (
+    source TEXT, row_number BIGINT, employee_id TEXT, reason TEXT
+) ON COMMIT DROP;
+"""
+
+# One reason per bad row; later rows win over earlier duplicates.
+# {join_date_valid}/{balance_valid} come from VALUE_CHECKS
+REJECT_EMPLOYEES = """
+INSERT INTO import_rejects (source, row_number, employee_id, reason)
+SELECT 'employees', row_number, employee_id,
+    CASE
+        WHEN parse_error IS NOT NULL THEN parse_error
+        WHEN NULLIF(btrim(employee_id), '') IS NULL THEN 'missing employee_id'
+        WHEN length(btrim(employee_id)) > 20 THEN 'employee_id longer than 20 characters'
+        WHEN NULLIF(btrim(name), '') IS NULL THEN 'missing name'
+        WHEN length(btrim(name)) > 100 THEN 'name longer than 100 characters'
+        WHEN length(email) > 100 THEN 'email longer than 100 characters'
+        WHEN length(department) > 50 THEN 'department longer than 50 characters'
+        WHEN NOT join_date_valid THEN 'invalid join_date'
+        ELSE 'duplicate employee_id (a later row wins)'
+    END
+FROM (
+    SELECT s.*, row_number() OVER (PARTITION BY btrim(employee_id) ORDER BY row_number DESC) AS occurrence,
+           NULLIF(btrim(join_date), '') IS NULL OR {join_date_valid} AS join_date_valid
+    FROM staging_employees s
+) s
+WHERE parse_error IS NOT NULL
+   OR NULLIF(btrim(employee_id), '') IS NULL
+   OR length(btrim(employee_id)) > 20
+   OR NULLIF(btrim(name), '') IS NULL
+   OR length(btrim(name)) > 100
+   OR length(email) > 100
+   OR length(department) > 50
+   OR NOT join_date_valid
+   OR occurrence > 1;
+"""
+
+# Only rows that passed REJECT_EMPLOYEES are cast, so the casts cannot fail
+UPSERT_EMPLOYEES = """
+INSERT INTO employees (employee_id, name, email, department, join_date)
+SELECT btrim(employee_id), btrim(name), NULLIF(btrim(email), ''), NULLIF(btrim(department), ''),
+       NULLIF(btrim(join_date), '')::DATE
+FROM staging_employees s
+WHERE NOT EXISTS (
+    SELECT 1 FROM import_rejects r WHERE r.source = 'employees' AND r.row_number = s.row_number
+)
+ON CONFLICT (employee_id) DO UPDATE
+SET name = EXCLUDED.name,
+    email = EXCLUDED.email,
+    department = EXCLUDED.department,
+    join_date = EXCLUDED.join_date;
+"""
+
+REJECT_BALANCES = """
+INSERT INTO import_rejects (source, row_number, employee_id, reason)
+SELECT 'balances', row_number, employee_id,
+    CASE
+        WHEN parse_error IS NOT NULL THEN parse_error
+        WHEN NULLIF(btrim(employee_id), '') IS NULL THEN 'missing employee_id'
+        WHEN NULLIF(btrim(leave_type), '') IS NULL THEN 'missing leave_type'
+        WHEN btrim(leave_type) <> ALL(%(leave_types)s) THEN 'unknown leave_type'
+        WHEN NOT balance_valid THEN 'invalid balance'
+        WHEN NOT EXISTS (SELECT 1 FROM employees e WHERE e.employee_id = btrim(s.employee_id))
+            THEN 'unknown employee_id'
+        ELSE 'duplicate employee_id/leave_type (a later row wins)'
+    END
+FROM (
+    SELECT s.*, row_number() OVER (
+        PARTITION BY btrim(employee_id), btrim(leave_type) ORDER BY row_number DESC
+    ) AS occurrence,
+           {balance_valid} AS balance_valid
+    FROM staging_balances s
+) s
+WHERE parse_error IS NOT NULL
+   OR NULLIF(btrim(employee_id), '') IS NULL
+   OR NULLIF(btrim(leave_type), '') IS NULL
+   OR btrim(leave_type) <> ALL(%(leave_types)s)
+   OR NOT balance_valid
+   OR NOT EXISTS (SELECT 1 FROM employees e WHERE e.employee_id = btrim(s.employee_id))
+   OR occurrence > 1;
+"""
+
+UPSERT_BALANCES = """
+INSERT INTO leave_balance (employee_id, leave_type, balance, updated_at)
+SELECT btrim(employee_id), btrim(leave_type), balance::DECIMAL(5, 2), CURRENT_TIMESTAMP
+FROM staging_balances s
+WHERE NOT EXISTS (
+    SELECT 1 FROM import_rejects r WHERE r.source = 'balances' AND r.row_number = s.row_number
+)
+ON CONFLICT (employee_id, leave_type) DO UPDATE
+SET balance = EXCLUDED.balance, updated_at = CURRENT_TIMESTAMP;
+"""
+
+
+class CsvRowStream(io.TextIOBase):
+    """
+    Read-only text stream that renders an iterable of rows as CSV lines on
+    demand, so COPY ... FROM STDIN can consume a generator without the rows
+    ever being held in memory together. None becomes an empty (NULL) field.
+    """
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = ''
+        self._out = io.StringIO()
+        self._writer = csv.writer(self._out)
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            line = self._next_line()
+            if line is None:
+                break
+            self._buffer += line
+        if size < 0:
+            chunk, self._buffer = self._buffer, ''
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+    def readline(self, size=-1):
+        if not self._buffer:
+            self._buffer = self._next_line() or ''
+        line, self._buffer = self._buffer, ''
+        return line
+
+    def _next_line(self):
+        row = next(self._rows, None)
+        if row is None:
+            return None
+        self._out.seek(0)
+        self._out.truncate()
+        self._writer.writerow(['' if value is None else value for value in row])
+        return self._out.getvalue()
+
+
+class JsonLinesReader(CsvRowStream):
+    """
+    Presents a JSONL file as CSV text, one line at a time, so COPY can
+    stream it. A line that is not a JSON object becomes a row carrying
+    only a parse_error.
+    """
+
+    def __init__(self, source, columns):
+        super().__init__(self._records(source, columns))
+
+    @staticmethod
+    def _records(source, columns):
+        for line_number, raw in enumerate(source, 1):
+            if not raw.strip():
+                continue
+            try:
+                record = json.loads(raw)
+                if not isinstance(record, dict):
+                    raise ValueError("not a JSON object")
+                yield [JsonLinesReader._text(record.get(column)) for column in columns] + [None]
+            except ValueError as e:
+                yield [None] * len(columns) + [f"invalid JSON on line {line_number}: {e}"]
+
+    @staticmethod
+    def _text(value):
+        if value is None:
+            return None
+        return value if isinstance(value, str) else str(value)
+
+
+class CsvFileReader(CsvRowStream):
+    """
+    Re-renders the rows of a CSV file (read past its header) with exactly
+    `width` fields, so COPY never meets a malformed line. A row with the
+    wrong number of fields is padded or truncated and carries a
+    parse_error, as does a row csv.reader cannot parse.
+    """
+
+    def __init__(self, reader, width):
+        super().__init__(self._records(reader, width))
+
+    @staticmethod
+    def _records(reader, width):
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield [None] * width + [f"invalid CSV on line {reader.line_num}: {e}"]
+                continue
+            if not row:
+                continue
+            error = None
+            if len(row) != width:
+                error = f"wrong column count on line {reader.line_num}"
+                row = (row + [None] * width)[:width]
+            yield row + [error]
+
+
+class BulkImporter:
+    """Loads employees and leave balances from CSV or JSONL files"""
+
+    def __init__(self):
+        self.db = DatabaseConnection()
+
+    def run(self, employees_path=None, balances_path=None, rejects_path=None):
+        """
+        Import both files (either may be omitted) in one transaction
+        Returns a report dict: rows staged, upserted and rejected per file,
+        plus the first REJECT_SAMPLE_SIZE rejects as (source, row, employee_id, reason)
+        """
+        report = {'employees': None, 'balances': None, 'rejects': []}
+        connection = self.db.get_connection()
+        try:
+            cursor = connection.cursor()
+            if connection.server_version >= 160000:
+                checks = VALUE_CHECKS['pg_input_is_valid']
+            else:
+                checks = VALUE_CHECKS['fallback']
+                cursor.execute(CREATE_TRY_CAST_FUNCTIONS)
+            cursor.execute(CREATE_STAGING_TABLES)
+
+            if employees_path:
+                staged = self._stage(cursor, employees_path, 'staging_employees', EMPLOYEE_COLUMNS)
+                cursor.execute(REJECT_EMPLOYEES.format(**checks))
+                rejected = cursor.rowcount
+                cursor.execute(UPSERT_EMPLOYEES)
+                report['employees'] = {'staged': staged, 'upserted': cursor.rowcount, 'rejected': rejected}
+
+            if balances_path:
+                staged = self._stage(cursor, balances_path, 'staging_balances', BALANCE_COLUMNS)
+                cursor.execute(REJECT_BALANCES.format(**checks), {'leave_types': list(LEAVE_TYPES)})
+                rejected = cursor.rowcount
+                cursor.execute(UPSERT_BALANCES)
+                report['balances'] = {'staged': staged, 'upserted': cursor.rowcount, 'rejected': rejected}
+
+            if rejects_path:
+                with open(rejects_path, 'w', encoding='utf-8', newline='') as f:
+                    cursor.copy_expert(
+                        "COPY (SELECT source, row_number, employee_id, reason FROM import_rejects "
+                        "ORDER BY source, row_number) TO STDOUT WITH (FORMAT csv, HEADER true);", f
+                    )
+            cursor.execute(
+                "SELECT source, row_number, employee_id, reason FROM import_rejects "
+                "ORDER BY source, row_number LIMIT %s;", (REJECT_SAMPLE_SIZE,)
+            )
+            report['rejects'] = cursor.fetchall()
+
+            connection.commit()
+            cursor.close()
+        finally:
+            self.db.return_connection(connection)
+
+        # Cached employees and balances may be stale now
+        query_cache.invalidate([('leave_balance', None)])
+        if employees_path:
+            EmployeeDirectory.instance().invalidate()
+        return report
+
+    def _stage(self, cursor, path, table, columns):
+        """COPY a CSV or JSONL file into a staging table; returns the row count"""
+        with open(path, encoding='utf-8', newline='') as f:
+            if os.path.splitext(path)[1].lower() in ('.jsonl', '.ndjson'):
+                source = JsonLinesReader(f, columns)
+                file_columns = columns + ['parse_error']
+            else:
+                # Map the header onto staging columns, so column order in the file doesn't matter
+                reader = csv.reader(f, strict=True)
+                header = next(reader, [])
+                file_columns = [name.strip().lower() for name in header]
+                unknown = set(file_columns) - set(columns)
+                if unknown or 'employee_id' not in file_columns:
+                    raise ValueError(
+                        f"{path}: expected CSV header columns from {columns}, got {header}"
+                    )
+                source = CsvFileReader(reader, len(file_columns))
+                file_columns = file_columns + ['parse_error']
+            cursor.copy_expert(
+                f"COPY {table} ({', '.join(file_columns)}) FROM STDIN WITH (FORMAT csv);", source
+            )
+            return cursor.rowcount
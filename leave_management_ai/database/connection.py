@@ -1,9 +1,15 @@
 """
 PostgreSQL database connection handler
 """
+import threading
+import time
+
 import psycopg2
-from psycopg2 import pool
-from leave_management_ai.config.settings import DB_CONFIG
+from leave_management_ai.config.settings import DB_CONFIG, POOL_CONFIG, QUERY_CONFIG
+from leave_management_ai.database.instrumentation import query_stats
+from leave_management_ai.database.pool import ThreadedConnectionPool, PoolTimeoutError, format_pool_metrics
+from leave_management_ai.database.prepared import statement_registry
+from leave_management_ai.database.query_cache import QueryResultCache
 
 
 class DatabaseConnection:
@@ -11,18 +17,25 @@ class DatabaseConnection:
     
     _instance = None
     _connection_pool = None
+    _instance_lock = threading.Lock()
     
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(DatabaseConnection, cls).__new__(cls)
-            cls._instance._initialize_pool()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(DatabaseConnection, cls).__new__(cls)
+                    instance._initialize_pool()
+                    cls._instance = instance
         return cls._instance
     
     def _initialize_pool(self):
-        """Initialize connection pool"""
+        """Initialize connection pool and prewarm its minimum connections"""
         try:
-            self._connection_pool = psycopg2.pool.SimpleConnectionPool(
-                1, 20,  # min and max connections
+            self._connection_pool = ThreadedConnectionPool(
+                POOL_CONFIG['min_connections'],
+                POOL_CONFIG['max_connections'],
+                acquire_timeout=POOL_CONFIG['acquire_timeout'],
+                health_check_after=POOL_CONFIG['health_check_after'],
                 host=DB_CONFIG['host'],
                 port=DB_CONFIG['port'],
                 database=DB_CONFIG['database'],
@@ -34,17 +47,31 @@ class DatabaseConnection:
             print(f"✗ Error creating connection pool: {e}")
             raise
     
-    def get_connection(self):
-        """Get a connection from the pool"""
+    def get_connection(self, timeout=None):
+        """Get a connection from the pool, waiting up to `timeout` seconds"""
+        started = time.perf_counter()
         try:
-            return self._connection_pool.getconn()
+            connection = self._connection_pool.getconn(timeout)
+            query_stats.record_pool_wait(time.perf_counter() - started)
+            return connection
+        except PoolTimeoutError as e:
+            print(f"✗ Connection pool exhausted: {e}")
+            raise
         except Exception as e:
             print(f"✗ Error getting connection: {e}")
             raise
     
-    def return_connection(self, connection):
+    def return_connection(self, connection, close=False):
         """Return connection to the pool"""
-        self._connection_pool.putconn(connection)
+        self._connection_pool.putconn(connection, close=close)
+    
+    def get_pool_stats(self):
+        """Get in-use/idle/waiter gauges and wait-time counters for the pool"""
+        return self._connection_pool.stats()
+    
+    def get_pool_metrics(self):
+        """Get pool stats in Prometheus text format for scraping"""
+        return format_pool_metrics(self.get_pool_stats())
     
     def close_all_connections(self):
         """Close all connections in the pool"""
@@ -53,13 +80,22 @@ class DatabaseConnection:
             print("✓ All database connections closed")
 
 
+# Process-wide result cache for tagged reads (see execute_query)
+query_cache = QueryResultCache(
+    maxsize=QUERY_CONFIG['result_cache_size'],
+    ttl=QUERY_CONFIG['result_cache_ttl_seconds'],
+    max_rows=QUERY_CONFIG['result_cache_max_rows']
+)
+
+
 def get_db_connection():
     """Helper function to get database connection"""
     db = DatabaseConnection()
     return db.get_connection()
 
 
-def execute_query(query, params=None, fetch=False):
+def execute_query(query, params=None, fetch=False, commit=None,
+                  cache_tags=None, invalidates=None, bypass_cache=False):
     """
     Execute a database query with automatic connection management
     
@@ -67,33 +103,95 @@ def execute_query(query, params=None, fetch=False):
         query: SQL query string
         params: Query parameters (tuple or dict)
         fetch: Whether to fetch results (True for SELECT)
+        commit: Whether to commit; defaults to `not fetch`. Pass True for
+            writes that return rows (RETURNING, server-side functions)
+        cache_tags: (table, employee_id) pairs a read depends on; the result
+            is served from / stored in the query cache
+        invalidates: (table, employee_id) pairs a write touches; matching
+            cached results are evicted after commit
+        bypass_cache: Skip the cache lookup for a strongly consistent read
     
     Returns:
         Query results if fetch=True, else None
     """
+    use_cache = fetch and cache_tags and QUERY_CONFIG['result_cache']
+    if use_cache:
+        cache_key = query_cache.make_key(query, params)
+        cache_generation = query_cache.generation
+        if not bypass_cache:
+            cached = query_cache.get(cache_key)
+            if cached is not None:
+                return cached
+    
     db = DatabaseConnection()
     connection = None
+    broken = False
     
     try:
         connection = db.get_connection()
         cursor = connection.cursor()
         
-        cursor.execute(query, params)
+        if commit is None:
+            commit = not fetch
         
-        if fetch:
-            results = cursor.fetchall()
-            cursor.close()
-            return results
-        else:
+        with query_stats.statement(query, params) as statement:
+            cursor.execute(query, params)
+            results = cursor.fetchall() if fetch else None
+            statement.rows = cursor.rowcount
+        if commit:
             connection.commit()
-            cursor.close()
-            return None
+        cursor.close()
+        
+        if invalidates:
+            query_cache.invalidate(invalidates)
+        if use_cache:
+            query_cache.set(cache_key, results, cache_tags, cache_generation)
+        return results
             
     except Exception as e:
+        # Connections that died mid-query are discarded instead of reused
+        broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+        if connection and not broken:
+            connection.rollback()
+        print(f"✗ Database error: {e}")
+        raise
+    finally:
         if connection:
+            db.return_connection(connection, close=broken)
+
+
+def execute_prepared(name, params=None, fetch=False):
+    """
+    Execute a statement registered with statement_registry by name.
+    The statement is prepared once per pooled connection and reused after that.
+    Falls back to plain execute_query when prepared statements are disabled.
+    """
+    if not QUERY_CONFIG['prepared_statements']:
+        return execute_query(statement_registry.get_query(name), params, fetch)
+    
+    db = DatabaseConnection()
+    connection = None
+    broken = False
+    
+    try:
+        connection = db.get_connection()
+        cursor = connection.cursor()
+        
+        with query_stats.statement(statement_registry.get_query(name), params, name=name) as statement:
+            statement_registry.execute(cursor, name, params)
+            results = cursor.fetchall() if fetch else None
+            statement.rows = cursor.rowcount
+        if not fetch:
+            connection.commit()
+        cursor.close()
+        return results
+            
+    except Exception as e:
+        broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+        if connection and not broken:
             connection.rollback()
         print(f"✗ Database error: {e}")
         raise
     finally:
         if connection:
-            db.return_connection(connection)
\ No newline at end of file
+            db.return_connection(connection, close=broken)
@@ -0,0 +1,160 @@
+"""
+In-process employee directory cache
+"""
+import threading
+import time
+
+from leave_management_ai.cache import TTLCache, BloomFilter
+from leave_management_ai.config.settings import CACHE_CONFIG
+from leave_management_ai.database.connection import DatabaseConnection
+from leave_management_ai.database.operations import EmployeeOperations
+from leave_management_ai.database import queries
+
+
+class EmployeeDirectory:
+    """
+    Caches employee rows so validating the employee on every chat turn
+    costs at most one query and usually none.
+
+    After `preload()` a Bloom filter of every known employee ID rejects
+    made-up IDs without touching the database. Employees added by this
+    process go into the filter at once. Those created elsewhere (an import,
+    another app instance) are missed only while the filter is trusted: once
+    it is older than `directory_refresh_seconds` (a minute, like the
+    negative cache) lookups go to the database while it is rebuilt in the
+    background.
+    """
+    
+    _instance = None
+    _instance_lock = threading.Lock()
+    _NOT_FOUND = ()    # cached marker for IDs the database says don't exist
+    
+    def __init__(self):
+        self._cache = TTLCache(
+            maxsize=CACHE_CONFIG['employee_cache_size'],
+            ttl=CACHE_CONFIG['employee_ttl_seconds']
+        )
+        self._bloom = None
+        self._bloom_built_at = None
+        self._preload_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()    # held while a background rebuild runs
+        self.bloom_rejections = 0
+        self.queries = 0
+    
+    @classmethod
+    def instance(cls):
+        """Get the process-wide directory"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+    
+    def get(self, employee_id):
+        """Get an employee row by ID, or None if the employee doesn't exist"""
+        if not employee_id:
+            return None
+        
+        # Read once: invalidate() may reset self._bloom from another thread
+        bloom = self._bloom
+        if self._bloom_is_fresh(bloom) and not bloom.might_contain(employee_id):
+            self.bloom_rejections += 1
+            return None
+        
+        employee = self._cache.get(employee_id)
+        if employee is not None:
+            return employee or None
+        
+        self.queries += 1
+        employee = EmployeeOperations.get_employee(employee_id)
+        if employee is None:
+            self._cache.set(employee_id, self._NOT_FOUND, ttl=CACHE_CONFIG['employee_negative_ttl_seconds'])
+        else:
+            self._cache.set(employee_id, employee)
+        return employee
+    
+    def exists(self, employee_id):
+        """Check if an employee exists"""
+        return self.get(employee_id) is not None
+    
+    def preload(self):
+        """
+        Bulk-load the employees table: warm the cache (up to its size)
+        and rebuild the Bloom filter from every employee ID
+        """
+        with self._preload_lock:
+            db = DatabaseConnection()
+            connection = db.get_connection()
+            try:
+                count_cursor = connection.cursor()
+                count_cursor.execute("SELECT COUNT(*) FROM employees;")
+                expected = count_cursor.fetchone()[0]
+                count_cursor.close()
+                
+                bloom = BloomFilter(expected * 2 + 1000, CACHE_CONFIG['bloom_false_positive_rate'])
+                
+                # Named (server-side) cursor streams rows instead of fetching them all
+                cursor = connection.cursor(name='employee_directory_preload')
+                cursor.itersize = 5000
+                cursor.execute(queries.GET_ALL_EMPLOYEES)
+                loaded = 0
+                for row in cursor:
+                    bloom.add(row[0])
+                    if loaded < self._cache.maxsize:
+                        self._cache.set(row[0], row)
+                    loaded += 1
+                cursor.close()
+                connection.rollback()
+            finally:
+                db.return_connection(connection)
+            
+            # Timestamp first, so a reader never sees the filter without it
+            self._bloom_built_at = time.monotonic()
+            self._bloom = bloom
+            return loaded
+    
+    def add(self, employee_row):
+        """Record an employee created by this process"""
+        self._cache.set(employee_row[0], employee_row)
+        bloom = self._bloom
+        if bloom is not None:
+            bloom.add(employee_row[0])
+    
+    def invalidate(self, employee_id=None):
+        """Forget one employee, or everything if no ID is given"""
+        if employee_id is None:
+            self._cache.clear()
+            self._bloom = None
+        else:
+            self._cache.pop(employee_id)
+    
+    def stats(self):
+        """Cache counters plus Bloom filter rejections and database lookups"""
+        stats = self._cache.stats()
+        bloom = self._bloom
+        stats.update({
+            'bloom_loaded': bloom is not None,
+            'bloom_items': bloom.count if bloom else 0,
+            'bloom_rejections': self.bloom_rejections,
+            'queries': self.queries
+        })
+        return stats
+    
+    def _bloom_is_fresh(self, bloom):
+        """Trust the Bloom filter `bloom` only while it is recent; refresh it otherwise"""
+        if bloom is None:
+            return False
+        if time.monotonic() - self._bloom_built_at < CACHE_CONFIG['directory_refresh_seconds']:
+            return True
+        # Only the thread that takes the lock starts a rebuild; it is released when that ends
+        if self._refresh_lock.acquire(blocking=False):
+            threading.Thread(target=self._background_refresh, daemon=True).start()
+        return False
+    
+    def _background_refresh(self):
+        try:
+            self.preload()
+        except Exception as e:
+            print(f"⚠ Employee directory refresh failed: {e}")
+        finally:
+            self._refresh_lock.release()
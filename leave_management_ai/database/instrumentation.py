@@ -0,0 +1,280 @@
+"""
+Per-statement database instrumentation
+
+Every statement sent through execute_query, execute_prepared (and the
+async layer) or one of the direct cursor paths is timed and counted,
+together with the time spent waiting for a pool connection. Work is
+attributed to the chat turn (and so the intent) that caused it through a
+context variable, which follows both threads and asyncio tasks.
+Statements slower than `slow_query_ms` are appended to a JSON-lines
+slow-query log with their parameters redacted.
+"""
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+from leave_management_ai.config.settings import INSTRUMENTATION_CONFIG
+from leave_management_ai.database import queries
+
+
+# Intent label used for database work done outside a chat turn
+NO_INTENT = 'none'
+
+_WHITESPACE = re.compile(r'\s+')
+
+_current_turn = ContextVar('leave_db_turn', default=None)
+
+
+def normalize_sql(query):
+    """Collapse whitespace so the same statement always has the same text"""
+    return _WHITESPACE.sub(' ', str(query)).strip()
+
+
+def redact_params(params):
+    """Replace parameter values by their type names, keeping the shape"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [f"<{type(value).__name__}>" for value in params]
+    return f"<{type(params).__name__}>"
+
+
+class Turn:
+    """Database work done while handling one chat message"""
+
+    __slots__ = ('intent', 'round_trips', 'db_seconds', 'pool_wait_seconds')
+
+    def __init__(self, intent):
+        self.intent = intent
+        self.round_trips = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+
+
+class StatementTimer:
+    """Set `rows` inside QueryStats.statement() to record the row count"""
+
+    __slots__ = ('rows',)
+
+    def __init__(self):
+        self.rows = None
+
+
+class QueryStats:
+    """
+    Thread-safe counters keyed by (intent, statement)
+
+    Statements from database/queries.py are labelled with their constant
+    name (e.g. GET_BALANCE), prepared statements with their registered
+    name (e.g. get_balance); anything else with the start of its
+    normalized text.
+    """
+
+    def __init__(self, slow_query_ms=None, slow_query_log=None, enabled=None):
+        self.enabled = INSTRUMENTATION_CONFIG['enabled'] if enabled is None else enabled
+        self.slow_query_ms = (INSTRUMENTATION_CONFIG['slow_query_ms']
+                              if slow_query_ms is None else slow_query_ms)
+        self.slow_query_log = (INSTRUMENTATION_CONFIG['slow_query_log']
+                               if slow_query_log is None else slow_query_log)
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self._labels = None
+        self.reset()
+
+    def reset(self):
+        """Zero every counter"""
+        with self._lock:
+            self._statements = {}    # (intent, statement) -> [calls, errors, seconds, max seconds, rows]
+            self._pool_waits = {}    # intent -> [acquisitions, seconds]
+            self._turns = {}         # intent -> [turns, round trips, max round trips, db seconds]
+            self._slow_queries = 0
+
+    @contextmanager
+    def turn(self, intent):
+        """Attribute the database work done inside the block to one chat turn"""
+        current = Turn(intent or NO_INTENT)
+        token = _current_turn.set(current)
+        try:
+            yield current
+        finally:
+            _current_turn.reset(token)
+            if self.enabled:
+                with self._lock:
+                    totals = self._turns.setdefault(current.intent, [0, 0, 0, 0.0])
+                    totals[0] += 1
+                    totals[1] += current.round_trips
+                    totals[2] = max(totals[2], current.round_trips)
+                    totals[3] += current.db_seconds
+
+    @contextmanager
+    def statement(self, query, params=None, name=None):
+        """
+        Time one round trip (execute plus fetch) of `query`
+        An exception raised inside the block is counted as an error and re-raised.
+        """
+        if not self.enabled:
+            yield StatementTimer()
+            return
+
+        timer = StatementTimer()
+        error = None
+        started = time.perf_counter()
+        try:
+            yield timer
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self._record(name or self.label(query), query, params, elapsed, timer.rows, error)
+
+    def record_pool_wait(self, seconds):
+        """Record the time one caller spent acquiring a pool connection"""
+        if not self.enabled:
+            return
+        current = _current_turn.get()
+        if current is not None:
+            current.pool_wait_seconds += seconds
+        intent = current.intent if current is not None else NO_INTENT
+        with self._lock:
+            totals = self._pool_waits.setdefault(intent, [0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+
+    def label(self, query):
+        """Name of a statement for metrics"""
+        if self._labels is None:
+            self._labels = {
+                normalize_sql(value): name for name, value in vars(queries).items()
+                if name.isupper() and isinstance(value, str)
+            }
+        text = normalize_sql(query)
+        return self._labels.get(text) or text[:60]
+
+    def _record(self, statement, query, params, seconds, rows, error):
+        current = _current_turn.get()
+        if current is not None:
+            current.round_trips += 1
+            current.db_seconds += seconds
+        intent = current.intent if current is not None else NO_INTENT
+
+        slow = seconds * 1000 >= self.slow_query_ms
+        with self._lock:
+            totals = self._statements.setdefault((intent, statement), [0, 0, 0.0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += error is not None
+            totals[2] += seconds
+            totals[3] = max(totals[3], seconds)
+            totals[4] += rows if rows is not None and rows > 0 else 0
+            if slow:
+                self._slow_queries += 1
+
+        if slow and self.slow_query_log:
+            self._log_slow_query({
+                'at': datetime.now().isoformat(timespec='milliseconds'),
+                'intent': intent,
+                'statement': statement,
+                'duration_ms': round(seconds * 1000, 2),
+                'rows': rows,
+                'error': type(error).__name__ if error is not None else None,
+                'query': normalize_sql(query)[:2000],
+                'params': redact_params(params)
+            })
+
+    def _log_slow_query(self, entry):
+        """Append one entry to the slow-query log; never fails the query"""
+        try:
+            with self._log_lock, open(self.slow_query_log, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        except OSError as e:
+            print(f"⚠ Could not write slow-query log: {e}")
+
+    def stats(self):
+        """
+        Get a JSON-serializable snapshot of every counter
+        Returns dict with 'statements', 'pool_waits', 'turns' and 'slow_queries'
+        """
+        with self._lock:
+            statements = [
+                {'intent': intent, 'statement': statement, 'calls': calls, 'errors': errors,
+                 'seconds_total': seconds, 'seconds_max': seconds_max, 'rows_total': rows}
+                for (intent, statement), (calls, errors, seconds, seconds_max, rows)
+                in self._statements.items()
+            ]
+            pool_waits = {intent: {'acquisitions': count, 'seconds_total': seconds}
+                          for intent, (count, seconds) in self._pool_waits.items()}
+            turns = {intent: {'turns': count, 'round_trips_total': trips,
+                              'round_trips_max': trips_max, 'db_seconds_total': seconds}
+                     for intent, (count, trips, trips_max, seconds) in self._turns.items()}
+            slow_queries = self._slow_queries
+
+        statements.sort(key=lambda entry: entry['seconds_total'], reverse=True)
+        return {'statements': statements, 'pool_waits': pool_waits,
+                'turns': turns, 'slow_queries': slow_queries}
+
+    def dump(self, path):
+        """Write stats() as JSON to `path`"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.stats(), f, indent=2)
+
+    def metrics(self, prefix='leave_db'):
+        """Get the counters in Prometheus text exposition format for scraping"""
+        return format_query_metrics(self.stats(), prefix)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+def format_query_metrics(stats, prefix='leave_db'):
+    """Render QueryStats.stats() in Prometheus text exposition format"""
+    families = {
+        'statement_calls_total': ('counter', []),
+        'statement_errors_total': ('counter', []),
+        'statement_seconds_total': ('counter', []),
+        'statement_seconds_max': ('gauge', []),
+        'statement_rows_total': ('counter', []),
+        'pool_acquisitions_total': ('counter', []),
+        'pool_acquire_seconds_total': ('counter', []),
+        'turns_total': ('counter', []),
+        'turn_round_trips_total': ('counter', []),
+        'turn_round_trips_max': ('gauge', []),
+        'turn_db_seconds_total': ('counter', []),
+    }
+
+    for entry in stats['statements']:
+        labels = f'intent="{_escape(entry["intent"])}",statement="{_escape(entry["statement"])}"'
+        families['statement_calls_total'][1].append((labels, entry['calls']))
+        families['statement_errors_total'][1].append((labels, entry['errors']))
+        families['statement_seconds_total'][1].append((labels, entry['seconds_total']))
+        families['statement_seconds_max'][1].append((labels, entry['seconds_max']))
+        families['statement_rows_total'][1].append((labels, entry['rows_total']))
+    for intent, entry in stats['pool_waits'].items():
+        labels = f'intent="{_escape(intent)}"'
+        families['pool_acquisitions_total'][1].append((labels, entry['acquisitions']))
+        families['pool_acquire_seconds_total'][1].append((labels, entry['seconds_total']))
+    for intent, entry in stats['turns'].items():
+        labels = f'intent="{_escape(intent)}"'
+        families['turns_total'][1].append((labels, entry['turns']))
+        families['turn_round_trips_total'][1].append((labels, entry['round_trips_total']))
+        families['turn_round_trips_max'][1].append((labels, entry['round_trips_max']))
+        families['turn_db_seconds_total'][1].append((labels, entry['db_seconds_total']))
+
+    lines = []
+    for name, (metric_type, samples) in families.items():
+        lines.append(f"# TYPE {prefix}_{name} {metric_type}")
+        for labels, value in samples:
+            lines.append(f"{prefix}_{name}{{{labels}}} {value}")
+    lines.append(f"# TYPE {prefix}_slow_queries_total counter")
+    lines.append(f"{prefix}_slow_queries_total {stats['slow_queries']}")
+    return '\n'.join(lines) + '\n'
+
+
+# Process-wide recorder used by the connection helpers
+query_stats = QueryStats()
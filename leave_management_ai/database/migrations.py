@@ -0,0 +1,447 @@
+"""
+Versioned schema migrations
+
+Each migration is a numbered, ordered list of steps. Applied versions are
+recorded in the schema_migrations table, together with how far an
+unfinished migration got, so an interrupted run resumes where it stopped.
+
+Steps are written to be safe on a live database:
+- SqlStep runs short DDL under `lock_timeout`, so it fails fast instead of
+  queueing behind a long transaction and blocking every writer behind it
+- ConcurrentIndexStep uses CREATE INDEX CONCURRENTLY (no write lock) and
+  rebuilds an index that a failed build left INVALID
+- BackfillStep updates rows in small id-range batches, one transaction each
+"""
+import time
+
+import psycopg2
+
+from leave_management_ai.config.settings import MIGRATION_CONFIG
+from leave_management_ai.database.connection import DatabaseConnection
+from leave_management_ai.database.models import INDEXES
+
+
+CREATE_SCHEMA_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name VARCHAR(200) NOT NULL,
+    completed_steps INTEGER NOT NULL DEFAULT 0,
+    backfill_cursor BIGINT,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    applied_at TIMESTAMP
+);
+"""
+
+# Arbitrary key for pg_advisory_lock so two runners never interleave
+MIGRATION_LOCK_KEY = 724150311
+
+
+class SqlStep:
+    """Plain SQL run in its own short transaction"""
+
+    def __init__(self, sql, description=None):
+        self.sql = sql
+        self.description = description or ' '.join(sql.split())[:100]
+
+    def describe(self):
+        return self.description
+
+    def apply(self, runner, connection, version):
+        cursor = connection.cursor()
+        cursor.execute(self.sql)
+        cursor.close()
+        connection.commit()
+
+
+class ConcurrentIndexStep:
+    """CREATE INDEX CONCURRENTLY, retried if the build leaves an INVALID index"""
+
+    def __init__(self, name, table, columns, using=None, where=None, unique=False):
+        self.name = name
+        self.table = table
+        self.columns = columns
+        self.using = using
+        self.where = where
+        self.unique = unique
+
+    def sql(self):
+        unique = 'UNIQUE ' if self.unique else ''
+        using = f" USING {self.using}" if self.using else ''
+        where = f" WHERE {self.where}" if self.where else ''
+        return (f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {self.name} "
+                f"ON {self.table}{using} ({self.columns}){where};")
+
+    def describe(self):
+        return self.sql()
+
+    def apply(self, runner, connection, version):
+        # CONCURRENTLY cannot run inside a transaction block
+        connection.commit()
+        connection.autocommit = True
+        try:
+            cursor = connection.cursor()
+            for attempt in range(MIGRATION_CONFIG['index_build_retries'] + 1):
+                if self._is_invalid(cursor):
+                    # IF NOT EXISTS would otherwise keep the broken index
+                    print(f"  ⚠ {self.name} is INVALID from an earlier build; rebuilding")
+                    cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {self.name};")
+                try:
+                    cursor.execute(self.sql())
+                except psycopg2.Error as e:
+                    if attempt == MIGRATION_CONFIG['index_build_retries']:
+                        raise
+                    print(f"  ⚠ Building {self.name} failed ({e}); retrying")
+                    continue
+                if not self._is_invalid(cursor):
+                    break
+            else:
+                raise RuntimeError(f"Index {self.name} is still INVALID after retries")
+            cursor.close()
+        finally:
+            connection.autocommit = False
+
+    def _is_invalid(self, cursor):
+        cursor.execute("""
+            SELECT NOT i.indisvalid
+            FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = %s;
+        """, (self.name,))
+        row = cursor.fetchone()
+        return bool(row and row[0])
+
+
+class BackfillStep:
+    """
+    Batched UPDATE over id ranges. `update_sql` must restrict itself to
+    `id > %(lo)s AND id <= %(hi)s`; the last finished id is checkpointed
+    after every batch, so a rerun continues from there.
+    """
+
+    def __init__(self, table, update_sql, description, batch_size=None):
+        self.table = table
+        self.update_sql = update_sql
+        self.description = description
+        self.batch_size = batch_size or MIGRATION_CONFIG['backfill_batch_size']
+
+    def describe(self):
+        return f"backfill {self.table} in batches of {self.batch_size}: {self.description}"
+
+    def apply(self, runner, connection, version):
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {self.table};")
+        max_id = cursor.fetchone()[0]
+        lo = runner.backfill_cursor(cursor, version) or 0
+        connection.commit()
+
+        updated = 0
+        while lo < max_id:
+            hi = min(lo + self.batch_size, max_id)
+            cursor.execute(self.update_sql, {'lo': lo, 'hi': hi})
+            updated += cursor.rowcount
+            cursor.execute("UPDATE schema_migrations SET backfill_cursor = %s WHERE version = %s;",
+                           (hi, version))
+            connection.commit()
+            lo = hi
+            time.sleep(MIGRATION_CONFIG['backfill_pause_seconds'])
+
+        cursor.execute("UPDATE schema_migrations SET backfill_cursor = NULL WHERE version = %s;", (version,))
+        connection.commit()
+        cursor.close()
+        print(f"  ✓ Backfilled {updated} row(s) in {self.table}")
+
+
+class Migration:
+    """A numbered set of steps applied in order"""
+
+    def __init__(self, version, name, steps):
+        self.version = version
+        self.name = name
+        self.steps = steps
+
+
+# Migration 2: turn leave_transactions into a table partitioned by month.
+# The existing rows stay where they are and become one "legacy" partition
+# bounded by the start of next month. A validated CHECK constraint proves the
+# bound and matching indexes are built concurrently beforehand, so the final
+# ATTACH neither scans the table nor builds indexes under a lock.
+# The cutover uses the later of the checked bound and the start of next month:
+# when a rerun comes after a month boundary, the validated check still proves
+# the later bound, and new rows go to a partition that exists.
+
+LEDGER_LEGACY_BOUND = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'leave_transactions_legacy_bound') THEN
+        EXECUTE format(
+            'ALTER TABLE leave_transactions ADD CONSTRAINT leave_transactions_legacy_bound '
+            'CHECK (transaction_date IS NOT NULL AND transaction_date < %L) NOT VALID',
+            date_trunc('month', LOCALTIMESTAMP) + INTERVAL '1 month'
+        );
+    END IF;
+END;
+$$;
+"""
+
+LEDGER_PARTITION_CUTOVER = """
+DO $$
+DECLARE
+    v_bound TIMESTAMP;
+BEGIN
+    SELECT GREATEST((regexp_match(pg_get_constraintdef(oid), '< ''([^'']+)'''))[1]::TIMESTAMP,
+                    date_trunc('month', LOCALTIMESTAMP) + INTERVAL '1 month') INTO v_bound
+    FROM pg_constraint WHERE conname = 'leave_transactions_legacy_bound';
+
+    ALTER TABLE leave_transactions RENAME TO leave_transactions_legacy;
+    ALTER INDEX idx_leave_transactions_employee RENAME TO leave_transactions_legacy_employee_idx;
+
+    CREATE TABLE leave_transactions (
+        id INTEGER NOT NULL DEFAULT nextval('leave_transactions_id_seq'),
+        employee_id VARCHAR(20) REFERENCES employees(employee_id) ON DELETE CASCADE,
+        leave_type VARCHAR(20) NOT NULL,
+        transaction_type VARCHAR(20) NOT NULL,
+        amount DECIMAL(5, 2) NOT NULL,
+        balance_before DECIMAL(5, 2) NOT NULL,
+        balance_after DECIMAL(5, 2) NOT NULL,
+        description TEXT,
+        transaction_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    ) PARTITION BY RANGE (transaction_date);
+
+    -- The sequence must outlive the legacy partition once that is archived
+    ALTER SEQUENCE leave_transactions_id_seq OWNED BY leave_transactions.id;
+
+    CREATE INDEX idx_leave_transactions_employee ON leave_transactions (employee_id);
+    CREATE INDEX idx_leave_transactions_date ON leave_transactions USING brin (transaction_date);
+
+    EXECUTE format(
+        'ALTER TABLE leave_transactions ATTACH PARTITION leave_transactions_legacy '
+        'FOR VALUES FROM (MINVALUE) TO (%L)', v_bound
+    );
+    ALTER TABLE leave_transactions_legacy DROP CONSTRAINT leave_transactions_legacy_bound;
+
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF leave_transactions FOR VALUES FROM (%L) TO (%L)',
+        'leave_transactions_' || to_char(v_bound, '"y"YYYY"m"MM'), v_bound, v_bound + INTERVAL '1 month'
+    );
+END;
+$$;
+"""
+
+
+# Migration 4: leave_period and the no-overlap constraint for a leave_requests
+# table created before they existed (new tables get both from CREATE TABLE).
+# A STORED generated column would rewrite the table under an ACCESS EXCLUSIVE
+# lock, so the column is added as a plain one, kept current by a trigger and
+# filled by a batched backfill that touches start_date to fire it.
+# PostgreSQL cannot attach an exclusion constraint to an existing index, so the
+# constraint still builds its own; the GiST index built concurrently beforehand
+# lets the overlap check run without a lock, so existing overlaps fail the step
+# before ADD CONSTRAINT takes one.
+
+LEAVE_PERIOD_COLUMN = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                   WHERE table_name = 'leave_requests' AND column_name = 'leave_period') THEN
+        ALTER TABLE leave_requests ADD COLUMN leave_period DATERANGE;
+
+        CREATE OR REPLACE FUNCTION leave_requests_set_period() RETURNS TRIGGER AS $fn$
+        BEGIN
+            NEW.leave_period := daterange(NEW.start_date, NEW.end_date, '[]');
+            RETURN NEW;
+        END;
+        $fn$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER leave_requests_set_period
+            BEFORE INSERT OR UPDATE OF start_date, end_date ON leave_requests
+            FOR EACH ROW EXECUTE FUNCTION leave_requests_set_period();
+    END IF;
+END;
+$$;
+"""
+
+LEAVE_PERIOD_NO_OVERLAP = """
+DO $$
+DECLARE
+    v_overlaps INTEGER;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'leave_requests_no_overlap') THEN
+        SELECT COUNT(*) INTO v_overlaps
+        FROM leave_requests a JOIN leave_requests b
+          ON a.employee_id = b.employee_id AND a.id < b.id AND a.leave_period && b.leave_period
+        WHERE a.status = 'approved' AND b.status = 'approved';
+        IF v_overlaps > 0 THEN
+            RAISE EXCEPTION '% pair(s) of approved leaves overlap; cancel one of each first', v_overlaps;
+        END IF;
+
+        ALTER TABLE leave_requests ADD CONSTRAINT leave_requests_no_overlap
+            EXCLUDE USING gist (employee_id WITH =, leave_period WITH &&)
+            WHERE (status = 'approved');
+    END IF;
+
+    -- The constraint's own index answers the same lookups
+    DROP INDEX IF EXISTS leave_requests_approved_period_gist;
+END;
+$$;
+"""
+
+
+# Append new migrations with the next version number; never edit applied ones
+MIGRATIONS = [
+    Migration(1, 'lookup indexes', [
+        ConcurrentIndexStep(name, table, columns) for name, table, columns in INDEXES
+    ]),
+    Migration(2, 'partition leave_transactions by month', [
+        BackfillStep(
+            'leave_transactions',
+            "UPDATE leave_transactions SET transaction_date = TIMESTAMP 'epoch' "
+            "WHERE id > %(lo)s AND id <= %(hi)s AND transaction_date IS NULL;",
+            'date undated ledger rows (partition keys cannot be NULL)'
+        ),
+        ConcurrentIndexStep('leave_transactions_legacy_date_brin', 'leave_transactions',
+                            'transaction_date', using='brin'),
+        SqlStep(LEDGER_LEGACY_BOUND, 'bound the existing ledger rows with a NOT VALID check'),
+        SqlStep("ALTER TABLE leave_transactions VALIDATE CONSTRAINT leave_transactions_legacy_bound;"),
+        SqlStep(LEDGER_PARTITION_CUTOVER, 'attach the existing ledger as the legacy partition'),
+    ]),
+    Migration(3, 'keyset index for leave history', [
+        ConcurrentIndexStep('idx_leave_requests_employee_history', 'leave_requests',
+                            'employee_id, requested_at DESC, id DESC'),
+    ]),
+    Migration(4, 'leave_period exclusion for existing leave_requests', [
+        SqlStep(LEAVE_PERIOD_COLUMN, 'add leave_period as a trigger-maintained column (no table rewrite)'),
+        BackfillStep(
+            'leave_requests',
+            "UPDATE leave_requests SET start_date = start_date "
+            "WHERE id > %(lo)s AND id <= %(hi)s AND leave_period IS NULL;",
+            'fill leave_period through its trigger'
+        ),
+        ConcurrentIndexStep('leave_requests_approved_period_gist', 'leave_requests',
+                            'employee_id, leave_period', using='gist', where="status = 'approved'"),
+        SqlStep(LEAVE_PERIOD_NO_OVERLAP, 'check for overlapping approved leaves, then add leave_requests_no_overlap'),
+    ]),
+]
+
+
+class MigrationRunner:
+    """Applies MIGRATIONS that the database has not recorded yet"""
+
+    def __init__(self, migrations=None):
+        self.migrations = sorted(migrations or MIGRATIONS, key=lambda m: m.version)
+
+    def status(self):
+        """
+        Recorded state of every known migration
+        Returns list of (version, name, state) with state 'applied', 'partial' or 'pending'
+        """
+        recorded = self._recorded()
+        result = []
+        for migration in self.migrations:
+            row = recorded.get(migration.version)
+            if row is None:
+                state = 'pending'
+            elif row[1] is None:
+                state = 'partial'
+            else:
+                state = 'applied'
+            result.append((migration.version, migration.name, state))
+        return result
+
+    def plan(self):
+        """
+        Steps a migrate() run would execute, without changing anything
+        Returns list of (version, name, step description)
+        """
+        recorded = self._recorded()
+        plan = []
+        for migration in self.migrations:
+            row = recorded.get(migration.version)
+            if row is not None and row[1] is not None:
+                continue
+            done = row[0] if row else 0
+            for step in migration.steps[done:]:
+                plan.append((migration.version, migration.name, step.describe()))
+        return plan
+
+    def migrate(self):
+        """
+        Apply every pending migration, resuming a partial one
+        Returns the versions applied in this run
+        """
+        db = DatabaseConnection()
+        connection = db.get_connection()
+        applied = []
+        try:
+            cursor = connection.cursor()
+            cursor.execute(CREATE_SCHEMA_MIGRATIONS_TABLE)
+            cursor.execute("SET lock_timeout = %s;", (MIGRATION_CONFIG['lock_timeout'],))
+            cursor.execute("SELECT pg_advisory_lock(%s);", (MIGRATION_LOCK_KEY,))
+            connection.commit()
+            try:
+                recorded = self._recorded(cursor)
+                connection.commit()
+                for migration in self.migrations:
+                    row = recorded.get(migration.version)
+                    if row is not None and row[1] is not None:
+                        continue
+                    self._apply(cursor, connection, migration, row[0] if row else 0)
+                    applied.append(migration.version)
+            finally:
+                connection.rollback()
+                cursor.execute("SELECT pg_advisory_unlock(%s);", (MIGRATION_LOCK_KEY,))
+                cursor.execute("RESET lock_timeout;")
+                connection.commit()
+                cursor.close()
+        finally:
+            db.return_connection(connection)
+        return applied
+
+    def backfill_cursor(self, cursor, version):
+        """Last id a BackfillStep of this migration finished, or None"""
+        cursor.execute("SELECT backfill_cursor FROM schema_migrations WHERE version = %s;", (version,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def _apply(self, cursor, connection, migration, done):
+        print(f"Applying migration {migration.version:04d} {migration.name}...")
+        cursor.execute("""
+            INSERT INTO schema_migrations (version, name) VALUES (%s, %s)
+            ON CONFLICT (version) DO NOTHING;
+        """, (migration.version, migration.name))
+        connection.commit()
+
+        for index in range(done, len(migration.steps)):
+            step = migration.steps[index]
+            print(f"  → {step.describe()}")
+            step.apply(self, connection, migration.version)
+            cursor.execute("UPDATE schema_migrations SET completed_steps = %s WHERE version = %s;",
+                           (index + 1, migration.version))
+            connection.commit()
+
+        cursor.execute("UPDATE schema_migrations SET applied_at = CURRENT_TIMESTAMP WHERE version = %s;",
+                       (migration.version,))
+        connection.commit()
+        print(f"✓ Migration {migration.version:04d} applied")
+
+    def _recorded(self, cursor=None):
+        """version -> (completed_steps, applied_at); empty if the table doesn't exist yet"""
+        if cursor is not None:
+            return self._read_recorded(cursor)
+
+        db = DatabaseConnection()
+        connection = db.get_connection()
+        try:
+            cursor = connection.cursor()
+            recorded = self._read_recorded(cursor)
+            cursor.close()
+            connection.rollback()
+            return recorded
+        finally:
+            db.return_connection(connection)
+
+    @staticmethod
+    def _read_recorded(cursor):
+        cursor.execute("SELECT to_regclass('schema_migrations') IS NOT NULL;")
+        if not cursor.fetchone()[0]:
+            return {}
+        cursor.execute("SELECT version, completed_steps, applied_at FROM schema_migrations;")
+        return {version: (completed, applied_at) for version, completed, applied_at in cursor.fetchall()}
@@ -4,6 +4,11 @@ Database schema definitions and table creation
 
 # SQL Schema for the database tables
 
+# GiST support for plain equality columns (employee_id) in the exclusion constraint
+CREATE_BTREE_GIST_EXTENSION = """
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+"""
+
 CREATE_EMPLOYEES_TABLE = """
 CREATE TABLE IF NOT EXISTS employees (
     employee_id VARCHAR(20) PRIMARY KEY,
@@ -37,10 +42,17 @@ CREATE TABLE IF NOT EXISTS leave_requests (
     status VARCHAR(20) DEFAULT 'pending',
     reason TEXT,
     requested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    approved_at TIMESTAMP
+    approved_at TIMESTAMP,
+    leave_period DATERANGE GENERATED ALWAYS AS (daterange(start_date, end_date, '[]')) STORED,
+    CONSTRAINT leave_requests_no_overlap
+        EXCLUDE USING gist (employee_id WITH =, leave_period WITH &&)
+        WHERE (status = 'approved')
 );
 """
 
+# A leave_requests table created before leave_period existed is brought up to
+# date by migration 4 (database/migrations.py), not here.
+
 CREATE_LEAVE_TRANSACTIONS_TABLE = """
 CREATE TABLE IF NOT EXISTS leave_transactions (
     id SERIAL PRIMARY KEY,
@@ -68,13 +80,131 @@ CREATE TABLE IF NOT EXISTS pending_confirmations (
 );
 """
 
-# Index creation for better performance
-CREATE_INDEXES = [
-    "CREATE INDEX IF NOT EXISTS idx_leave_requests_employee ON leave_requests(employee_id);",
-    "CREATE INDEX IF NOT EXISTS idx_leave_requests_status ON leave_requests(status);",
-    "CREATE INDEX IF NOT EXISTS idx_leave_balance_employee ON leave_balance(employee_id);",
-    "CREATE INDEX IF NOT EXISTS idx_leave_transactions_employee ON leave_transactions(employee_id);",
-    "CREATE INDEX IF NOT EXISTS idx_pending_confirmations_employee ON pending_confirmations(employee_id);"
+# Server-side functions
+
+# Applies a leave atomically: locks the balance row, re-checks the minimum
+# balance rule, records the request, deducts the balance, logs the ledger
+# entry and clears the employee's pending confirmation.
+# outcome is 'applied', 'insufficient_balance' or 'overlap' (another approved
+# leave for the same dates won the race; see leave_requests_no_overlap).
+CREATE_APPLY_LEAVE_FUNCTION = """
+CREATE OR REPLACE FUNCTION apply_leave_request(
+    p_employee_id VARCHAR,
+    p_leave_type VARCHAR,
+    p_start_date DATE,
+    p_end_date DATE,
+    p_days_count NUMERIC,
+    p_min_balance NUMERIC
+)
+RETURNS TABLE (
+    outcome TEXT,
+    request_id INTEGER,
+    leave_type VARCHAR,
+    start_date DATE,
+    end_date DATE,
+    days_count NUMERIC,
+    balance_before NUMERIC,
+    balance_after NUMERIC
+)
+LANGUAGE plpgsql AS $$
+#variable_conflict use_column
+DECLARE
+    v_balance NUMERIC;
+    v_request_id INTEGER;
+BEGIN
+    SELECT lb.balance INTO v_balance
+    FROM leave_balance lb
+    WHERE lb.employee_id = p_employee_id AND lb.leave_type = p_leave_type
+    FOR UPDATE;
+    v_balance := COALESCE(v_balance, 0);
+
+    IF v_balance - p_days_count < p_min_balance THEN
+        DELETE FROM pending_confirmations WHERE employee_id = p_employee_id;
+        RETURN QUERY SELECT 'insufficient_balance'::TEXT, NULL::INTEGER, p_leave_type,
+            p_start_date, p_end_date, p_days_count, v_balance, v_balance;
+        RETURN;
+    END IF;
+
+    BEGIN
+        INSERT INTO leave_requests
+        (employee_id, leave_type, start_date, end_date, days_count, status)
+        VALUES (p_employee_id, p_leave_type, p_start_date, p_end_date, p_days_count, 'approved')
+        RETURNING id INTO v_request_id;
+    EXCEPTION WHEN exclusion_violation THEN
+        DELETE FROM pending_confirmations WHERE employee_id = p_employee_id;
+        RETURN QUERY SELECT 'overlap'::TEXT, NULL::INTEGER, p_leave_type,
+            p_start_date, p_end_date, p_days_count, v_balance, v_balance;
+        RETURN;
+    END;
+
+    INSERT INTO leave_balance (employee_id, leave_type, balance, updated_at)
+    VALUES (p_employee_id, p_leave_type, v_balance - p_days_count, CURRENT_TIMESTAMP)
+    ON CONFLICT (employee_id, leave_type)
+    DO UPDATE SET balance = EXCLUDED.balance, updated_at = CURRENT_TIMESTAMP;
+
+    INSERT INTO leave_transactions
+    (employee_id, leave_type, transaction_type, amount, balance_before, balance_after, description)
+    VALUES (p_employee_id, p_leave_type, 'debit', p_days_count, v_balance, v_balance - p_days_count,
+            'Leave from ' || to_char(p_start_date, 'YYYY-MM-DD') || ' to ' || to_char(p_end_date, 'YYYY-MM-DD'));
+
+    DELETE FROM pending_confirmations WHERE employee_id = p_employee_id;
+
+    RETURN QUERY SELECT 'applied'::TEXT, v_request_id, p_leave_type,
+        p_start_date, p_end_date, p_days_count, v_balance, v_balance - p_days_count;
+END;
+$$;
+"""
+
+# Confirms the employee's latest unexpired pending confirmation in one call.
+# outcome is 'no_pending' or whatever apply_leave_request returns.
+CREATE_CONFIRM_PENDING_FUNCTION = """
+CREATE OR REPLACE FUNCTION confirm_pending_leave(
+    p_employee_id VARCHAR,
+    p_min_balance NUMERIC
+)
+RETURNS TABLE (
+    outcome TEXT,
+    request_id INTEGER,
+    leave_type VARCHAR,
+    start_date DATE,
+    end_date DATE,
+    days_count NUMERIC,
+    balance_before NUMERIC,
+    balance_after NUMERIC
+)
+LANGUAGE plpgsql AS $$
+#variable_conflict use_column
+DECLARE
+    v_pending RECORD;
+BEGIN
+    SELECT pc.leave_type, pc.start_date, pc.end_date, pc.days_count INTO v_pending
+    FROM pending_confirmations pc
+    WHERE pc.employee_id = p_employee_id AND pc.expires_at > CURRENT_TIMESTAMP
+    ORDER BY pc.created_at DESC LIMIT 1
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN QUERY SELECT 'no_pending'::TEXT, NULL::INTEGER, NULL::VARCHAR,
+            NULL::DATE, NULL::DATE, NULL::NUMERIC, NULL::NUMERIC, NULL::NUMERIC;
+        RETURN;
+    END IF;
+
+    RETURN QUERY SELECT * FROM apply_leave_request(
+        p_employee_id, v_pending.leave_type, v_pending.start_date,
+        v_pending.end_date, v_pending.days_count, p_min_balance
+    );
+END;
+$$;
+"""
+
+# Indexes for better performance: (name, table, columns)
+# Built online (CREATE INDEX CONCURRENTLY) by the migration runner, see database/migrations.py
+INDEXES = [
+    ('idx_leave_requests_employee', 'leave_requests', 'employee_id'),
+    ('idx_leave_requests_status', 'leave_requests', 'status'),
+    ('idx_leave_balance_employee', 'leave_balance', 'employee_id'),
+    ('idx_leave_transactions_employee', 'leave_transactions', 'employee_id'),
+    ('idx_pending_confirmations_employee', 'pending_confirmations', 'employee_id')
 ]
 
 # Sample data insertion queries
@@ -93,9 +223,16 @@ DO UPDATE SET balance = EXCLUDED.balance;
 
 # All table creation queries in order
 ALL_TABLES = [
+    CREATE_BTREE_GIST_EXTENSION,
     CREATE_EMPLOYEES_TABLE,
     CREATE_LEAVE_BALANCE_TABLE,
     CREATE_LEAVE_REQUESTS_TABLE,
     CREATE_LEAVE_TRANSACTIONS_TABLE,
     CREATE_PENDING_CONFIRMATIONS_TABLE
+]
+
+# All server-side functions in dependency order (after tables)
+ALL_FUNCTIONS = [
+    CREATE_APPLY_LEAVE_FUNCTION,
+    CREATE_CONFIRM_PENDING_FUNCTION
 ]
\ No newline at end of file
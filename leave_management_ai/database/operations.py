@@ -1,8 +1,19 @@
 """
 Database CRUD operations
 """
-from datetime import datetime, timedelta
-from leave_management_ai.database.connection import execute_query, get_db_connection, DatabaseConnection
+from leave_management_ai.config.settings import QUERY_CONFIG
+from leave_management_ai.database import queries
+from leave_management_ai.database.connection import execute_query, execute_prepared, get_db_connection, DatabaseConnection, query_cache
+from leave_management_ai.database.pending_store import get_pending_store
+from leave_management_ai.database.instrumentation import query_stats
+from leave_management_ai.database.partitions import partition_guard
+from leave_management_ai.database.prepared import statement_registry
+
+
+# Hot queries that run on most chat turns are prepared once per connection
+statement_registry.register('get_employee', queries.GET_EMPLOYEE)
+statement_registry.register('get_balance', queries.GET_BALANCE)
+statement_registry.register('check_overlapping_leaves', queries.CHECK_OVERLAPPING_LEAVES)
 
 
 class EmployeeOperations:
@@ -11,8 +22,7 @@ class EmployeeOperations:
     @staticmethod
     def get_employee(employee_id):
         """Get employee details by ID"""
-        query = "SELECT * FROM employees WHERE employee_id = %s;"
-        results = execute_query(query, (employee_id,), fetch=True)
+        results = execute_prepared('get_employee', (employee_id,), fetch=True)
         return results[0] if results else None
     
     @staticmethod
@@ -28,33 +38,21 @@ class LeaveBalanceOperations:
     @staticmethod
     def get_balance(employee_id, leave_type='general'):
         """Get leave balance for specific type"""
-        query = """
-        SELECT balance FROM leave_balance 
-        WHERE employee_id = %s AND leave_type = %s;
-        """
-        results = execute_query(query, (employee_id, leave_type), fetch=True)
+        results = execute_prepared('get_balance', (employee_id, leave_type), fetch=True)
         return float(results[0][0]) if results else 0.0
     
     @staticmethod
     def get_all_balances(employee_id):
         """Get all leave balances for an employee"""
-        query = """
-        SELECT leave_type, balance FROM leave_balance 
-        WHERE employee_id = %s ORDER BY leave_type;
-        """
-        results = execute_query(query, (employee_id,), fetch=True)
+        results = execute_query(queries.GET_ALL_BALANCES, (employee_id,), fetch=True,
+                                cache_tags=[('leave_balance', employee_id)])
         return {row[0]: float(row[1]) for row in results}
     
     @staticmethod
     def update_balance(employee_id, leave_type, new_balance):
         """Update leave balance"""
-        query = """
-        INSERT INTO leave_balance (employee_id, leave_type, balance, updated_at)
-        VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
-        ON CONFLICT (employee_id, leave_type) 
-        DO UPDATE SET balance = EXCLUDED.balance, updated_at = CURRENT_TIMESTAMP;
-        """
-        execute_query(query, (employee_id, leave_type, new_balance))
+        execute_query(queries.UPSERT_BALANCE, (employee_id, leave_type, new_balance),
+                      invalidates=[('leave_balance', employee_id)])
     
     @staticmethod
     def deduct_balance(employee_id, leave_type, days):
@@ -71,20 +69,18 @@ class LeaveRequestOperations:
     @staticmethod
     def create_request(employee_id, leave_type, start_date, end_date, days_count, reason=None):
         """Create a new leave request"""
-        query = """
-        INSERT INTO leave_requests 
-        (employee_id, leave_type, start_date, end_date, days_count, reason, status)
-        VALUES (%s, %s, %s, %s, %s, %s, 'approved')
-        RETURNING id;
-        """
         db = DatabaseConnection()
         conn = db.get_connection()
         try:
             cursor = conn.cursor()
-            cursor.execute(query, (employee_id, leave_type, start_date, end_date, days_count, reason))
-            request_id = cursor.fetchone()[0]
+            params = (employee_id, leave_type, start_date, end_date, days_count, reason)
+            with query_stats.statement(queries.INSERT_LEAVE_REQUEST, params) as statement:
+                cursor.execute(queries.INSERT_LEAVE_REQUEST, params)
+                request_id = cursor.fetchone()[0]
+                statement.rows = cursor.rowcount
             conn.commit()
             cursor.close()
+            query_cache.invalidate([('leave_requests', employee_id)])
             return request_id
         finally:
             db.return_connection(conn)
@@ -92,79 +88,114 @@ class LeaveRequestOperations:
     @staticmethod
     def get_employee_requests(employee_id, limit=10):
         """Get recent leave requests for an employee"""
-        query = """
-        SELECT id, leave_type, start_date, end_date, days_count, status, requested_at
-        FROM leave_requests 
-        WHERE employee_id = %s 
-        ORDER BY requested_at DESC 
-        LIMIT %s;
-        """
-        results = execute_query(query, (employee_id, limit), fetch=True)
+        results = execute_query(queries.GET_EMPLOYEE_REQUESTS, (employee_id, limit), fetch=True,
+                                cache_tags=[('leave_requests', employee_id)])
         return results
     
+    @staticmethod
+    def get_employee_requests_page(employee_id, limit=10, after=None, status=None,
+                                   leave_type=None, from_date=None, to_date=None):
+        """
+        Get one page of an employee's leave requests, newest first
+        `after` is the (requested_at, id) of the last row of the previous page
+        """
+        params = queries.history_page_params(employee_id, limit, after, status,
+                                             leave_type, from_date, to_date)
+        return execute_query(queries.GET_EMPLOYEE_REQUESTS_PAGE, params, fetch=True,
+                             cache_tags=[('leave_requests', employee_id)])
+    
+    @staticmethod
+    def iter_employee_requests(employee_id, batch_size=None, status=None,
+                               leave_type=None, from_date=None, to_date=None):
+        """
+        Yield every matching leave request, newest first, one keyset page at a
+        time so memory stays bounded by `batch_size` rows
+        """
+        batch_size = batch_size or QUERY_CONFIG['history_stream_batch_size']
+        after = None
+        while True:
+            params = queries.history_page_params(employee_id, batch_size, after, status,
+                                                 leave_type, from_date, to_date)
+            rows = execute_query(queries.GET_EMPLOYEE_REQUESTS_PAGE, params, fetch=True)
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1][6], rows[-1][0])
+    
     @staticmethod
     def check_overlapping_leaves(employee_id, start_date, end_date):
         """Check if there are existing approved leaves overlapping with the date range"""
-        query = """
-        SELECT id, leave_type, start_date, end_date, days_count
-        FROM leave_requests
-        WHERE employee_id = %s 
-        AND status = 'approved'
-        AND (
-            (start_date <= %s AND end_date >= %s) OR
-            (start_date <= %s AND end_date >= %s) OR
-            (start_date >= %s AND end_date <= %s)
-        );
-        """
-        results = execute_query(query, (employee_id, end_date, end_date, start_date, start_date, start_date, end_date), fetch=True)
+        params = (employee_id, start_date, end_date)
+        results = execute_prepared('check_overlapping_leaves', params, fetch=True)
         return results
     
     @staticmethod
     def get_future_leaves(employee_id, from_date):
         """Get future approved leaves after a specific date"""
-        query = """
-        SELECT id, leave_type, start_date, end_date, days_count, requested_at
-        FROM leave_requests
-        WHERE employee_id = %s 
-        AND status = 'approved'
-        AND start_date > %s
-        ORDER BY start_date ASC;
-        """
-        results = execute_query(query, (employee_id, from_date), fetch=True)
+        results = execute_query(queries.GET_FUTURE_LEAVES, (employee_id, from_date), fetch=True,
+                                cache_tags=[('leave_requests', employee_id)])
         return results
     
     @staticmethod
     def get_leaves_in_range(employee_id, start_date, end_date):
         """Get approved leaves in a specific date range"""
-        query = """
-        SELECT id, leave_type, start_date, end_date, days_count
-        FROM leave_requests
-        WHERE employee_id = %s 
-        AND status = 'approved'
-        AND start_date >= %s 
-        AND end_date <= %s
-        ORDER BY start_date ASC;
+        results = execute_query(queries.GET_LEAVES_IN_RANGE, (employee_id, start_date, end_date), fetch=True)
+        return results
+    
+    @staticmethod
+    def cancel_leaves_in_range(employee_id, start_date, end_date):
+        """
+        Cancel all approved leaves in a date range and restore their balances
+        in one transaction
+        Returns rows of (id, leave_type, start_date, end_date, days_count, balance_after)
         """
-        results = execute_query(query, (employee_id, start_date, end_date), fetch=True)
+        partition_guard.check()
+        params = {'employee_id': employee_id, 'start_date': start_date, 'end_date': end_date}
+        results = execute_query(queries.CANCEL_LEAVES_IN_RANGE, params, fetch=True, commit=True,
+                                invalidates=[('leave_requests', employee_id), ('leave_balance', employee_id)])
         return results
     
+    @staticmethod
+    def confirm_pending_request(employee_id, min_balance):
+        """
+        Apply the employee's pending confirmation atomically in one round trip
+        Returns (outcome, request_id, leave_type, start_date, end_date,
+                 days_count, balance_before, balance_after)
+        """
+        partition_guard.check()
+        results = execute_query(queries.CONFIRM_PENDING_LEAVE, (employee_id, min_balance),
+                                fetch=True, commit=True,
+                                invalidates=[('leave_requests', employee_id), ('leave_balance', employee_id)])
+        return results[0]
+    
+    @staticmethod
+    def apply_leave_request(employee_id, leave_type, start_date, end_date, days_count, min_balance):
+        """
+        Apply a leave atomically in one round trip (for pending confirmations
+        held outside the database)
+        Returns the same row as confirm_pending_request
+        """
+        partition_guard.check()
+        params = (employee_id, leave_type, start_date, end_date, days_count, min_balance)
+        results = execute_query(queries.APPLY_LEAVE_REQUEST, params, fetch=True, commit=True,
+                                invalidates=[('leave_requests', employee_id), ('leave_balance', employee_id)])
+        return results[0]
+    
     @staticmethod
     def cancel_leave_request(request_id):
         """Cancel an approved leave request"""
-        query = """
-        UPDATE leave_requests 
-        SET status = 'cancelled'
-        WHERE id = %s AND status = 'approved'
-        RETURNING id, employee_id, leave_type, start_date, end_date, days_count;
-        """
         db = DatabaseConnection()
         conn = db.get_connection()
         try:
             cursor = conn.cursor()
-            cursor.execute(query, (request_id,))
-            result = cursor.fetchone()
+            with query_stats.statement(queries.CANCEL_LEAVE_REQUEST, (request_id,)) as statement:
+                cursor.execute(queries.CANCEL_LEAVE_REQUEST, (request_id,))
+                result = cursor.fetchone()
+                statement.rows = cursor.rowcount
             conn.commit()
             cursor.close()
+            if result:
+                query_cache.invalidate([('leave_requests', result[1])])
             return result
         finally:
             db.return_connection(conn)
@@ -174,62 +205,40 @@ class LeaveTransactionOperations:
     """Leave transaction logging"""
     
     @staticmethod
-    def log_transaction(employee_id, leave_type, transaction_type, amount, 
+    def log_transaction(employee_id, leave_type, transaction_type, amount,
                        balance_before, balance_after, description=None):
         """Log a leave balance transaction"""
-        query = """
-        INSERT INTO leave_transactions 
-        (employee_id, leave_type, transaction_type, amount, balance_before, balance_after, description)
-        VALUES (%s, %s, %s, %s, %s, %s, %s);
-        """
-        execute_query(query, (employee_id, leave_type, transaction_type, amount, 
-                             balance_before, balance_after, description))
+        partition_guard.check()
+        execute_query(queries.INSERT_LEAVE_TRANSACTION,
+                      (employee_id, leave_type, transaction_type, amount,
+                       balance_before, balance_after, description))
+    
+    @staticmethod
+    def get_transactions_in_range(start, end, employee_id=None):
+        """Get ledger entries with start <= transaction_date < end, optionally for one employee"""
+        return execute_query(queries.GET_TRANSACTIONS_IN_RANGE,
+                             (start, end, employee_id, employee_id), fetch=True)
 
 
 class PendingConfirmationOperations:
-    """Operations for pending leave confirmations"""
+    """Operations for pending leave confirmations (backed by PENDING_STORE_CONFIG)"""
     
     @staticmethod
     def create_pending(employee_id, leave_type, start_date, end_date, days_count):
-        """Create a pending confirmation"""
-        # Clear any existing pending confirmations for this employee
-        PendingConfirmationOperations.clear_pending(employee_id)
-        
-        query = """
-        INSERT INTO pending_confirmations 
-        (employee_id, leave_type, start_date, end_date, days_count, expires_at)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        RETURNING id;
-        """
-        expires_at = datetime.now() + timedelta(minutes=15)  # 15 minute expiry
-        
-        db = DatabaseConnection()
-        conn = db.get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute(query, (employee_id, leave_type, start_date, end_date, 
-                                  days_count, expires_at))
-            pending_id = cursor.fetchone()[0]
-            conn.commit()
-            cursor.close()
-            return pending_id
-        finally:
-            db.return_connection(conn)
+        """Create a pending confirmation, replacing any existing one"""
+        return get_pending_store().put(employee_id, leave_type, start_date, end_date, days_count)
     
     @staticmethod
     def get_pending(employee_id):
         """Get pending confirmation for employee"""
-        query = """
-        SELECT leave_type, start_date, end_date, days_count 
-        FROM pending_confirmations 
-        WHERE employee_id = %s AND expires_at > CURRENT_TIMESTAMP
-        ORDER BY created_at DESC LIMIT 1;
-        """
-        results = execute_query(query, (employee_id,), fetch=True)
-        return results[0] if results else None
+        return get_pending_store().get(employee_id)
     
     @staticmethod
     def clear_pending(employee_id):
         """Clear pending confirmations for employee"""
-        query = "DELETE FROM pending_confirmations WHERE employee_id = %s;"
-        execute_query(query, (employee_id,))
\ No newline at end of file
+        get_pending_store().clear(employee_id)
+    
+    @staticmethod
+    def in_database():
+        """Whether pending confirmations live in the pending_confirmations table"""
+        return get_pending_store().in_database
@@ -0,0 +1,293 @@
+"""
+Monthly partitions of the leave_transactions ledger
+
+Migration 2 (database/migrations.py) turns leave_transactions into a table
+partitioned by month on transaction_date. This module keeps partitions
+created ahead of time and archives old ones to compressed CSV files.
+
+Besides cron and startup, the write path runs ensure() through
+`partition_guard` at the first ledger write of each month, so a
+long-running process never inserts into a month without a partition.
+"""
+import gzip
+import os
+import re
+import threading
+from datetime import date, datetime
+
+from leave_management_ai.config.settings import LEDGER_CONFIG
+from leave_management_ai.database.connection import DatabaseConnection
+
+
+LEDGER_TABLE = 'leave_transactions'
+
+LIST_PARTITIONS = """
+SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+JOIN pg_class p ON p.oid = i.inhparent
+WHERE p.relname = %s
+ORDER BY c.relname;
+"""
+
+IS_PARTITIONED = """
+SELECT relkind = 'p' FROM pg_class WHERE relname = %s;
+"""
+
+# Ledger partition tables that are no longer attached: left behind by an
+# archive run that detached them but failed to export (or --keep-table)
+LIST_DETACHED = """
+SELECT c.relname
+FROM pg_class c
+WHERE c.relkind = 'r' AND c.relname LIKE %s
+  AND NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid)
+ORDER BY c.relname;
+"""
+
+_MONTH_PARTITION = re.compile(rf'^{LEDGER_TABLE}_y(\d{{4}})m(\d{{2}})$')
+
+_BOUND_PATTERN = re.compile(r"FROM \((MINVALUE|'[^']+')\) TO \((MAXVALUE|'[^']+')\)")
+
+
+def month_start(day):
+    """First day of the month containing `day`"""
+    return date(day.year, day.month, 1)
+
+
+def add_months(day, months):
+    """First day of the month `months` after the month containing `day`"""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    """Partition table name for a month, e.g. leave_transactions_y2024m03"""
+    return f"{LEDGER_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def months_between(first, stop):
+    """First days of the months from `first`'s month up to, not including, `stop`'s"""
+    month = month_start(first)
+    while month < stop:
+        yield month
+        month = add_months(month, 1)
+
+
+def _parse_bound(value):
+    if value in ('MINVALUE', 'MAXVALUE'):
+        return None
+    return datetime.fromisoformat(value.strip("'")).date()
+
+
+class LedgerPartitionManager:
+    """Creates and archives monthly partitions of the ledger"""
+
+    def __init__(self):
+        self.db = DatabaseConnection()
+
+    def is_partitioned(self):
+        """Whether the partitioning migration has been applied"""
+        rows = self._fetch(IS_PARTITIONED, (LEDGER_TABLE,))
+        return bool(rows and rows[0][0])
+
+    def partitions(self):
+        """
+        Attached partitions in bound order
+        Returns list of (name, lower, upper); a bound is None for MINVALUE/MAXVALUE
+        """
+        result = []
+        for name, bound in self._fetch(LIST_PARTITIONS, (LEDGER_TABLE,)):
+            match = _BOUND_PATTERN.search(bound or '')
+            if match is None:
+                continue
+            result.append((name, _parse_bound(match.group(1)), _parse_bound(match.group(2))))
+        result.sort(key=lambda p: p[1] or date.min)
+        return result
+
+    def ensure(self, months_ahead=None, today=None, span=None):
+        """
+        Create any missing monthly partition from the end of the last one
+        (or the current month, if there is none) through `months_ahead`
+        months ahead. `span` = (first_day, last_day) also covers every month
+        of that span, e.g. before loading rows dated in the past or far ahead
+        Returns the names of the partitions created
+        """
+        if months_ahead is None:
+            months_ahead = LEDGER_CONFIG['partition_months_ahead']
+        if not self.is_partitioned():
+            return []
+
+        today = today or date.today()
+        partitions = self.partitions()
+        uppers = [upper for _, _, upper in partitions if upper is not None]
+        # Partitions are contiguous: start after the last one, even when it
+        # ended before this month, so the months since then get one too
+        first = max(uppers) if uppers else month_start(today)
+        last = add_months(today, months_ahead)
+        months = []
+        if span:
+            last = max(last, month_start(span[1]))
+            # Months of the span before the first one ensured, that no
+            # partition (e.g. an archived one) covers any more
+            months = [month for month in months_between(span[0], first)
+                      if not any((lower is None or lower <= month) and (upper is None or month < upper)
+                                 for _, lower, upper in partitions)]
+        months += months_between(first, add_months(last, 1))
+
+        created = []
+        connection = self.db.get_connection()
+        try:
+            cursor = connection.cursor()
+            for month in months:
+                name = partition_name(month)
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {LEDGER_TABLE} "
+                    f"FOR VALUES FROM (%s) TO (%s);",
+                    (month, add_months(month, 1))
+                )
+                connection.commit()
+                created.append(name)
+            cursor.close()
+        finally:
+            self.db.return_connection(connection)
+        return created
+
+    def archive(self, before, directory=None, keep_table=False):
+        """
+        Detach every partition that ends on or before `before`, export it to
+        `directory/<partition>.csv.gz` and drop it
+        Writes to the current month continue throughout: DETACH ... CONCURRENTLY
+        (PostgreSQL 14+) does not lock the parent table against inserts.
+        A partition an earlier run detached but did not export (a full disk,
+        say) is exported now too, so its rows are never lost in between.
+        Returns list of (partition name, file path, row count)
+        """
+        directory = directory or LEDGER_CONFIG['archive_directory']
+        os.makedirs(directory, exist_ok=True)
+
+        archived = []
+        for name in self._unarchived_detached(before, directory):
+            path, rows = self._export(name, directory)
+            if not keep_table:
+                self._execute(f"DROP TABLE {name};")
+            archived.append((name, path, rows))
+        for name, _, upper in self.partitions():
+            if upper is None or upper > before:
+                continue
+            self._detach(name)
+            path, rows = self._export(name, directory)
+            if not keep_table:
+                self._execute(f"DROP TABLE {name};")
+            archived.append((name, path, rows))
+        return archived
+
+    def _unarchived_detached(self, before, directory):
+        """Detached ledger partitions ending on or before `before` with no archive file yet"""
+        names = []
+        for (name,) in self._fetch(LIST_DETACHED, (f"{LEDGER_TABLE}\\_%",)):
+            match = _MONTH_PARTITION.match(name)
+            if match:
+                month = date(int(match.group(1)), int(match.group(2)), 1)
+                if add_months(month, 1) > before:
+                    continue
+            elif name != f'{LEDGER_TABLE}_legacy':
+                continue
+            if not os.path.exists(os.path.join(directory, f"{name}.csv.gz")):
+                names.append(name)
+        return names
+
+    def _detach(self, name):
+        connection = self.db.get_connection()
+        try:
+            # DETACH ... CONCURRENTLY cannot run inside a transaction block
+            connection.autocommit = True
+            cursor = connection.cursor()
+            if connection.server_version >= 140000:
+                cursor.execute("SELECT inhdetachpending FROM pg_inherits WHERE inhrelid = %s::regclass;", (name,))
+                row = cursor.fetchone()
+                if row and row[0]:
+                    # An earlier concurrent detach was interrupted; complete it
+                    cursor.execute(f"ALTER TABLE {LEDGER_TABLE} DETACH PARTITION {name} FINALIZE;")
+                else:
+                    cursor.execute(f"ALTER TABLE {LEDGER_TABLE} DETACH PARTITION {name} CONCURRENTLY;")
+            else:
+                cursor.execute(f"ALTER TABLE {LEDGER_TABLE} DETACH PARTITION {name};")
+            cursor.close()
+        finally:
+            connection.autocommit = False
+            self.db.return_connection(connection)
+
+    def _export(self, name, directory):
+        """COPY a detached partition into a gzip-compressed CSV file"""
+        path = os.path.join(directory, f"{name}.csv.gz")
+        tmp_path = path + '.tmp'
+        connection = self.db.get_connection()
+        try:
+            cursor = connection.cursor()
+            with gzip.open(tmp_path, 'wt', encoding='utf-8', newline='') as f:
+                cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER true);", f)
+            rows = cursor.rowcount
+            cursor.close()
+            connection.rollback()
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            self.db.return_connection(connection)
+        os.replace(tmp_path, path)
+        return path, rows
+
+    def _fetch(self, query, params):
+        connection = self.db.get_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            cursor.close()
+            connection.rollback()
+            return rows
+        finally:
+            self.db.return_connection(connection)
+
+    def _execute(self, query):
+        connection = self.db.get_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(query)
+            connection.commit()
+            cursor.close()
+        finally:
+            self.db.return_connection(connection)
+
+
+class PartitionGuard:
+    """
+    Runs LedgerPartitionManager.ensure() from the ledger write path once per
+    process per month, so inserts do not depend on cron having run
+    """
+
+    def __init__(self):
+        self._month = None
+        self._lock = threading.Lock()
+
+    def due(self, today=None):
+        """Whether ensure() has not run yet in this process this month"""
+        return self._month != month_start(today or date.today())
+
+    def check(self, today=None):
+        """Run ensure() if it is due; a failure is reported and retried on the next write"""
+        if not self.due(today):
+            return
+        with self._lock:
+            if not self.due(today):
+                return
+            try:
+                LedgerPartitionManager().ensure(today=today)
+            except Exception as e:
+                print(f"⚠ Could not create ledger partitions: {e}")
+                return
+            self._month = month_start(today or date.today())
+
+
+partition_guard = PartitionGuard()
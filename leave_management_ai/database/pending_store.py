@@ -0,0 +1,232 @@
+"""
+Pluggable storage for pending leave confirmations
+
+A pending confirmation is short-lived, per-conversation state: the leave a
+user asked for, waiting for "yes" or "no". Every store returns the same
+(leave_type, start_date, end_date, days_count) tuple that the original
+pending_confirmations table query returned.
+"""
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from leave_management_ai.config.settings import BUSINESS_RULES, PENDING_STORE_CONFIG
+from leave_management_ai.database import queries
+from leave_management_ai.database.connection import execute_query, execute_prepared, DatabaseConnection
+from leave_management_ai.database.instrumentation import query_stats
+from leave_management_ai.database.prepared import statement_registry
+
+
+statement_registry.register('get_pending', queries.GET_PENDING_CONFIRMATION)
+
+
+class InMemoryPendingStore:
+    """
+    Process-local TTL map.
+
+    Expired entries are dropped lazily when read, and a timer wheel sweeps
+    entries nobody read again, so memory stays proportional to the number
+    of live conversations. Requires sticky sessions when running several
+    worker processes.
+    """
+
+    in_database = False
+
+    def __init__(self, ttl_seconds, tick_seconds=5.0):
+        self.ttl_seconds = ttl_seconds
+        self.tick_seconds = tick_seconds
+        self._entries = {}    # employee_id -> (record, expires_at)
+        self._wheel = [set() for _ in range(int(math.ceil(ttl_seconds / tick_seconds)) + 1)]
+        self._cursor = self._tick(time.time())
+        self._lock = threading.Lock()
+
+    def put(self, employee_id, leave_type, start_date, end_date, days_count):
+        """Store a pending confirmation, replacing any existing one"""
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        record = (leave_type, start_date, end_date, days_count)
+        with self._lock:
+            self._advance(now)
+            self._entries[employee_id] = (record, expires_at)
+            self._wheel[self._tick(expires_at) % len(self._wheel)].add(employee_id)
+        return None
+
+    def get(self, employee_id):
+        """Get the pending confirmation, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            self._advance(now)
+            entry = self._entries.get(employee_id)
+            if entry is None:
+                return None
+            record, expires_at = entry
+            if expires_at <= now:
+                del self._entries[employee_id]
+                return None
+            return record
+
+    def clear(self, employee_id):
+        """Remove the pending confirmation"""
+        with self._lock:
+            self._entries.pop(employee_id, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _tick(self, timestamp):
+        return int(timestamp // self.tick_seconds)
+
+    def _advance(self, now):
+        """Expire entries in every wheel slot whose tick has fully passed (lock held)"""
+        current = self._tick(now)
+        steps = min(current - self._cursor, len(self._wheel))
+        for offset in range(steps):
+            slot = self._wheel[(self._cursor + offset) % len(self._wheel)]
+            for employee_id in slot:
+                entry = self._entries.get(employee_id)
+                if entry is not None and entry[1] <= now:
+                    del self._entries[employee_id]
+            slot.clear()
+        self._cursor = current
+
+
+class FilePendingStore(InMemoryPendingStore):
+    """
+    In-memory store that writes through to a local JSON file, so pending
+    confirmations survive a restart. Unexpired entries are reloaded at startup.
+    """
+
+    def __init__(self, path, ttl_seconds, tick_seconds=5.0):
+        super().__init__(ttl_seconds, tick_seconds)
+        self.path = path
+        self._load()
+
+    def put(self, employee_id, leave_type, start_date, end_date, days_count):
+        super().put(employee_id, leave_type, start_date, end_date, days_count)
+        self._save()
+
+    def clear(self, employee_id):
+        with self._lock:
+            existed = self._entries.pop(employee_id, None) is not None
+        if existed:
+            self._save()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠ Could not read pending confirmations from {self.path}: {e}")
+            return
+
+        now = time.time()
+        with self._lock:
+            for employee_id, item in data.items():
+                if item['expires_at'] <= now:
+                    continue
+                record = (
+                    item['leave_type'],
+                    date.fromisoformat(item['start_date']),
+                    date.fromisoformat(item['end_date']),
+                    item['days_count']
+                )
+                self._entries[employee_id] = (record, item['expires_at'])
+                self._wheel[self._tick(item['expires_at']) % len(self._wheel)].add(employee_id)
+
+    def _save(self):
+        """Atomically replace the file with the current entries"""
+        with self._lock:
+            data = {
+                employee_id: {
+                    'leave_type': record[0],
+                    'start_date': record[1].isoformat(),
+                    'end_date': record[2].isoformat(),
+                    'days_count': float(record[3]),
+                    'expires_at': expires_at
+                }
+                for employee_id, (record, expires_at) in self._entries.items()
+            }
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.pending-', suffix='.json')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+
+class DatabasePendingStore:
+    """The pending_confirmations table (shared across processes)"""
+
+    in_database = True
+
+    def __init__(self, ttl_seconds):
+        self.ttl_seconds = ttl_seconds
+
+    def put(self, employee_id, leave_type, start_date, end_date, days_count):
+        """Store a pending confirmation, replacing any existing one; returns its id"""
+        self.clear(employee_id)
+
+        expires_at = datetime.now() + timedelta(seconds=self.ttl_seconds)
+
+        db = DatabaseConnection()
+        conn = db.get_connection()
+        try:
+            cursor = conn.cursor()
+            params = (employee_id, leave_type, start_date, end_date, days_count, expires_at)
+            with query_stats.statement(queries.INSERT_PENDING_CONFIRMATION, params) as statement:
+                cursor.execute(queries.INSERT_PENDING_CONFIRMATION, params)
+                pending_id = cursor.fetchone()[0]
+                statement.rows = cursor.rowcount
+            conn.commit()
+            cursor.close()
+            return pending_id
+        finally:
+            db.return_connection(conn)
+
+    def get(self, employee_id):
+        """Get the latest unexpired pending confirmation"""
+        results = execute_prepared('get_pending', (employee_id,), fetch=True)
+        return results[0] if results else None
+
+    def clear(self, employee_id):
+        """Remove pending confirmations"""
+        execute_query(queries.DELETE_PENDING_CONFIRMATIONS, (employee_id,))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def create_pending_store(backend=None):
+    """Build a store for a backend name: 'memory', 'file' or 'database'"""
+    backend = backend or PENDING_STORE_CONFIG['backend']
+    ttl_seconds = BUSINESS_RULES['pending_expiry_minutes'] * 60
+    if backend == 'memory':
+        return InMemoryPendingStore(ttl_seconds)
+    if backend == 'file':
+        return FilePendingStore(PENDING_STORE_CONFIG['file_path'], ttl_seconds)
+    if backend == 'database':
+        return DatabasePendingStore(ttl_seconds)
+    raise ValueError(f"Unknown pending store backend: {backend}")
+
+
+def get_pending_store():
+    """Get the process-wide store configured in PENDING_STORE_CONFIG"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_pending_store()
+    return _store
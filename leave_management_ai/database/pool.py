@@ -0,0 +1,233 @@
+"""
+Thread-safe PostgreSQL connection pool with bounded waits
+"""
+import threading
+import time
+from collections import deque
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the acquire timeout"""
+
+
+class ThreadedConnectionPool:
+    """
+    Connection pool that is safe to share between threads.
+
+    Callers that find every connection checked out wait (up to a bounded
+    timeout) for one to be returned instead of failing immediately.
+    Connections that sat idle for too long are health-checked before they
+    are handed out, and broken ones are replaced transparently.
+    """
+
+    def __init__(self, min_connections, max_connections, acquire_timeout=5.0,
+                 health_check_after=30.0, **connect_kwargs):
+        if min_connections < 0 or max_connections < 1 or min_connections > max_connections:
+            raise ValueError("Invalid pool size: need 0 <= min_connections <= max_connections, max >= 1")
+
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.acquire_timeout = acquire_timeout
+        self.health_check_after = health_check_after
+        self._connect_kwargs = connect_kwargs
+
+        self._condition = threading.Condition(threading.Lock())
+        self._idle = deque()      # (connection, returned_at) pairs, most recent last
+        self._in_use = {}         # id(connection) -> connection
+        self._opened = 0          # connections open or being opened
+        self._waiters = 0
+        self._closed = False
+
+        # Counters
+        self._acquired_total = 0
+        self._timeouts_total = 0
+        self._waits_total = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        self._created_total = 0
+        self._discarded_total = 0
+        self._health_check_failures_total = 0
+
+        self.prewarm()
+
+    def prewarm(self):
+        """Open connections until the pool holds at least min_connections"""
+        while True:
+            with self._condition:
+                if self._closed or self._opened >= self.min_connections:
+                    return
+                self._opened += 1
+            try:
+                connection = self._connect()
+            except Exception:
+                self._release_slot()
+                raise
+            with self._condition:
+                self._idle.append((connection, time.monotonic()))
+                self._condition.notify()
+
+    def getconn(self, timeout=None):
+        """
+        Check out a connection, waiting up to `timeout` seconds
+        (defaults to the pool's acquire_timeout) if the pool is exhausted
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+
+        while True:
+            connection, returned_at = None, None
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise PoolError("connection pool is closed")
+                    if self._idle:
+                        connection, returned_at = self._idle.pop()
+                        break
+                    if self._opened < self.max_connections:
+                        self._opened += 1
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts_total += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {timeout:.2f}s waiting for a database connection "
+                            f"({self.max_connections} in use, {self._waiters} waiting)"
+                        )
+                    waited = True
+                    self._waiters += 1
+                    try:
+                        self._condition.wait(remaining)
+                    finally:
+                        self._waiters -= 1
+
+            if connection is None:
+                try:
+                    connection = self._connect()
+                except Exception:
+                    self._release_slot()
+                    raise
+            elif not self._is_healthy(connection, returned_at):
+                self._discard(connection)
+                continue
+
+            wait_seconds = time.monotonic() - started
+            with self._condition:
+                self._in_use[id(connection)] = connection
+                self._acquired_total += 1
+                if waited:
+                    self._waits_total += 1
+                self._wait_seconds_total += wait_seconds
+                self._wait_seconds_max = max(self._wait_seconds_max, wait_seconds)
+            return connection
+
+    def putconn(self, connection, close=False):
+        """Return a connection to the pool, resetting any open transaction"""
+        with self._condition:
+            if self._in_use.pop(id(connection), None) is None:
+                raise PoolError("trying to put unkeyed connection")
+
+        if not close and not connection.closed:
+            status = connection.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                close = True
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    connection.rollback()
+                except psycopg2.Error:
+                    close = True
+
+        if close or connection.closed or self._closed:
+            self._discard(connection)
+            return
+
+        with self._condition:
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def closeall(self):
+        """Close every idle connection and refuse further checkouts"""
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def stats(self):
+        """Snapshot of pool gauges and counters"""
+        with self._condition:
+            return {
+                'min_connections': self.min_connections,
+                'max_connections': self.max_connections,
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+                'waiters': self._waiters,
+                'acquired_total': self._acquired_total,
+                'waits_total': self._waits_total,
+                'timeouts_total': self._timeouts_total,
+                'wait_seconds_total': self._wait_seconds_total,
+                'wait_seconds_max': self._wait_seconds_max,
+                'connections_created_total': self._created_total,
+                'connections_discarded_total': self._discarded_total,
+                'health_check_failures_total': self._health_check_failures_total,
+            }
+
+    def _connect(self):
+        """Open a new physical connection"""
+        connection = psycopg2.connect(**self._connect_kwargs)
+        with self._condition:
+            self._created_total += 1
+        return connection
+
+    def _is_healthy(self, connection, returned_at):
+        """Ping connections that have been idle longer than health_check_after"""
+        if connection.closed:
+            with self._condition:
+                self._health_check_failures_total += 1
+            return False
+        if time.monotonic() - returned_at < self.health_check_after:
+            return True
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1;")
+            cursor.close()
+            connection.rollback()
+            return True
+        except psycopg2.Error:
+            with self._condition:
+                self._health_check_failures_total += 1
+            return False
+
+    def _discard(self, connection):
+        """Close a connection and free its slot for a replacement"""
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+        with self._condition:
+            self._discarded_total += 1
+        self._release_slot()
+
+    def _release_slot(self):
+        with self._condition:
+            self._opened -= 1
+            self._condition.notify()
+
+
+def format_pool_metrics(stats, prefix='leave_db_pool'):
+    """Render pool stats in Prometheus text exposition format"""
+    gauges = ('min_connections', 'max_connections', 'in_use', 'idle', 'waiters', 'wait_seconds_max')
+    lines = []
+    for key, value in stats.items():
+        metric_type = 'gauge' if key in gauges else 'counter'
+        lines.append(f"# TYPE {prefix}_{key} {metric_type}")
+        lines.append(f"{prefix}_{key} {value}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,111 @@
+"""
+Server-side prepared statement registry
+"""
+import re
+import threading
+import weakref
+
+import psycopg2
+from psycopg2 import errorcodes
+
+
+class PreparedStatementRegistry:
+    """
+    Named SQL statements that are PREPAREd once per pooled connection
+    and run with EXECUTE afterwards, so PostgreSQL parses and plans
+    them only once per session.
+
+    Connections are tracked weakly: a connection that the pool closes and
+    replaces is simply a new key, so its statements get prepared again.
+    """
+    
+    def __init__(self, prefix='lm_'):
+        self._prefix = prefix
+        self._statements = {}                           # name -> (PREPARE sql, param count, query)
+        self._prepared = weakref.WeakKeyDictionary()    # connection -> set of names
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._reprepares = 0
+    
+    def register(self, name, query):
+        """Register a %s-style query under a name (idempotent)"""
+        sql, param_count = self._to_positional(query)
+        statement = f"PREPARE {self._prefix}{name} AS {sql}"
+        with self._lock:
+            self._statements[name] = (statement, param_count, query)
+    
+    def get_query(self, name):
+        """Get the original %s-style SQL for a registered statement"""
+        return self._statements[name][2]
+    
+    def execute(self, cursor, name, params=None):
+        """Run a registered statement on a cursor, preparing it first if needed"""
+        connection = cursor.connection
+        statement, param_count, _ = self._statements[name]
+        
+        with self._lock:
+            prepared = self._prepared.setdefault(connection, set())
+            is_prepared = name in prepared
+            if is_prepared:
+                self._hits += 1
+            else:
+                self._misses += 1
+        
+        if not is_prepared:
+            self._prepare(cursor, name, statement, prepared)
+        
+        execute_sql = self._execute_sql(name, param_count)
+        try:
+            cursor.execute(execute_sql, params)
+        except psycopg2.Error as e:
+            # The session lost its statements (e.g. DISCARD ALL); prepare again once
+            if e.pgcode != errorcodes.INVALID_SQL_STATEMENT_NAME:
+                raise
+            connection.rollback()
+            with self._lock:
+                prepared.clear()
+                self._reprepares += 1
+            self._prepare(cursor, name, statement, prepared)
+            cursor.execute(execute_sql, params)
+    
+    def stats(self):
+        """Reuse (hit) and prepare (miss) counters"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'statements': len(self._statements),
+                'connections': len(self._prepared),
+                'hits': self._hits,
+                'misses': self._misses,
+                'reprepares': self._reprepares,
+                'hit_rate': self._hits / total if total else 0.0
+            }
+    
+    @staticmethod
+    def _prepare(cursor, name, statement, prepared):
+        try:
+            cursor.execute(statement)
+        except psycopg2.Error as e:
+            # Already prepared on this session by an earlier, untracked PREPARE
+            if e.pgcode != errorcodes.DUPLICATE_PREPARED_STATEMENT:
+                raise
+            cursor.connection.rollback()
+        prepared.add(name)
+    
+    def _execute_sql(self, name, param_count):
+        if not param_count:
+            return f"EXECUTE {self._prefix}{name};"
+        placeholders = ', '.join(['%s'] * param_count)
+        return f"EXECUTE {self._prefix}{name} ({placeholders});"
+    
+    @staticmethod
+    def _to_positional(query):
+        """Convert %s placeholders to $1, $2, ... for PREPARE"""
+        counter = iter(range(1, query.count('%s') + 1))
+        sql = re.sub(r'%s', lambda _: f"${next(counter)}", query).strip().rstrip(';')
+        return sql, query.count('%s')
+
+
+# Shared registry used by execute_prepared()
+statement_registry = PreparedStatementRegistry()
@@ -0,0 +1,215 @@
+"""
+SQL statements shared by the sync and async operation layers
+"""
+
+# Employees
+
+# Columns are listed, not *: GET_EMPLOYEE is prepared once per pooled connection,
+# and a prepared SELECT * fails ("cached plan must not change result type") once
+# a column is added. GET_ALL_EMPLOYEES fills the same cache, so it returns the same row.
+GET_EMPLOYEE = """
+SELECT employee_id, name, email, department, join_date, created_at
+FROM employees WHERE employee_id = %s;
+"""
+
+GET_ALL_EMPLOYEES = """
+SELECT employee_id, name, email, department, join_date, created_at
+FROM employees;
+"""
+
+# Leave balances
+
+GET_BALANCE = """
+SELECT balance FROM leave_balance
+WHERE employee_id = %s AND leave_type = %s;
+"""
+
+GET_ALL_BALANCES = """
+SELECT leave_type, balance FROM leave_balance
+WHERE employee_id = %s ORDER BY leave_type;
+"""
+
+UPSERT_BALANCE = """
+INSERT INTO leave_balance (employee_id, leave_type, balance, updated_at)
+VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+ON CONFLICT (employee_id, leave_type)
+DO UPDATE SET balance = EXCLUDED.balance, updated_at = CURRENT_TIMESTAMP;
+"""
+
+# Leave requests
+
+INSERT_LEAVE_REQUEST = """
+INSERT INTO leave_requests
+(employee_id, leave_type, start_date, end_date, days_count, reason, status)
+VALUES (%s, %s, %s, %s, %s, %s, 'approved')
+RETURNING id;
+"""
+
+GET_EMPLOYEE_REQUESTS = """
+SELECT id, leave_type, start_date, end_date, days_count, status, requested_at
+FROM leave_requests
+WHERE employee_id = %s
+ORDER BY requested_at DESC, id DESC
+LIMIT %s;
+"""
+
+# Keyset page of an employee's history, newest first. Rows come after the
+# (after_requested_at, after_id) cursor, so every page is an index range scan
+# on idx_leave_requests_employee_history however deep it is. A NULL filter
+# matches everything; a NULL date bound leaves that side of the window open.
+GET_EMPLOYEE_REQUESTS_PAGE = """
+SELECT id, leave_type, start_date, end_date, days_count, status, requested_at
+FROM leave_requests
+WHERE employee_id = %(employee_id)s
+AND (%(after_requested_at)s::TIMESTAMP IS NULL
+     OR (requested_at, id) < (%(after_requested_at)s::TIMESTAMP, %(after_id)s::INTEGER))
+AND (%(status)s::VARCHAR IS NULL OR status = %(status)s)
+AND (%(leave_type)s::VARCHAR IS NULL OR leave_type = %(leave_type)s)
+AND leave_period && daterange(%(from_date)s::DATE, %(to_date)s::DATE, '[]')
+ORDER BY requested_at DESC, id DESC
+LIMIT %(limit)s;
+"""
+
+
+def history_page_params(employee_id, limit, after=None, status=None,
+                        leave_type=None, from_date=None, to_date=None):
+    """Named parameters for GET_EMPLOYEE_REQUESTS_PAGE"""
+    after_requested_at, after_id = after if after else (None, None)
+    return {
+        'employee_id': employee_id,
+        'limit': limit,
+        'after_requested_at': after_requested_at,
+        'after_id': after_id,
+        'status': status,
+        'leave_type': leave_type,
+        'from_date': from_date,
+        'to_date': to_date
+    }
+
+# Params: employee_id, start_date, end_date
+# Answered by the GiST index behind the leave_requests_no_overlap constraint
+CHECK_OVERLAPPING_LEAVES = """
+SELECT id, leave_type, start_date, end_date, days_count
+FROM leave_requests
+WHERE employee_id = %s
+AND status = 'approved'
+AND leave_period && daterange(%s, %s, '[]');
+"""
+
+GET_FUTURE_LEAVES = """
+SELECT id, leave_type, start_date, end_date, days_count, requested_at
+FROM leave_requests
+WHERE employee_id = %s
+AND status = 'approved'
+AND start_date > %s
+ORDER BY start_date ASC;
+"""
+
+GET_LEAVES_IN_RANGE = """
+SELECT id, leave_type, start_date, end_date, days_count
+FROM leave_requests
+WHERE employee_id = %s
+AND status = 'approved'
+AND leave_period <@ daterange(%s, %s, '[]')
+ORDER BY start_date ASC;
+"""
+
+CANCEL_LEAVE_REQUEST = """
+UPDATE leave_requests
+SET status = 'cancelled'
+WHERE id = %s AND status = 'approved'
+RETURNING id, employee_id, leave_type, start_date, end_date, days_count;
+"""
+
+# Cancels every approved leave inside the range, credits each leave type once
+# and writes one ledger row per leave, all in a single statement.
+# balance_after is the running balance per leave type in start_date order.
+# Returns: id, leave_type, start_date, end_date, days_count, balance_after
+CANCEL_LEAVES_IN_RANGE = """
+WITH cancelled AS (
+    UPDATE leave_requests
+    SET status = 'cancelled'
+    WHERE employee_id = %(employee_id)s
+    AND status = 'approved'
+    AND leave_period <@ daterange(%(start_date)s, %(end_date)s, '[]')
+    RETURNING id, leave_type, start_date, end_date, days_count
+),
+totals AS (
+    SELECT leave_type, SUM(days_count) AS restored
+    FROM cancelled
+    GROUP BY leave_type
+),
+credited AS (
+    INSERT INTO leave_balance (employee_id, leave_type, balance, updated_at)
+    SELECT %(employee_id)s, leave_type, restored, CURRENT_TIMESTAMP
+    FROM totals
+    ON CONFLICT (employee_id, leave_type)
+    DO UPDATE SET balance = leave_balance.balance + EXCLUDED.balance, updated_at = CURRENT_TIMESTAMP
+    RETURNING leave_type, balance
+),
+ledger AS (
+    SELECT c.id, c.leave_type, c.start_date, c.end_date, c.days_count,
+           cr.balance - t.restored
+               + SUM(c.days_count) OVER (PARTITION BY c.leave_type ORDER BY c.start_date, c.id)
+               AS balance_after
+    FROM cancelled c
+    JOIN totals t ON t.leave_type = c.leave_type
+    JOIN credited cr ON cr.leave_type = c.leave_type
+),
+logged AS (
+    INSERT INTO leave_transactions
+    (employee_id, leave_type, transaction_type, amount, balance_before, balance_after, description)
+    SELECT %(employee_id)s, leave_type, 'credit', days_count, balance_after - days_count, balance_after,
+           'Cancelled leave from ' || to_char(start_date, 'YYYY-MM-DD') || ' to ' || to_char(end_date, 'YYYY-MM-DD')
+    FROM ledger
+)
+SELECT id, leave_type, start_date, end_date, days_count, balance_after
+FROM ledger
+ORDER BY start_date ASC, id ASC;
+"""
+
+# Params: employee_id, min_balance
+# Returns: outcome, request_id, leave_type, start_date, end_date, days_count, balance_before, balance_after
+CONFIRM_PENDING_LEAVE = "SELECT * FROM confirm_pending_leave(%s, %s);"
+
+# Params: employee_id, leave_type, start_date, end_date, days_count, min_balance
+# Returns the same columns as CONFIRM_PENDING_LEAVE
+APPLY_LEAVE_REQUEST = "SELECT * FROM apply_leave_request(%s, %s, %s, %s, %s, %s);"
+
+# Leave transactions
+
+INSERT_LEAVE_TRANSACTION = """
+INSERT INTO leave_transactions
+(employee_id, leave_type, transaction_type, amount, balance_before, balance_after, description)
+VALUES (%s, %s, %s, %s, %s, %s, %s);
+"""
+
+# Ledger entries in [start, end); the range on transaction_date lets the
+# planner skip monthly partitions and BRIN block ranges outside it
+GET_TRANSACTIONS_IN_RANGE = """
+SELECT id, employee_id, leave_type, transaction_type, amount,
+       balance_before, balance_after, description, transaction_date
+FROM leave_transactions
+WHERE transaction_date >= %s
+AND transaction_date < %s
+AND (%s::VARCHAR IS NULL OR employee_id = %s)
+ORDER BY transaction_date ASC;
+"""
+
+# Pending confirmations
+
+INSERT_PENDING_CONFIRMATION = """
+INSERT INTO pending_confirmations
+(employee_id, leave_type, start_date, end_date, days_count, expires_at)
+VALUES (%s, %s, %s, %s, %s, %s)
+RETURNING id;
+"""
+
+GET_PENDING_CONFIRMATION = """
+SELECT leave_type, start_date, end_date, days_count
+FROM pending_confirmations
+WHERE employee_id = %s AND expires_at > CURRENT_TIMESTAMP
+ORDER BY created_at DESC LIMIT 1;
+"""
+
+DELETE_PENDING_CONFIRMATIONS = "DELETE FROM pending_confirmations WHERE employee_id = %s;"
@@ -0,0 +1,139 @@
+"""
+Table-tagged query result cache used by execute_query
+"""
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+_bypass = ContextVar('query_cache_bypass', default=False)
+
+
+class QueryResultCache:
+    """
+    Bounded LRU cache of SELECT results.
+
+    Every cached result carries tags such as ('leave_balance', 'EMP101').
+    A write that touches a table for an employee invalidates the entries
+    tagged with that (table, employee) pair; a tag of (table, None)
+    invalidates every entry for the table. Entries also expire after a TTL,
+    which bounds staleness from writes made by other processes.
+    """
+
+    def __init__(self, maxsize=2000, ttl=30.0, max_rows=500):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._entries = OrderedDict()     # key -> (rows, expires_at, tags)
+        self._tag_index = {}              # tag -> set of keys
+        self._lock = threading.Lock()
+        self._generation = 0              # bumped on every invalidation
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(query, params):
+        """Build a hashable cache key from a query and its parameters"""
+        if isinstance(params, dict):
+            params = tuple(sorted(params.items()))
+        elif params is not None:
+            params = tuple(params)
+        return query, params
+
+    def get(self, key):
+        """Get cached rows, or None on a miss"""
+        if _bypass.get():
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                rows, expires_at, tags = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return list(rows)
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    @property
+    def generation(self):
+        """Invalidation counter; read it before running a query and pass it to set()"""
+        return self._generation
+
+    def set(self, key, rows, tags, generation=None):
+        """
+        Cache rows under the given (table, employee_id) tags. If `generation`
+        is given and a write invalidated anything since, the rows may be stale
+        and are not cached.
+        """
+        if len(rows) > self.max_rows:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            tags = tuple(tags)
+            self._entries[key] = (tuple(rows), time.monotonic() + self.ttl, tags)
+            for tag in tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+                self._tag_index.setdefault((tag[0], None), set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tags):
+        """Evict every entry carrying any of the given tags"""
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in list(self._tag_index.get(tag, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._tag_index.clear()
+
+    @contextmanager
+    def bypass(self):
+        """Skip cache lookups inside the block (for strongly consistent paths)"""
+        token = _bypass.set(True)
+        try:
+            yield
+        finally:
+            _bypass.reset(token)
+
+    def stats(self):
+        """Hit/miss/invalidation counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def _remove(self, key):
+        """Drop an entry and its tag index references (lock held)"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            for index_tag in (tag, (tag[0], None)):
+                keys = self._tag_index.get(index_tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._tag_index[index_tag]
@@ -0,0 +1,239 @@
+"""
+Deterministic synthetic dataset for the leave schema
+
+Generates employees, several years of leave requests (some cancelled),
+the matching leave_transactions ledger and the resulting leave_balance
+rows, for benchmarks and query-plan checks at realistic sizes.
+
+Every employee's history comes from its own Random seeded with
+(seed, employee_id), so the same seed always produces the same data,
+whatever the employee count or the order tables are generated in. Rows
+are produced lazily; nothing is held in memory beyond one employee.
+"""
+import csv
+import os
+import random
+from datetime import date, datetime, timedelta
+
+from leave_management_ai.business_calendar import get_calendar
+from leave_management_ai.config.settings import BUSINESS_RULES
+from leave_management_ai.database.bulk_import import CsvRowStream
+from leave_management_ai.database.connection import DatabaseConnection, query_cache
+from leave_management_ai.database.employee_directory import EmployeeDirectory
+from leave_management_ai.database.partitions import LedgerPartitionManager
+
+
+# Yearly allocation per leave type (matches the setup_db sample balances)
+ANNUAL_ALLOWANCE = {'casual': 12, 'sick': 12, 'vacation': 15, 'general': 10}
+
+DEPARTMENTS = ['Engineering', 'Marketing', 'Sales', 'HR', 'Finance', 'Operations', 'Support', 'Legal']
+
+FIRST_NAMES = ['John', 'Jane', 'Bob', 'Alice', 'Charlie', 'Priya', 'Wei', 'Fatima', 'Carlos', 'Olga',
+               'Kenji', 'Amara', 'Liam', 'Sofia', 'Arjun', 'Mei', 'Noah', 'Zara', 'Ivan', 'Leila']
+LAST_NAMES = ['Doe', 'Smith', 'Johnson', 'Williams', 'Brown', 'Sharma', 'Chen', 'Khan', 'Garcia',
+              'Petrova', 'Tanaka', 'Okafor', 'Murphy', 'Rossi', 'Patel', 'Wong', 'Miller', 'Ali']
+
+# Columns of each table in the order rows are generated (ids and
+# generated columns are left to the database)
+TABLE_COLUMNS = {
+    'employees': ['employee_id', 'name', 'email', 'department', 'join_date'],
+    'leave_balance': ['employee_id', 'leave_type', 'balance'],
+    'leave_requests': ['employee_id', 'leave_type', 'start_date', 'end_date', 'days_count',
+                       'status', 'reason', 'requested_at', 'approved_at'],
+    'leave_transactions': ['employee_id', 'leave_type', 'transaction_type', 'amount',
+                           'balance_before', 'balance_after', 'description', 'transaction_date']
+}
+
+# Load order respects the foreign keys
+TABLES = ['employees', 'leave_balance', 'leave_requests', 'leave_transactions']
+
+
+def business_days(start_date, end_date):
+    """Leave days in [start_date, end_date], counted like EntityExtractor does"""
+    return get_calendar().business_days(start_date, end_date)
+
+
+class SyntheticDataGenerator:
+    """
+    Seeded generator of a consistent leave dataset
+
+    Per employee and year: an allocation credit on 1 January, then leaves
+    requested 1-30 days ahead, 1-5 days long and never overlapping. A leave
+    that would break the minimum balance rule is never approved; a share of
+    approved leaves is cancelled and credited back, like cancel_approved_leaves.
+    Final balances equal the ledger's last balance_after per leave type.
+    """
+
+    def __init__(self, employees=1000, years=3, seed=42, end_year=None,
+                 leaves_per_year=8, cancel_rate=0.08, id_prefix='SYN'):
+        self.employees = employees
+        self.years = years
+        self.seed = seed
+        self.end_year = end_year or date.today().year
+        self.leaves_per_year = leaves_per_year
+        self.cancel_rate = cancel_rate
+        self.id_prefix = id_prefix
+
+    def employee_id(self, index):
+        return f"{self.id_prefix}{index:07d}"
+
+    def rows(self, table):
+        """Lazily yield the rows of one table (columns as in TABLE_COLUMNS)"""
+        for index in range(1, self.employees + 1):
+            history = self._employee_history(self.employee_id(index))
+            yield from history[table]
+
+    def write_files(self, directory):
+        """
+        Write one CSV file with a header per table
+        Returns dict table -> row count
+        """
+        os.makedirs(directory, exist_ok=True)
+        counts = {}
+        for table in TABLES:
+            path = os.path.join(directory, f"{table}.csv")
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(TABLE_COLUMNS[table])
+                count = 0
+                for row in self.rows(table):
+                    writer.writerow(row)
+                    count += 1
+            counts[table] = count
+        return counts
+
+    def load(self):
+        """
+        COPY every table into PostgreSQL in one transaction, then ANALYZE
+        so the planner sees the new row counts
+        Returns dict table -> row count
+        """
+        # COPY into the partitioned ledger fails on a month without a partition
+        LedgerPartitionManager().ensure(span=self.transaction_span())
+
+        db = DatabaseConnection()
+        connection = db.get_connection()
+        counts = {}
+        try:
+            cursor = connection.cursor()
+            for table in TABLES:
+                columns = ', '.join(TABLE_COLUMNS[table])
+                cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv);",
+                                   CsvRowStream(self.rows(table)))
+                counts[table] = cursor.rowcount
+            connection.commit()
+
+            for table in TABLES:
+                cursor.execute(f"ANALYZE {table};")
+            connection.commit()
+            cursor.close()
+        finally:
+            db.return_connection(connection)
+
+        query_cache.invalidate([(table, None) for table in TABLES])
+        EmployeeDirectory.instance().invalidate()
+        return counts
+
+    def transaction_span(self):
+        """
+        (first, last) day any ledger row can be dated: requests are made up
+        to 30 days before a leave, so the first December is included
+        """
+        return date(self.end_year - self.years, 12, 1), date(self.end_year, 12, 31)
+
+    def _employee_history(self, employee_id):
+        """All rows for one employee, from its own seeded Random"""
+        rng = random.Random(f"{self.seed}:{employee_id}")
+        first_year = self.end_year - self.years + 1
+
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        join_date = date(first_year - rng.randint(0, 5), rng.randint(1, 12), rng.randint(1, 28))
+        employee = (employee_id, f"{first} {last}",
+                    f"{first.lower()}.{last.lower()}.{employee_id.lower()}@company.com",
+                    rng.choice(DEPARTMENTS), join_date)
+
+        events = self._events(rng, first_year)
+        balances = {leave_type: 0 for leave_type in ANNUAL_ALLOWANCE}
+        min_balance = BUSINESS_RULES['min_leave_balance']
+        requests, transactions = [], []
+
+        for timestamp, _, kind, leave in sorted(events, key=lambda e: (e[0], e[1])):
+            if kind == 'allocation':
+                leave_type, amount = leave
+                before = balances[leave_type]
+                balances[leave_type] = before + amount
+                transactions.append((employee_id, leave_type, 'credit', amount, before,
+                                     balances[leave_type], f"Annual allocation {timestamp.year}", timestamp))
+                continue
+
+            leave_type, days = leave['leave_type'], leave['days']
+            span = f"{leave['start_date']:%Y-%m-%d} to {leave['end_date']:%Y-%m-%d}"
+            before = balances[leave_type]
+            if kind == 'request':
+                if before - days < min_balance:
+                    continue
+                balances[leave_type] = before - days
+                leave['request_index'] = len(requests)
+                transactions.append((employee_id, leave_type, 'debit', days, before,
+                                     balances[leave_type], f"Leave from {span}", timestamp))
+                requests.append([employee_id, leave_type, leave['start_date'], leave['end_date'], days,
+                                 'approved', None, timestamp, timestamp])
+            elif kind == 'cancel' and leave['request_index'] is not None:
+                balances[leave_type] = before + days
+                requests[leave['request_index']][5] = 'cancelled'
+                transactions.append((employee_id, leave_type, 'credit', days, before,
+                                     balances[leave_type], f"Cancelled leave from {span}", timestamp))
+
+        return {
+            'employees': [employee],
+            'leave_balance': [(employee_id, leave_type, balance) for leave_type, balance in balances.items()],
+            'leave_requests': [tuple(request) for request in requests],
+            'leave_transactions': transactions
+        }
+
+    def _events(self, rng, first_year):
+        """
+        Timestamped allocation, request and cancellation events as
+        (timestamp, order, kind, payload); order breaks timestamp ties
+        """
+        events = []
+        sequence = 0
+        for year in range(first_year, self.end_year + 1):
+            for leave_type, amount in ANNUAL_ALLOWANCE.items():
+                events.append((datetime(year, 1, 1), sequence, 'allocation', (leave_type, amount)))
+                sequence += 1
+
+            # Non-overlapping leaves, in date order
+            day = date(year, 1, 2)
+            year_end = date(year, 12, 31)
+            for _ in range(rng.randint(self.leaves_per_year // 2, self.leaves_per_year * 3 // 2)):
+                day += timedelta(days=rng.randint(5, max(6, 365 // self.leaves_per_year)))
+                start_date = day
+                end_date = start_date + timedelta(days=rng.randint(0, 4))
+                if end_date > year_end:
+                    break
+                day = end_date + timedelta(days=1)
+                days = business_days(start_date, end_date)
+                if days == 0:
+                    continue
+
+                requested_at = datetime.combine(start_date, datetime.min.time()) - timedelta(
+                    days=rng.randint(1, 30), hours=rng.randint(0, 14), minutes=rng.randint(0, 59)
+                )
+                cancel_at = None
+                if rng.random() < self.cancel_rate:
+                    cancel_at = requested_at + timedelta(hours=rng.randint(1, 72))
+                    cancel_at = min(cancel_at, datetime.combine(start_date, datetime.min.time()))
+                leave = {
+                    'leave_type': rng.choice(list(ANNUAL_ALLOWANCE)),
+                    'start_date': start_date,
+                    'end_date': end_date,
+                    'days': days,
+                    'request_index': None    # set once the request is approved
+                }
+                events.append((requested_at, sequence, 'request', leave))
+                sequence += 1
+                if cancel_at is not None:
+                    events.append((cancel_at, sequence, 'cancel', leave))
+                    sequence += 1
+        return events
@@ -2,16 +2,64 @@
 Natural language date parsing
 """
 import re
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 from dateutil import parser as dateutil_parser
 from dateutil.relativedelta import relativedelta
 
+from leave_management_ai.business_calendar import get_calendar
+from leave_management_ai.cache import TTLCache
+from leave_management_ai.config.settings import NLP_CONFIG
+from leave_management_ai.nlp.utterance import Utterance
+from leave_management_ai.tracing import traced
+
+
+_WEEKDAY_NAMES = ('monday|tuesday|wednesday|thursday|friday|saturday|sunday'
+                  '|mon|tues|tue|wed|thurs|thur|thu|fri|sat|sun')
+_MONTH_ABBREVIATIONS = 'jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec'
+_MONTH_NAMES = ('january|february|march|april|may|june|july|august|september|october|november|december'
+                '|jan|feb|mar|apr|jun|jul|aug|sept|sep|oct|nov|dec')
+
+# Every date expression parse_date_range looks for, as one alternation that
+# re.finditer tries at each position of the text, so a message is scanned
+# once. Groups mirror the formats parse_single_date understands, plus day
+# ranges within one month ("20-25 Jan"). A weekday written in front of a date
+# ("wed 20th dec") is part of that date's expression, not a second date.
+_DATE_EXPRESSIONS = re.compile(rf"""
+      (?:\b(?:{_WEEKDAY_NAMES})\b,?\s+(?:the\s+)?)?
+      (?:
+          (?P<numeric_day>\d{{1,2}})[-/](?P<numeric_month>\d{{1,2}})[-/](?P<numeric_year>\d{{2,4}})
+        | (?P<range_first>\d{{1,2}})(?:st|nd|rd|th)?\s*-\s*(?P<range_last>\d{{1,2}})(?:st|nd|rd|th)?
+          \s+(?P<range_month>{_MONTH_ABBREVIATIONS})[a-z]*(?:\s+(?P<range_year>\d{{4}}))?
+        | (?P<day>\d{{1,2}})(?:st|nd|rd|th)?\s+(?P<month>{_MONTH_ABBREVIATIONS})[a-z]*(?:\s+(?P<year>\d{{4}}))?
+        | (?P<month_day>\b(?:{_MONTH_NAMES})\.?\s+\d{{1,2}}(?:st|nd|rd|th)?\b(?:,?\s+\d{{4}}\b)?)
+        | \b(?P<ordinal>\d{{1,2}})(?:st|nd|rd|th)\b
+      )
+    | \b(?P<modifier>next|this)\s+(?P<modified_weekday>{_WEEKDAY_NAMES})\b
+    | \b(?P<weekday>{_WEEKDAY_NAMES})\b
+    | \b(?P<relative>today|now|tomorrow|yesterday)\b
+""", re.VERBOSE)
+
+# The "and" and "to" range patterns backtrack over the whole text when their
+# separator is missing, so they only run when this cheap scan finds one
+_AND_SEPARATOR = re.compile(r'\sand\s')
+_TO_SEPARATOR = re.compile(r'\s(?:to|until|till|-)\s')
+
+# The range patterns of parse_date_range: "X and Y", "from X to Y", "on X"
+_AND_RANGE = re.compile(r'(?:on\s+)?(.+?)\s+and\s+(.+?)(?:\s+|$|,|\.|\band\b)')
+_FROM_TO_RANGE = re.compile(r'(?:from\s+)?(.+?)\s+(?:to|until|till|-)\s+(.+?)(?:\s|$|,|\.)')
+_ON_DATE = re.compile(r'on\s+(.+?)(?:\s|$|,|\.)')
+
 
 class DateParser:
     """Parse dates from natural language text"""
     
-    def __init__(self):
-        self.today = datetime.now().date()
+    _MISSING = object()
+    
+    def __init__(self, cache_size=None):
+        self._pinned_today = None
+        # (kind, normalized text, today) -> parse result; emptied when the day changes
+        self._cache = TTLCache(maxsize=NLP_CONFIG['date_cache_size'] if cache_size is None else cache_size)
+        self._cache_day = None
         self.weekdays = {
             'monday': 0, 'mon': 0,
             'tuesday': 1, 'tue': 1, 'tues': 1,
@@ -22,12 +70,48 @@ class DateParser:
             'sunday': 6, 'sun': 6
         }
     
+    @property
+    def today(self):
+        """
+        The date relative expressions resolve against
+        The current local date, read on every call so a long-running process
+        rolls over at midnight; assigning a date pins it (benchmarks do)
+        """
+        return self._pinned_today or datetime.now().date()
+    
+    @today.setter
+    def today(self, value):
+        self._pinned_today = value
+    
+    def _memoized(self, kind, text, parse, source=None):
+        """
+        Cached parse(source or text), keyed on the normalized text and today's date
+        The first call after the date changes drops every entry, since
+        relative dates in them resolved against the previous day
+        """
+        today = self.today
+        if today != self._cache_day:
+            self._cache.clear()
+            self._cache_day = today
+        key = (kind, text, today)
+        result = self._cache.get(key, self._MISSING)
+        if result is self._MISSING:
+            result = parse(text if source is None else source)
+            self._cache.set(key, result)
+        return result
+    
+    def cache_stats(self):
+        """Hit/miss/eviction counters of the parse cache and the day it holds"""
+        return dict(self._cache.stats(), day=self._cache_day)
+    
     def parse_single_date(self, text):
         """
         Parse a single date from text
         Returns datetime.date object or None
         """
-        text = text.lower().strip()
+        return self._memoized('single', text.lower().strip(), self._parse_single_date)
+    
+    def _parse_single_date(self, text):
         
         # Handle relative dates
         if text in ['today', 'now']:
@@ -45,59 +129,107 @@ class DateParser:
             modifier, day = match.groups()
             return self._get_weekday_date(day, modifier == 'next')
         
-        # Just a weekday
+        # Just a weekday (whole words only: "mon" must not match "month")
+        words = set(re.findall(r'\w+', text))
         for day_name, day_num in self.weekdays.items():
-            if day_name in text:
+            if day_name in words:
                 return self._get_next_weekday(day_num)
         
         # Format: DD-MM-YYYY or DD/MM/YYYY (13-01-2026 or 13/01/2026)
         match = re.search(r'(\d{1,2})[-/](\d{1,2})[-/](\d{2,4})', text)
         if match:
-            day, month, year = match.groups()
-            year = int(year)
-            if year < 100:
-                year += 2000
-            try:
-                return datetime(year, int(month), int(day)).date()
-            except:
-                pass
+            result_date = self._numeric_date(*match.groups())
+            if result_date:
+                return result_date
         
         # Format: DD Month YYYY or DDth Month YYYY (13 Jan 2026 or 13th Jan 2026)
         match = re.search(r'(\d{1,2})(st|nd|rd|th)?\s+(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)(?:\s+(\d{4}))?', text)
         if match:
-            day = int(match.group(1))
-            month_str = match.group(3)
-            year_str = match.group(4)
-            year = int(year_str) if year_str else self.today.year
-            try:
-                parsed = dateutil_parser.parse(f"{day} {month_str} {year}")
-                result_date = parsed.date()
-                # If date is in the past and no year specified, assume next year
-                if not year_str and result_date < self.today:
-                    result_date = result_date.replace(year=year + 1)
+            result_date = self._day_month_date(match.group(1), match.group(3), match.group(4))
+            if result_date:
                 return result_date
-            except:
-                pass
         
         # Try parsing with dateutil (catches many formats)
         try:
-            parsed = dateutil_parser.parse(text, fuzzy=True, default=datetime.now())
+            parsed = dateutil_parser.parse(text, fuzzy=True, default=datetime.combine(self.today, time()))
             return parsed.date()
         except:
             pass
         
         return None
     
+    def find_dates(self, text):
+        """
+        Find every date expression in text (a string or an Utterance) in a
+        single left-to-right pass
+        Returns a list of (start, end, date) tuples in text order; expressions
+        that name an impossible date (31-02-2026) are skipped, and a day range
+        ("20-25 Jan") gives its first and last day, both with the range's span
+        """
+        found = []
+        for match in Utterance.of(text).finditer(_DATE_EXPRESSIONS):
+            if match.group('range_last'):
+                dates = self._resolve_day_range(match)
+            else:
+                dates = [self._resolve_expression(match)]
+            found.extend((match.start(), match.end(), date) for date in dates if date)
+        return found
+    
+    def _resolve_day_range(self, match):
+        """
+        First and last day of a "20-25 Jan" match, or [] if it names no such range
+        The last day picks the year, so a range is never split across two years
+        """
+        last = self._day_month_date(match.group('range_last'), match.group('range_month'), match.group('range_year'))
+        if not last:
+            return []
+        try:
+            first = last.replace(day=int(match.group('range_first')))
+        except ValueError:
+            return []
+        return [first, last] if first <= last else []
+    
+    def _resolve_expression(self, match):
+        """Turn one _DATE_EXPRESSIONS match into a date, or None"""
+        groups = match.groupdict()
+        if groups['numeric_day']:
+            return self._numeric_date(groups['numeric_day'], groups['numeric_month'], groups['numeric_year'])
+        if groups['day']:
+            return self._day_month_date(groups['day'], groups['month'], groups['year'])
+        if groups['month_day']:
+            # "March 5": the given day of that month, this year unless one is given
+            try:
+                return dateutil_parser.parse(groups['month_day'],
+                                             default=datetime.combine(self.today, time())).date()
+            except (ValueError, OverflowError):
+                return None
+        if groups['ordinal']:
+            # "20th": that day of the current month
+            try:
+                return self.today.replace(day=int(groups['ordinal']))
+            except ValueError:
+                return None
+        if groups['modifier']:
+            return self._get_weekday_date(groups['modified_weekday'], groups['modifier'] == 'next')
+        if groups['weekday']:
+            return self._get_next_weekday(self.weekdays[groups['weekday']])
+        return self.parse_single_date(groups['relative'])
+    
+    @traced('date_parsing')
     def parse_date_range(self, text):
         """
-        Parse date range from text
+        Parse date range from text (a string or an Utterance)
         Returns (start_date, end_date) tuple or (None, None)
         """
-        text = text.lower()
+        utterance = Utterance.of(text)
+        return self._memoized('range', utterance.lower, self._parse_date_range, utterance)
+    
+    def _parse_date_range(self, utterance):
         
+        # Patterns run through the utterance, so their matches are shared with
+        # any other stage that asks for them
         # Pattern 1: "X and Y" (Monday and Tuesday, 20th and 21st)
-        and_pattern = r'(?:on\s+)?(.+?)\s+and\s+(.+?)(?:\s+|$|,|\.|\band\b)'
-        match = re.search(and_pattern, text)
+        match = utterance.search(_AND_SEPARATOR) and utterance.search(_AND_RANGE)
         if match:
             first_text, second_text = match.groups()
             # Clean up the texts
@@ -120,8 +252,7 @@ class DateParser:
                     return second_date, first_date
         
         # Pattern 2: "from X to Y" or "X to Y"
-        from_to_pattern = r'(?:from\s+)?(.+?)\s+(?:to|until|till|-)\s+(.+?)(?:\s|$|,|\.)'
-        match = re.search(from_to_pattern, text)
+        match = utterance.search(_TO_SEPARATOR) and utterance.search(_FROM_TO_RANGE)
         if match:
             start_text, end_text = match.groups()
             start_date = self.parse_single_date(start_text)
@@ -130,8 +261,7 @@ class DateParser:
                 return start_date, end_date
         
         # Pattern 3: "on DATE" (single day)
-        on_pattern = r'on\s+(.+?)(?:\s|$|,|\.)'
-        match = re.search(on_pattern, text)
+        match = utterance.search(_ON_DATE)
         if match:
             date_text = match.group(1)
             # Make sure it's not part of an "and" pattern
@@ -140,21 +270,14 @@ class DateParser:
                 if date:
                     return date, date
         
-        # Pattern 4: Try to find two dates in the text
+        # Pattern 4: the first two distinct dates anywhere in the text
         dates = []
-        words = text.split()
-        for i in range(len(words)):
-            for j in range(i+1, min(i+6, len(words)+1)):
-                phrase = ' '.join(words[i:j])
-                # Skip if it contains 'and' (already handled above)
-                if ' and ' in phrase:
-                    continue
-                date = self.parse_single_date(phrase)
-                if date and date not in dates:
-                    dates.append(date)
-                    if len(dates) == 2:
-                        dates.sort()
-                        return dates[0], dates[1]
+        for _, _, date in self.find_dates(utterance):
+            if date not in dates:
+                dates.append(date)
+                if len(dates) == 2:
+                    dates.sort()
+                    return dates[0], dates[1]
         
         # If only one date found, assume single day
         if len(dates) == 1:
@@ -162,6 +285,32 @@ class DateParser:
         
         return None, None
     
+    def _numeric_date(self, day, month, year):
+        """DD-MM-YY(YY) parts to a date, or None if there is no such day"""
+        year = int(year)
+        if year < 100:
+            year += 2000
+        try:
+            return datetime(year, int(month), int(day)).date()
+        except:
+            return None
+    
+    def _day_month_date(self, day, month_str, year_str):
+        """
+        "13 Jan [2026]" parts to a date, or None
+        Without a year, a date already past means next year's
+        """
+        year = int(year_str) if year_str else self.today.year
+        try:
+            parsed = dateutil_parser.parse(f"{int(day)} {month_str} {year}")
+            result_date = parsed.date()
+            # If date is in the past and no year specified, assume next year
+            if not year_str and result_date < self.today:
+                result_date = result_date.replace(year=year + 1)
+            return result_date
+        except:
+            return None
+    
     def _get_next_weekday(self, target_day):
         """Get the next occurrence of a weekday"""
         current_day = self.today.weekday()
@@ -191,16 +340,10 @@ class DateParser:
         
         return self.today + timedelta(days=days_ahead)
     
-    def calculate_business_days(self, start_date, end_date, include_weekends=False):
-        """Calculate number of days between two dates"""
-        if include_weekends:
-            return (end_date - start_date).days + 1
-        
-        # Count business days only
-        days = 0
-        current = start_date
-        while current <= end_date:
-            if current.weekday() < 5:  # Monday = 0, Sunday = 6
-                days += 1
-            current += timedelta(days=1)
-        return days
\ No newline at end of file
+    def calculate_business_days(self, start_date, end_date, include_weekends=False, calendar=None):
+        """
+        Calculate number of leave days between two dates
+        Public holidays of `calendar` (default: the default business calendar) are not counted
+        """
+        calendar = calendar or get_calendar()
+        return calendar.business_days(start_date, end_date, include_weekends)
\ No newline at end of file
@@ -2,22 +2,26 @@
 Entity extraction from user text
 """
 import re
-import spacy
-from leave_management_ai.config.settings import BUSINESS_RULES
+from leave_management_ai.business_calendar import get_calendar
+from leave_management_ai.config.settings import BUSINESS_RULES, NLP_CONFIG
 from leave_management_ai.nlp.date_parser import DateParser
+from leave_management_ai.nlp.utterance import Utterance
+
+
+# Employee ID patterns, matched on the lowercase text (IDs are upper-cased on return)
+_EMP_PREFIXED_ID = re.compile(r'emp[-_]?(\d+)')
+_E_PREFIXED_ID = re.compile(r'\be[-_]?(\d+)')
+_LABELLED_ID = re.compile(r'(?:employee|emp)\s*(?:id|code|number|no)[:\s]*([a-z0-9]+)')
+_BARE_ID = re.compile(r'\b([a-z]{2,4}\d{2,6})\b')
 
 
 class EntityExtractor:
     """Extract entities like employee ID, dates, leave type from text"""
     
     def __init__(self):
-        try:
-            self.nlp = spacy.load('en_core_web_sm')
-        except OSError:
-            print("⚠ spaCy model not found. Run: python -m spacy download en_core_web_sm")
-            raise
-        
+        self._nlp = None
         self.date_parser = DateParser()
+        self.calendar = get_calendar()
         
         # Leave type keywords
         self.leave_type_keywords = {
@@ -26,47 +30,82 @@ class EntityExtractor:
             'vacation': ['vacation', 'holiday', 'vl', 'annual'],
             'general': ['leave', 'general']
         }
+        self.compile()
+    
+    def compile(self):
+        """
+        Index leave_type_keywords for extract_leave_type (call again after
+        changing them): (keyword, priority, leave type) entries keyed on the
+        keyword's first characters, so each token costs one dict lookup
+        """
+        keywords = [(keyword, priority, leave_type)
+                    for priority, (leave_type, words) in enumerate(self.leave_type_keywords.items())
+                    for keyword in words]
+        self._prefix_length = min(len(keyword) for keyword, _, _ in keywords)
+        self._keyword_index = {}
+        for entry in keywords:
+            self._keyword_index.setdefault(entry[0][:self._prefix_length], []).append(entry)
+    
+    @property
+    def nlp(self):
+        """
+        spaCy pipeline, loaded on first access
+        None of the extraction methods need it, so spaCy is never imported
+        unless something asks for it (or warm_up() does)
+        """
+        if self._nlp is None:
+            import spacy
+            try:
+                self._nlp = spacy.load(NLP_CONFIG['spacy_model'])
+            except OSError:
+                print(f"⚠ spaCy model not found. Run: python -m spacy download {NLP_CONFIG['spacy_model']}")
+                raise
+        return self._nlp
+    
+    def warm_up(self):
+        """Load the spaCy pipeline now instead of on first use"""
+        return self.nlp
     
     def extract_employee_id(self, text):
         """
-        Extract employee ID from text
+        Extract employee ID from text (a string or an Utterance)
         Patterns: EMP123, emp-123, E123, employee id 123, etc.
         """
-        text_upper = text.upper()
+        utterance = Utterance.of(text)
         
         # Pattern 1: EMP followed by numbers
-        match = re.search(r'EMP[-_]?(\d+)', text_upper)
+        match = utterance.search(_EMP_PREFIXED_ID)
         if match:
             return f"EMP{match.group(1)}"
         
         # Pattern 2: E followed by numbers
-        match = re.search(r'\bE[-_]?(\d+)', text_upper)
+        match = utterance.search(_E_PREFIXED_ID)
         if match:
             return f"E{match.group(1)}"
         
         # Pattern 3: "employee id" or "emp id" followed by alphanumeric
-        match = re.search(r'(?:EMPLOYEE|EMP)\s*(?:ID|CODE|NUMBER|NO)[:\s]*([A-Z0-9]+)', text_upper)
+        match = utterance.search(_LABELLED_ID)
         if match:
-            return match.group(1)
+            return match.group(1).upper()
         
         # Pattern 4: Just alphanumeric ID at the end
-        match = re.search(r'\b([A-Z]{2,4}\d{2,6})\b', text_upper)
+        match = utterance.search(_BARE_ID)
         if match:
-            return match.group(1)
+            return match.group(1).upper()
         
         return None
     
     def extract_dates(self, text):
         """
-        Extract date range from text
+        Extract date range from text (a string or an Utterance)
         Returns (start_date, end_date, days_count) or (None, None, 0)
         """
         start_date, end_date = self.date_parser.parse_date_range(text)
         
         if start_date and end_date:
-            # Calculate days based on configuration
-            days_count = self.date_parser.calculate_business_days(
-                start_date, 
+            # Calculate days based on configuration; public holidays are not charged
+            days_count = self.calendar.business_days(
+                start_date,
                 end_date,
                 include_weekends=BUSINESS_RULES['weekend_counts']
             )
@@ -76,26 +115,33 @@ class EntityExtractor:
     
     def extract_leave_type(self, text):
         """
-        Extract leave type from text
+        Extract leave type from text (a string or an Utterance)
         Returns leave type key or 'general' as default
         """
-        text_lower = text.lower()
-        
-        for leave_type, keywords in self.leave_type_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    return leave_type
+        # A token starting with a keyword names its type ("holidays" -> vacation);
+        # when several types are named, the first in leave_type_keywords wins
+        best_priority, best_type = len(self.leave_type_keywords), 'general'  # default
+        index, length = self._keyword_index, self._prefix_length
+        for word, _, _ in Utterance.of(text).tokens:
+            entries = index.get(word[:length])
+            if entries:
+                for keyword, priority, leave_type in entries:
+                    if priority < best_priority and word.startswith(keyword):
+                        best_priority, best_type = priority, leave_type
+                if best_priority == 0:
+                    break
         
-        return 'general'  # default
+        return best_type
     
     def extract_all_entities(self, text):
         """
-        Extract all entities from text
+        Extract all entities from text (a string or an Utterance)
         Returns dict with employee_id, dates, leave_type
         """
-        employee_id = self.extract_employee_id(text)
-        start_date, end_date, days_count = self.extract_dates(text)
-        leave_type = self.extract_leave_type(text)
+        utterance = Utterance.of(text)
+        employee_id = self.extract_employee_id(utterance)
+        start_date, end_date, days_count = self.extract_dates(utterance)
+        leave_type = self.extract_leave_type(utterance)
         
         return {
             'employee_id': employee_id,
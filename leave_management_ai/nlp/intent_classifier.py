@@ -3,6 +3,17 @@ Intent classification for user queries
 """
 import re
 
+from leave_management_ai.config.settings import NLP_CONFIG
+from leave_management_ai.nlp.utterance import Utterance
+
+
+# Whole-message replies to a pending confirmation
+CONFIRMATION_WORDS = frozenset(['yes', 'yep', 'yeah', 'ok', 'okay', 'confirm', 'sure'])
+CANCEL_WORDS = frozenset(['no', 'nope', 'nah'])
+
+# Checked before the exact replies above, in this order
+PRIORITY_INTENTS = ('cancel_approved_leave', 'check_eligibility')
+
 
 class IntentClassifier:
     """Classify user intent from text"""
@@ -66,44 +77,91 @@ class IntentClassifier:
                 r'\bmy\s+(leave\s+)?requests',
             ],
         }
+        self.compile()
+    
+    def compile(self):
+        """
+        Compile intent_patterns once (call again after changing them): one
+        alternation per intent, so an intent is tested with a single scan of
+        the text, plus the same alternation with a named group per pattern,
+        which scores confidence by continuing that scan
+        """
+        self._intent_matchers = {
+            intent: re.compile('|'.join(f"(?:{pattern})" for pattern in patterns))
+            for intent, patterns in self.intent_patterns.items()
+        }
+        # Captures make the alternation several times slower, so classify()
+        # keeps the non-capturing one and only scoring uses these
+        self._pattern_scanners = {
+            intent: re.compile('|'.join(f"(?P<p{index}>{pattern})" for index, pattern in enumerate(patterns)))
+            for intent, patterns in self.intent_patterns.items()
+        }
+        # Everything after the cancel/eligibility checks and the exact replies, in table order
+        self._remaining_intents = [
+            (intent, matcher) for intent, matcher in self._intent_matchers.items()
+            if intent not in PRIORITY_INTENTS
+        ]
     
     def classify(self, text):
         """
-        Classify user intent from text
+        Classify user intent from text (a string or an Utterance)
         Returns intent string or 'unknown'
         """
-        text_lower = text.lower()
-        
+        return self._match(Utterance.of(text))[0]
+    
+    def _match(self, utterance):
+        """
+        Returns (intent or 'unknown', the match that decided it); the match
+        is None for the exact replies and 'unknown'
+        """
         # PRIORITY 1: Cancel approved leave (check FIRST to prevent misclassification)
         # This must come before apply_leave since "cancel sick leave" contains "sick leave"
-        for pattern in self.intent_patterns.get('cancel_approved_leave', []):
-            if re.search(pattern, text_lower):
-                return 'cancel_approved_leave'
-        
         # PRIORITY 2: Check eligibility intent (questions with modal verbs)
-        for pattern in self.intent_patterns.get('check_eligibility', []):
-            if re.search(pattern, text_lower):
-                return 'check_eligibility'
+        for intent in PRIORITY_INTENTS:
+            matcher = self._intent_matchers.get(intent)
+            if matcher is not None:
+                match = matcher.search(utterance.lower)
+                if match:
+                    return intent, match
         
         # PRIORITY 3: Simple confirmations
-        confirmation_words = ['yes', 'yep', 'yeah', 'ok', 'okay', 'confirm', 'sure']
-        if text_lower.strip() in confirmation_words:
-            return 'confirm_leave'
+        stripped = utterance.stripped
+        if stripped in CONFIRMATION_WORDS:
+            return 'confirm_leave', None
         
         # PRIORITY 4: Simple cancellations (for pending requests)
-        cancel_words = ['no', 'nope', 'nah']
-        if text_lower.strip() in cancel_words:
-            return 'cancel_request'
+        if stripped in CANCEL_WORDS:
+            return 'cancel_request', None
         
         # PRIORITY 5: Check other intents
-        for intent, patterns in self.intent_patterns.items():
-            if intent in ['check_eligibility', 'cancel_approved_leave']:  # Already checked above
-                continue
-            for pattern in patterns:
-                if re.search(pattern, text_lower):
-                    return intent
+        for intent, matcher in self._remaining_intents:
+            match = matcher.search(utterance.lower)
+            if match:
+                return intent, match
         
-        return 'unknown'
+        return 'unknown', None
+    
+    def classify_with_confidence(self, text):
+        """
+        Classify user intent and score it in one call: the scan that found
+        the intent continues from its match to count the other patterns
+        Returns (intent or 'unknown', confidence between 0 and 1)
+        """
+        utterance = Utterance.of(text)
+        intent, match = self._match(utterance)
+        if intent == 'unknown':
+            return intent, 0.0
+        return intent, self._score(utterance.lower, intent, match.start() if match else 0)
+    
+    def classify_many(self, texts, with_confidence=False):
+        """
+        Classify a batch of texts
+        Returns a list of intents, or of (intent, confidence) with with_confidence=True
+        """
+        if with_confidence:
+            return [self.classify_with_confidence(text) for text in texts]
+        classify = self.classify
+        return [classify(text) for text in texts]
     
     def get_confidence(self, text, intent):
         """
@@ -112,18 +170,39 @@ class IntentClassifier:
         """
         if intent == 'unknown':
             return 0.0
+        return self._score(Utterance.of(text).lower, intent)
+    
+    def _score(self, text_lower, intent, start=0):
+        """
+        Confidence from the number of distinct patterns of `intent` that one
+        scan of its alternation matches; nothing matches before `start`
+        """
+        scanner = self._pattern_scanners.get(intent)
+        if scanner is None:
+            return 0.0
         
-        text_lower = text.lower()
-        patterns = self.intent_patterns.get(intent, [])
-        
-        # Count matching patterns
-        matches = 0
-        for pattern in patterns:
-            if re.search(pattern, text_lower):
-                matches += 1
+        matched = set()
+        for match in scanner.finditer(text_lower, start):
+            matched.add(match.lastgroup)
+            if len(matched) == 2:
+                break  # The score is capped at two patterns
         
         # Simple confidence: more matches = higher confidence
-        if matches > 0:
-            return min(0.6 + (matches * 0.2), 1.0)
+        if matched:
+            return min(0.6 + (len(matched) * 0.2), 1.0)
         
-        return 0.0
\ No newline at end of file
+        return 0.0
+
+def create_intent_classifier(backend=None):
+    """
+    Get the classifier selected by NLP_CONFIG['intent_backend']:
+    'regex' (IntentClassifier) or 'ngram' (NgramIntentClassifier)
+    """
+    backend = backend or NLP_CONFIG['intent_backend']
+    if backend == 'ngram':
+        # Imported here so the regex backend never pays for NumPy
+        from leave_management_ai.nlp.ngram_model import NgramIntentClassifier
+        return NgramIntentClassifier()
+    if backend != 'regex':
+        raise ValueError(f"Unknown intent backend {backend!r}; expected 'regex' or 'ngram'")
+    return IntentClassifier()
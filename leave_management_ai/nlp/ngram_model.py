@@ -0,0 +1,244 @@
+"""
+Hashed n-gram linear intent model (NumPy)
+
+Features are word unigrams and bigrams plus character 3-5 grams of each
+word, hashed into a fixed number of buckets with CRC32 (stable across
+processes, unlike hash()). A softmax regression over those features is
+trained by full-batch gradient descent, and its probabilities are
+calibrated by temperature scaling on a held-out split. Weights are
+stored as float16 in a compressed .npz file.
+
+Inference works on a whole batch at once: all features of all texts
+are gathered from the weight matrix in one operation and summed per
+text with np.add.reduceat.
+"""
+import functools
+import json
+import math
+import os
+import re
+import zlib
+
+import numpy as np
+
+from leave_management_ai.config.settings import NLP_CONFIG
+from leave_management_ai.nlp.utterance import Utterance
+
+
+DEFAULT_DIMENSIONS = 2 ** 15
+CHAR_NGRAMS = (3, 4, 5)
+TEMPERATURES = (0.25, 0.35, 0.5, 0.75, 1.0, 1.25, 1.5, 2.0, 3.0)
+
+_WORDS = re.compile(r"[a-z0-9']+")
+
+
+def word_features(word):
+    """Feature strings contributed by one word: the word itself and its char 3-5 grams"""
+    padded = f"<{word}>"
+    features = [f"w:{word}"]
+    for size in CHAR_NGRAMS:
+        features += [f"c:{padded[i:i + size]}" for i in range(len(padded) - size + 1)]
+    return features
+
+
+def extract_features(text):
+    """Feature strings of one text: word 1-2 grams and char 3-5 grams of each word"""
+    words = _WORDS.findall(text.lower())
+    features = [feature for word in words for feature in word_features(word)]
+    features += [f"b:{first} {second}" for first, second in zip(words, words[1:])]
+    return features
+
+
+def _bucket(feature, dimensions):
+    return zlib.crc32(feature.encode('utf-8')) % dimensions
+
+
+@functools.lru_cache(maxsize=65536)
+def _word_buckets(word, dimensions):
+    """Hashed features of a word; words repeat, so this is cached"""
+    return tuple(_bucket(feature, dimensions) for feature in word_features(word))
+
+
+@functools.lru_cache(maxsize=65536)
+def _bigram_bucket(first, second, dimensions):
+    return _bucket(f"b:{first} {second}", dimensions)
+
+
+def read_utterances(path):
+    """Read (texts, intents) from a JSONL file of {"text": ..., "intent": ...} objects"""
+    texts, intents = [], []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                texts.append(record['text'])
+                intents.append(record['intent'])
+    return texts, intents
+
+
+class NgramIntentModel:
+    """Softmax regression over hashed n-gram features"""
+
+    def __init__(self, labels, weights, temperature=1.0):
+        self.labels = list(labels)
+        self.weights = weights                  # (dimensions + 1, labels); last row is the bias
+        self.temperature = float(temperature)
+        self.dimensions = weights.shape[0] - 1
+
+    def featurize(self, texts):
+        """
+        Hash a batch of texts into one flat sparse representation
+        Returns (indices, values, offsets): the features of text i are
+        indices[offsets[i]:offsets[i + 1]], each text L2-normalized, and
+        every text has the bias feature, so no row is empty
+        """
+        indices, values, offsets = [], [], [0]
+        bias = self.dimensions
+        for text in texts:
+            # Same buckets as hashing every string from extract_features(text)
+            words = _WORDS.findall(text.lower())
+            buckets = {}
+            for word in words:
+                for bucket in _word_buckets(word, self.dimensions):
+                    buckets[bucket] = buckets.get(bucket, 0) + 1
+            for first, second in zip(words, words[1:]):
+                bucket = _bigram_bucket(first, second, self.dimensions)
+                buckets[bucket] = buckets.get(bucket, 0) + 1
+            norm = math.sqrt(sum(count * count for count in buckets.values())) or 1.0
+            indices.extend(buckets)
+            values.extend(count / norm for count in buckets.values())
+            indices.append(bias)
+            values.append(1.0)
+            offsets.append(len(indices))
+        return (np.asarray(indices, dtype=np.int64), np.asarray(values, dtype=np.float32),
+                np.asarray(offsets, dtype=np.int64))
+
+    def logits(self, features):
+        """Unscaled class scores for featurize() output, shape (texts, labels)"""
+        indices, values, offsets = features
+        contributions = self.weights[indices] * values[:, None]
+        return np.add.reduceat(contributions, offsets[:-1], axis=0)
+
+    def predict_proba(self, texts):
+        """Calibrated class probabilities, shape (texts, labels)"""
+        if not texts:
+            return np.zeros((0, len(self.labels)), dtype=np.float32)
+        return _softmax(self.logits(self.featurize(texts)) / self.temperature)
+
+    @classmethod
+    def fit(cls, texts, intents, dimensions=DEFAULT_DIMENSIONS, epochs=300, learning_rate=0.5,
+            l2=1e-4, holdout=0.2, seed=13):
+        """
+        Train on labelled texts
+        A seeded `holdout` share (stratified by intent) picks the softmax
+        temperature with the lowest log loss; the final model is then
+        trained on every example with that temperature.
+        """
+        labels = sorted(set(intents))
+        targets = np.array([labels.index(intent) for intent in intents])
+
+        rng = np.random.default_rng(seed)
+        held_out = np.zeros(len(texts), dtype=bool)
+        for label in range(len(labels)):
+            members = np.flatnonzero(targets == label)
+            count = int(len(members) * holdout)
+            held_out[rng.choice(members, size=count, replace=False)] = True
+
+        temperature = 1.0
+        if held_out.any():
+            train = [i for i in range(len(texts)) if not held_out[i]]
+            model = cls._train(labels, [texts[i] for i in train], targets[~held_out],
+                               dimensions, epochs, learning_rate, l2)
+            logits = model.logits(model.featurize([texts[i] for i in np.flatnonzero(held_out)]))
+            losses = [_log_loss(_softmax(logits / t), targets[held_out]) for t in TEMPERATURES]
+            temperature = TEMPERATURES[int(np.argmin(losses))]
+
+        model = cls._train(labels, texts, targets, dimensions, epochs, learning_rate, l2)
+        model.temperature = temperature
+        return model
+
+    @classmethod
+    def _train(cls, labels, texts, targets, dimensions, epochs, learning_rate, l2):
+        """Full-batch gradient descent with AdaGrad step sizes"""
+        model = cls(labels, np.zeros((dimensions + 1, len(labels)), dtype=np.float32))
+        indices, values, offsets = model.featurize(texts)
+        rows = np.repeat(np.arange(len(texts)), np.diff(offsets))
+        onehot = np.eye(len(labels), dtype=np.float32)[targets]
+        squared = np.zeros_like(model.weights)
+
+        for _ in range(epochs):
+            probabilities = _softmax(model.logits((indices, values, offsets)))
+            errors = (probabilities - onehot) / len(texts)
+            gradient = np.zeros_like(model.weights)
+            np.add.at(gradient, indices, values[:, None] * errors[rows])
+            gradient[:-1] += l2 * model.weights[:-1]
+            squared += gradient * gradient
+            model.weights -= learning_rate * gradient / (np.sqrt(squared) + 1e-8)
+        return model
+
+    def save(self, path):
+        """Write labels, float16 weights and the temperature to a compressed .npz"""
+        np.savez_compressed(path, weights=self.weights.astype(np.float16),
+                            labels=np.array(self.labels), temperature=np.float32(self.temperature))
+
+    @classmethod
+    def load(cls, path):
+        """Load a model written by save()"""
+        with np.load(path) as data:
+            return cls(data['labels'].tolist(), data['weights'].astype(np.float32),
+                       float(data['temperature']))
+
+
+class NgramIntentClassifier:
+    """
+    IntentClassifier-compatible wrapper around NgramIntentModel
+    A prediction below NLP_CONFIG['confidence_threshold'] becomes 'unknown'.
+    """
+
+    def __init__(self, model_path=None, threshold=None, model=None):
+        if model is None:
+            model_path = model_path or NLP_CONFIG['intent_model_path']
+            if not os.path.exists(model_path):
+                raise FileNotFoundError(f"No intent model at {model_path}; run: python train_intent_model.py train")
+            model = NgramIntentModel.load(model_path)
+        self.model = model
+        self.threshold = NLP_CONFIG['confidence_threshold'] if threshold is None else threshold
+
+    def classify_many(self, texts, with_confidence=False):
+        """
+        Classify a batch of texts (strings or Utterances) in one vectorized pass
+        Returns a list of intents, or of (intent, confidence) with with_confidence=True
+        """
+        texts = [text.lower if isinstance(text, Utterance) else text for text in texts]
+        probabilities = self.model.predict_proba(texts)
+        best = probabilities.argmax(axis=1)
+        results = []
+        for label, confidence in zip(best, probabilities[np.arange(len(best)), best]):
+            intent = self.model.labels[label] if confidence >= self.threshold else 'unknown'
+            results.append((intent, float(confidence)) if with_confidence else intent)
+        return results
+
+    def classify(self, text):
+        """Classify user intent from text; returns intent string or 'unknown'"""
+        return self.classify_many([text])[0]
+
+    def classify_with_confidence(self, text):
+        """Returns (intent or 'unknown', probability of the predicted intent)"""
+        return self.classify_many([text], with_confidence=True)[0]
+
+    def get_confidence(self, text, intent):
+        """Calibrated probability of `intent` for the text"""
+        if intent not in self.model.labels:
+            return 0.0
+        text = text.lower if isinstance(text, Utterance) else text
+        return float(self.model.predict_proba([text])[0, self.model.labels.index(intent)])
+
+
+def _softmax(logits):
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exponentials = np.exp(shifted)
+    return exponentials / exponentials.sum(axis=1, keepdims=True)
+
+
+def _log_loss(probabilities, targets):
+    return float(-np.mean(np.log(probabilities[np.arange(len(targets)), targets] + 1e-12)))
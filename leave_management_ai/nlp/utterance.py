@@ -0,0 +1,74 @@
+"""
+One user message, normalized once and shared by every NLP stage
+"""
+import re
+
+
+_TOKEN = re.compile(r'\w+')
+_UNSEEN = object()
+
+
+class Utterance:
+    """
+    A message with its lowercase form, tokens and regex matches, built once
+    per message: intent classification, entity extraction and date parsing
+    all read from it instead of lowercasing and re-scanning the raw text.
+
+    Every stage also accepts a plain string and wraps it with Utterance.of().
+    """
+
+    __slots__ = ('text', 'lower', '_stripped', '_tokens', '_matches', '_all_matches')
+
+    def __init__(self, text):
+        self.text = text
+        self.lower = text.lower()
+        self._stripped = None
+        self._tokens = None
+        self._matches = None
+        self._all_matches = None
+
+    @classmethod
+    def of(cls, text):
+        """The Utterance itself, or a new one wrapping a string"""
+        return text if isinstance(text, cls) else cls(text)
+
+    @property
+    def stripped(self):
+        """Lowercase text without surrounding whitespace"""
+        if self._stripped is None:
+            self._stripped = self.lower.strip()
+        return self._stripped
+
+    @property
+    def tokens(self):
+        """(word, start, end) for every \\w+ run of the lowercase text"""
+        if self._tokens is None:
+            self._tokens = [(match.group(), match.start(), match.end()) for match in _TOKEN.finditer(self.lower)]
+        return self._tokens
+
+    def search(self, pattern):
+        """
+        pattern.search() over the lowercase text, remembered per compiled
+        pattern so a later stage asking the same question gets the same match
+        """
+        if self._matches is None:
+            self._matches = {}
+        match = self._matches.get(pattern, _UNSEEN)
+        if match is _UNSEEN:
+            match = self._matches[pattern] = pattern.search(self.lower)
+        return match
+
+    def finditer(self, pattern):
+        """Every pattern.finditer() match over the lowercase text, as a list remembered per pattern"""
+        if self._all_matches is None:
+            self._all_matches = {}
+        matches = self._all_matches.get(pattern)
+        if matches is None:
+            matches = self._all_matches[pattern] = list(pattern.finditer(self.lower))
+        return matches
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"Utterance({self.text!r})"
@@ -0,0 +1,303 @@
+"""
+Per-stage latency tracing for chat turns
+
+A turn (one LeaveManagementAI.process_query call) is split into spans
+(classify, extract, date_parsing, service, database, render). Spans are
+buffered on the turn and recorded into fixed-bucket histograms labelled
+with stage and intent once the turn ends, so stages that run before the
+intent is known are still tagged with it. Histograms are rendered in
+Prometheus text format and can be served over HTTP or dumped to a file.
+
+With tracing disabled, span() returns a shared no-op object and traced
+functions call straight through.
+"""
+import functools
+import threading
+import time
+import types
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from leave_management_ai.config.settings import TRACING_CONFIG
+
+
+# Intent label for spans recorded outside a turn, or before the intent is known
+NO_INTENT = 'none'
+
+_current_turn = ContextVar('leave_trace_turn', default=None)
+_current_stage = ContextVar('leave_trace_stage', default=None)
+
+# inspect.CO_GENERATOR; inspect itself is slow to import
+_CO_GENERATOR = 0x20
+
+
+def _is_generator_function(function):
+    return bool(function.__code__.co_flags & _CO_GENERATOR)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (seconds); not locked, see Tracer"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)    # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, fraction):
+        """Estimate a quantile by linear interpolation inside its bucket"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class _NoopSpan:
+    """Returned by Tracer.span() while tracing is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def tag(self, intent):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """Times one stage; recorded into its turn, or directly outside a turn"""
+
+    __slots__ = ('tracer', 'stage', 'started', 'stage_token')
+
+    def __init__(self, tracer, stage):
+        self.tracer = tracer
+        self.stage = stage
+
+    def __enter__(self):
+        self.stage_token = _current_stage.set(self.stage)
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = (time.perf_counter_ns() - self.started) / 1e9
+        _current_stage.reset(self.stage_token)
+        self.tracer.observe(self.stage, elapsed)
+        return False
+
+    def tag(self, intent):
+        """Set the intent of the enclosing turn"""
+        turn = _current_turn.get()
+        if turn is not None:
+            turn.intent = intent
+
+
+class TurnSpan:
+    """
+    The 'total' span of one chat turn
+    Spans finished inside it are buffered and recorded with its intent.
+    """
+
+    __slots__ = ('tracer', 'intent', 'spans', 'started', 'turn_token')
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+        self.intent = NO_INTENT
+        self.spans = []
+
+    def __enter__(self):
+        self.turn_token = _current_turn.set(self)
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = (time.perf_counter_ns() - self.started) / 1e9
+        _current_turn.reset(self.turn_token)
+        self.spans.append(('total', elapsed))
+        self.tracer.record(self.intent, self.spans)
+        return False
+
+    def tag(self, intent):
+        """Set the intent every span of this turn is labelled with"""
+        self.intent = intent
+
+
+class Tracer:
+    """Process-wide span recorder and histogram store"""
+
+    def __init__(self, enabled=None, buckets=None):
+        self.enabled = TRACING_CONFIG['enabled'] if enabled is None else enabled
+        self.buckets = tuple(sorted(buckets or TRACING_CONFIG['buckets']))
+        self._histograms = {}    # (stage, intent) -> Histogram
+        self._lock = threading.Lock()
+        self._server = None
+
+    def turn(self):
+        """Context manager timing one chat turn; tag() it with the intent once known"""
+        if not self.enabled:
+            return NOOP_SPAN
+        return TurnSpan(self)
+
+    def span(self, stage):
+        """Context manager timing one stage"""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, stage)
+
+    def observe(self, stage, seconds):
+        """Record a duration measured elsewhere (e.g. database time of the turn)"""
+        if not self.enabled:
+            return
+        turn = _current_turn.get()
+        if turn is not None:
+            turn.spans.append((stage, seconds))
+        else:
+            self.record(NO_INTENT, [(stage, seconds)])
+
+    def record(self, intent, spans):
+        """Add (stage, seconds) pairs to the histograms of `intent`"""
+        with self._lock:
+            for stage, seconds in spans:
+                histogram = self._histograms.get((stage, intent))
+                if histogram is None:
+                    histogram = self._histograms[(stage, intent)] = Histogram(self.buckets)
+                histogram.observe(seconds)
+
+    def reset(self):
+        """Drop every histogram"""
+        with self._lock:
+            self._histograms = {}
+
+    def stats(self):
+        """
+        Get count, mean and estimated p50/p90/p99 (seconds) per stage and intent
+        Returns list of dicts, slowest p99 first
+        """
+        with self._lock:
+            rows = [
+                {'stage': stage, 'intent': intent, 'count': histogram.count,
+                 'mean': histogram.sum / histogram.count,
+                 'p50': histogram.quantile(0.50), 'p90': histogram.quantile(0.90),
+                 'p99': histogram.quantile(0.99)}
+                for (stage, intent), histogram in self._histograms.items() if histogram.count
+            ]
+        rows.sort(key=lambda row: row['p99'], reverse=True)
+        return rows
+
+    def metrics(self, prefix='leave_ai'):
+        """Get the stage histograms in Prometheus text exposition format"""
+        name = f"{prefix}_stage_seconds"
+        lines = [f"# TYPE {name} histogram"]
+        with self._lock:
+            for (stage, intent), histogram in sorted(self._histograms.items()):
+                labels = f'stage="{stage}",intent="{intent}"'
+                cumulative = 0
+                for bound, count in zip(self.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path, extra=()):
+        """Write metrics() (followed by each extra() text) to `path`"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.metrics())
+            for render in extra:
+                f.write(render())
+
+    def serve(self, port, host='127.0.0.1', extra=()):
+        """
+        Serve metrics() plus each extra() text on http://host:port/metrics
+        from a daemon thread; returns the server
+        Only one exporter runs per tracer: later calls return the running one
+        """
+        if self._server is not None:
+            return self._server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        tracer = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = (tracer.metrics() + ''.join(render() for render in extra)).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, name='metrics-exporter', daemon=True).start()
+        return self._server
+
+    def stop(self):
+        """Stop the metrics exporter, if running"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def traced(stage):
+    """
+    Decorator timing every call of a function as `stage`
+    Calls made while already inside `stage` (e.g. one service method
+    calling another) are not timed again.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled or _current_stage.get() == stage:
+                return function(*args, **kwargs)
+            with Span(tracer, stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def traced_methods(stage):
+    """
+    Class decorator applying traced(stage) to every public method
+    Generator methods are left alone: calling one does no work yet.
+    """
+    def decorator(cls):
+        for name, attribute in list(vars(cls).items()):
+            if name.startswith('_'):
+                continue
+            if isinstance(attribute, staticmethod):
+                if not _is_generator_function(attribute.__func__):
+                    setattr(cls, name, staticmethod(traced(stage)(attribute.__func__)))
+            elif isinstance(attribute, types.FunctionType) and not _is_generator_function(attribute):
+                setattr(cls, name, traced(stage)(attribute))
+        return cls
+    return decorator
+
+
+tracer = Tracer()
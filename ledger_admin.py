@@ -0,0 +1,86 @@
+"""
+Leave transactions ledger maintenance
+Run from cron (e.g. daily) to keep monthly partitions ahead of time and
+archive old ones
+
+    python ledger_admin.py list
+    python ledger_admin.py ensure [--months-ahead 3]
+    python ledger_admin.py archive [--before 2024-01] [--output-dir archive] [--keep-table]
+"""
+import argparse
+from datetime import date
+
+from leave_management_ai.config.settings import LEDGER_CONFIG
+from leave_management_ai.database.connection import DatabaseConnection
+from leave_management_ai.database.partitions import LedgerPartitionManager, add_months
+
+
+def list_partitions(manager):
+    """Print every ledger partition and its bounds"""
+    if not manager.is_partitioned():
+        print("leave_transactions is not partitioned yet; run: python setup_db.py migrate")
+        return
+    for name, lower, upper in manager.partitions():
+        print(f"{name:<40} {lower or 'MINVALUE'} → {upper or 'MAXVALUE'}")
+
+
+def ensure_partitions(manager, months_ahead):
+    """Create upcoming monthly partitions"""
+    created = manager.ensure(months_ahead)
+    if created:
+        for name in created:
+            print(f"✓ Created {name}")
+    else:
+        print("✓ Partitions already exist")
+
+
+def archive_partitions(manager, before, output_dir, keep_table):
+    """Detach, export and drop partitions that end on or before `before`"""
+    archived = manager.archive(before, output_dir, keep_table)
+    if not archived:
+        print(f"✓ No partitions end on or before {before}")
+    for name, path, rows in archived:
+        print(f"✓ Archived {name}: {rows} row(s) → {path}")
+
+
+def parse_month(value):
+    """Parse YYYY-MM into the first day of that month"""
+    year, month = value.split('-')
+    return date(int(year), int(month), 1)
+
+
+def main():
+    """Parse the command line and run the requested command"""
+    parser = argparse.ArgumentParser(description="Leave transactions ledger maintenance")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    subcommands.add_parser('list', help='list partitions')
+
+    ensure_parser = subcommands.add_parser('ensure', help='create upcoming monthly partitions')
+    ensure_parser.add_argument('--months-ahead', type=int, default=LEDGER_CONFIG['partition_months_ahead'])
+
+    archive_parser = subcommands.add_parser('archive', help='export and drop old partitions')
+    archive_parser.add_argument('--before', type=parse_month,
+                                help='archive partitions ending on or before this month (YYYY-MM); '
+                                     'defaults to retention_months ago')
+    archive_parser.add_argument('--output-dir', default=LEDGER_CONFIG['archive_directory'])
+    archive_parser.add_argument('--keep-table', action='store_true',
+                                help='keep the detached table instead of dropping it')
+
+    args = parser.parse_args()
+    manager = LedgerPartitionManager()
+
+    try:
+        if args.command == 'list':
+            list_partitions(manager)
+        elif args.command == 'ensure':
+            ensure_partitions(manager, args.months_ahead)
+        elif args.command == 'archive':
+            before = args.before or add_months(date.today(), -LEDGER_CONFIG['retention_months'])
+            archive_partitions(manager, before, args.output_dir, args.keep_table)
+    finally:
+        DatabaseConnection().close_all_connections()
+
+
+if __name__ == "__main__":
+    main()
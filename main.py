@@ -1,9 +1,18 @@
 """
 Main application - Leave Management AI
 """
-from leave_management_ai.config.settings import LEAVE_TYPES
+import threading
+
+from leave_management_ai.config.settings import (
+    LEAVE_TYPES, CACHE_CONFIG, INSTRUMENTATION_CONFIG, STARTUP_CONFIG, TRACING_CONFIG
+)
+from leave_management_ai.database.connection import DatabaseConnection
+from leave_management_ai.database.instrumentation import query_stats
+from leave_management_ai.database.partitions import partition_guard
 from leave_management_ai.nlp.entity_character import EntityExtractor
-from leave_management_ai.nlp.intent_classifier import IntentClassifier
+from leave_management_ai.nlp.intent_classifier import create_intent_classifier
+from leave_management_ai.nlp.utterance import Utterance
+from leave_management_ai.tracing import tracer
 from services.leave_service import LeaveService
 from utils.response_generator import ResponseGenerator
 
@@ -12,14 +21,56 @@ class LeaveManagementAI:
     """Main AI assistant for leave management"""
     
     def __init__(self):
+        # Cheap by design: the pool, the employee directory and the spaCy
+        # model are loaded on first use, or ahead of it by warm_up()
         print("🚀 Initializing Leave Management AI...")
-        self.intent_classifier = IntentClassifier()
+        self.intent_classifier = create_intent_classifier()
         self.entity_extractor = EntityExtractor()
         self.leave_service = LeaveService()
         self.response_generator = ResponseGenerator()
         self.current_employee_id = None
         print("✓ System ready!\n")
     
+    def warm_up(self, load_spacy_model=None):
+        """
+        Open the database pool, preload the employee directory, create
+        upcoming ledger partitions and optionally load the spaCy model, so
+        the first message doesn't pay for them. Safe to run in a thread.
+        """
+        if load_spacy_model is None:
+            load_spacy_model = STARTUP_CONFIG['load_spacy_model']
+        try:
+            DatabaseConnection()
+            if CACHE_CONFIG['preload_employees']:
+                self.leave_service.employee_directory.preload()
+            partition_guard.check()
+        except Exception as e:
+            print(f"⚠ Warm-up could not reach the database: {e}")
+        if load_spacy_model:
+            try:
+                self.entity_extractor.warm_up()
+            except (ImportError, OSError) as e:
+                print(f"⚠ Could not load the spaCy model: {e}")
+    
+    def start_warm_up(self, mode=None):
+        """
+        Run warm_up() as configured by STARTUP_CONFIG['warm_up']
+        Returns the warm-up thread in 'background' mode, else None
+        """
+        mode = STARTUP_CONFIG['warm_up'] if mode is None else mode
+        if mode == 'blocking':
+            self.warm_up()
+        elif mode == 'background':
+            thread = threading.Thread(target=self.warm_up, name='warm-up', daemon=True)
+            thread.start()
+            return thread
+        return None
+    
+    @staticmethod
+    def metric_sources():
+        """Metric texts exported next to the stage histograms"""
+        return (query_stats.metrics, lambda: DatabaseConnection().get_pool_metrics())
+    
     def set_employee_id(self, employee_id):
         """Set the current logged-in employee"""
         # Validate employee exists
@@ -41,17 +92,34 @@ class LeaveManagementAI:
         Returns:
             Response string
         """
-        # Step 1: Classify intent
-        intent = self.intent_classifier.classify(user_input)
-        
-        # Step 2: Extract entities
-        entities = self.entity_extractor.extract_all_entities(user_input)
-        
-        # Use current session employee ID if not found in text
-        if not entities['employee_id'] and self.current_employee_id:
-            entities['employee_id'] = self.current_employee_id
-        
-        # Step 3: Route to appropriate handler
+        with tracer.turn() as turn:
+            # Normalized once; every stage reads the same lowercase text, tokens and matches
+            utterance = Utterance(user_input)
+            
+            # Step 1: Classify intent
+            with tracer.span('classify'):
+                intent = self.intent_classifier.classify(utterance)
+            turn.tag(intent)
+            
+            # Step 2: Extract entities
+            with tracer.span('extract'):
+                entities = self.entity_extractor.extract_all_entities(utterance)
+            
+            # Use current session employee ID if not found in text
+            if not entities['employee_id'] and self.current_employee_id:
+                entities['employee_id'] = self.current_employee_id
+            
+            # Step 3: Route to appropriate handler; database work is counted per intent
+            with query_stats.turn(intent) as db_turn:
+                try:
+                    return self._route(intent, entities)
+                finally:
+                    # db_seconds is only measured while query stats are enabled
+                    if query_stats.enabled:
+                        tracer.observe('database', db_turn.db_seconds)
+    
+    def _route(self, intent, entities):
+        """Dispatch a classified message to its handler"""
         try:
             if intent == 'apply_leave':
                 return self._handle_leave_application(entities)
@@ -96,13 +164,14 @@ class LeaveManagementAI:
                 "Examples: 'leave from tomorrow to Friday' or 'leave on 20th Jan'"
             )
         
-        # Create leave request (this now checks for overlaps)
+        # Create leave request (this now checks for overlaps); days are recounted
+        # because public holidays can depend on the employee's department
         request_data = self.leave_service.create_leave_request(
             employee_id,
             entities['leave_type'],
             entities['start_date'],
             entities['end_date'],
-            entities['days_count']
+            self.leave_service.count_leave_days(employee_id, entities['start_date'], entities['end_date'])
         )
         
         # Check if there's an overlap
@@ -208,6 +277,8 @@ class LeaveManagementAI:
             return self.response_generator.generate_eligibility_yes_response(reason_data)
         elif reason_data['type'] == 'weekend':
             return self.response_generator.generate_eligibility_no_weekend_response(reason_data)
+        elif reason_data['type'] == 'holiday':
+            return self.response_generator.generate_eligibility_no_holiday_response(reason_data)
         else:  # no_balance
             return self.response_generator.generate_eligibility_no_balance_response(reason_data)
     
@@ -265,17 +336,11 @@ class LeaveManagementAI:
                 return self.response_generator.generate_error_response(result_data.get('message', 'Failed to cancel leave'))
 
 
-def main():
-    """Main function to run the AI assistant"""
-    print("=" * 70)
-    print("              LEAVE MANAGEMENT AI ASSISTANT")
-    print("=" * 70)
-    print()
-    
-    # Initialize AI
-    ai = LeaveManagementAI()
-    
-    # Employee login
+def login(ai):
+    """
+    Prompt for an employee ID until one is valid
+    Returns False if the user quits instead
+    """
     print("Please enter your Employee ID to continue")
     print("Available IDs: EMP123, EMP124, EMP125, E001, E002")
     print("-" * 70)
@@ -289,7 +354,7 @@ def main():
             
             if employee_id in ['QUIT', 'EXIT']:
                 print("\nGoodbye! 👋")
-                return
+                return False
             
             success, message = ai.set_employee_id(employee_id)
             
@@ -304,16 +369,21 @@ def main():
                 print("  • Show my leave history")
                 print("  • Type 'logout' to switch employee or 'quit' to exit")
                 print("=" * 70)
-                break
+                return True
             else:
                 print(f"\n✗ {message}")
                 print("Please try again or type 'quit' to exit.")
         
         except KeyboardInterrupt:
             print("\n\nGoodbye! 👋")
-            return
-    
-    # Main interaction loop
+            return False
+
+
+def converse(ai):
+    """
+    Answer the logged-in employee's messages
+    Returns True on logout, False when the user quits
+    """
     print()
     while True:
         try:
@@ -327,13 +397,16 @@ def main():
                 print(f"\n{'=' * 70}")
                 print("Logging out...")
                 ai.current_employee_id = None
-                main()  # Restart login
-                return
+                return True
             
             # Handle quit
             if user_input.lower() in ['quit', 'exit', 'bye']:
                 print("\nThank you for using Leave Management AI. Goodbye! 👋")
-                break
+                if INSTRUMENTATION_CONFIG['stats_dump_path']:
+                    query_stats.dump(INSTRUMENTATION_CONFIG['stats_dump_path'])
+                if TRACING_CONFIG['dump_path']:
+                    tracer.dump(TRACING_CONFIG['dump_path'], extra=ai.metric_sources())
+                return False
             
             # Process query
             response = ai.process_query(user_input)
@@ -342,10 +415,29 @@ def main():
         
         except KeyboardInterrupt:
             print("\n\nLogging out... Goodbye! 👋")
-            break
+            return False
         except Exception as e:
             print(f"\n✗ Error: {e}\n")
 
 
+def main():
+    """Main function to run the AI assistant"""
+    print("=" * 70)
+    print("              LEAVE MANAGEMENT AI ASSISTANT")
+    print("=" * 70)
+    print()
+    
+    # Initialize AI and, once per process, the metrics exporter
+    ai = LeaveManagementAI()
+    ai.start_warm_up()
+    if TRACING_CONFIG['exporter_port']:
+        tracer.serve(TRACING_CONFIG['exporter_port'], extra=ai.metric_sources())
+        print(f"✓ Metrics served on http://127.0.0.1:{TRACING_CONFIG['exporter_port']}/metrics\n")
+    
+    # Logout returns to the login prompt with the same assistant
+    while login(ai) and converse(ai):
+        pass
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,220 @@
+"""
+Asyncio leave management business logic
+
+Same business rules as services/leave_service.py, running on the async
+database layer so one event loop can serve many conversations at once.
+"""
+from datetime import datetime
+from leave_management_ai.business_calendar import get_calendar
+from leave_management_ai.config.settings import BUSINESS_RULES, HOLIDAY_CONFIG, QUERY_CONFIG
+from leave_management_ai.database.async_operations import (
+    AsyncEmployeeOperations,
+    AsyncLeaveBalanceOperations,
+    AsyncLeaveRequestOperations,
+    AsyncLeaveTransactionOperations,
+    AsyncPendingConfirmationOperations
+)
+from services.leave_service import (
+    evaluate_eligibility,
+    build_overlap_result,
+    build_request_summary,
+    build_insufficient_balance_result,
+    build_confirmation_result,
+    build_balance_summary,
+    build_history_entry,
+    build_history_page,
+    decode_history_cursor,
+    check_cancellable,
+    build_no_leaves_result,
+    build_cancelled_entry,
+    employee_calendar,
+    evaluate_date_eligibility
+)
+
+
+class AsyncLeaveService:
+    """Business logic for leave management (asyncio)"""
+    
+    def __init__(self):
+        self.employee_ops = AsyncEmployeeOperations()
+        self.balance_ops = AsyncLeaveBalanceOperations()
+        self.request_ops = AsyncLeaveRequestOperations()
+        self.transaction_ops = AsyncLeaveTransactionOperations()
+        self.pending_ops = AsyncPendingConfirmationOperations()
+    
+    async def validate_employee(self, employee_id):
+        """
+        Validate if employee exists
+        Returns (is_valid, employee_data/error_message)
+        """
+        if not employee_id:
+            return False, "Employee ID is required"
+        
+        employee = await self.employee_ops.get_employee(employee_id)
+        if employee is None:
+            return False, f"Employee {employee_id} not found in the system"
+        
+        return True, employee
+    
+    async def check_leave_eligibility(self, employee_id, leave_type, days_requested):
+        """
+        Check if employee has enough leave balance
+        Returns (is_eligible, current_balance, remaining_balance/shortage)
+        """
+        current_balance = await self.balance_ops.get_balance(employee_id, leave_type)
+        return evaluate_eligibility(current_balance, days_requested)
+    
+    async def create_leave_request(self, employee_id, leave_type, start_date, end_date, days_count):
+        """
+        Create a pending leave request
+        Returns dict with request details
+        """
+        overlapping = await self.request_ops.check_overlapping_leaves(employee_id, start_date, end_date)
+        
+        if overlapping:
+            return build_overlap_result(employee_id, overlapping)
+        
+        is_eligible, current_balance, remaining_balance = await self.check_leave_eligibility(
+            employee_id, leave_type, days_count
+        )
+        
+        await self.pending_ops.create_pending(
+            employee_id, leave_type, start_date, end_date, days_count
+        )
+        
+        return build_request_summary(
+            employee_id, leave_type, start_date, end_date, days_count,
+            is_eligible, current_balance, remaining_balance
+        )
+    
+    async def confirm_leave_request(self, employee_id):
+        """
+        Confirm and apply pending leave request
+        Returns (success, result_dict)
+        """
+        min_balance = BUSINESS_RULES['min_leave_balance']
+        
+        # Re-check the balance, record the request, deduct and log in a single
+        # transaction on the server
+        if self.pending_ops.in_database():
+            outcome, request_id, leave_type, start_date, end_date, days_count, balance_before, new_balance = (
+                await self.request_ops.confirm_pending_request(employee_id, min_balance)
+            )
+        else:
+            pending = await self.pending_ops.get_pending(employee_id)
+            if not pending:
+                return False, {
+                    'error': 'No pending leave request found. Please create a new leave request first.'
+                }
+            outcome, request_id, leave_type, start_date, end_date, days_count, balance_before, new_balance = (
+                await self.request_ops.apply_leave_request(employee_id, *pending, min_balance)
+            )
+            await self.pending_ops.clear_pending(employee_id)
+        
+        if outcome == 'no_pending':
+            return False, {
+                'error': 'No pending leave request found. Please create a new leave request first.'
+            }
+        
+        if outcome == 'overlap':
+            # A concurrent confirm approved a leave for these dates first
+            overlapping = await self.request_ops.check_overlapping_leaves(employee_id, start_date, end_date)
+            return False, build_overlap_result(employee_id, overlapping)
+        
+        if outcome == 'insufficient_balance':
+            return False, build_insufficient_balance_result(float(balance_before), days_count)
+        
+        return True, build_confirmation_result(
+            request_id, employee_id, leave_type, start_date, end_date,
+            float(days_count), float(new_balance)
+        )
+    
+    async def get_leave_balance(self, employee_id):
+        """
+        Get all leave balances for employee
+        Returns dict with balance details
+        """
+        balances = await self.balance_ops.get_all_balances(employee_id)
+        return build_balance_summary(employee_id, balances)
+    
+    async def get_leave_history(self, employee_id, limit=None, cursor=None, status=None,
+                                leave_type=None, from_date=None, to_date=None):
+        """
+        Get one page of leave history for employee, newest first
+        Pass the returned next_cursor back as `cursor` to get the next page
+        Returns dict with the page of leave requests
+        """
+        limit = limit or QUERY_CONFIG['history_page_size']
+        requests = await self.request_ops.get_employee_requests_page(
+            employee_id, limit + 1, decode_history_cursor(cursor),
+            status, leave_type, from_date, to_date
+        )
+        return build_history_page(employee_id, requests, limit)
+    
+    async def stream_leave_history(self, employee_id, status=None, leave_type=None,
+                                   from_date=None, to_date=None):
+        """Yield every history entry for employee, newest first"""
+        async for req in self.request_ops.iter_employee_requests(
+            employee_id, status=status, leave_type=leave_type, from_date=from_date, to_date=to_date
+        ):
+            yield build_history_entry(req)
+    
+    async def cancel_pending_request(self, employee_id):
+        """Cancel any pending leave request"""
+        await self.pending_ops.clear_pending(employee_id)
+        return {
+            'employee_id': employee_id,
+            'message': 'Pending leave request cancelled'
+        }
+    
+    async def cancel_approved_leaves(self, employee_id, start_date, end_date):
+        """
+        Cancel approved leaves in a date range
+        Returns (success, result_dict)
+        """
+        error = check_cancellable(start_date, datetime.now().date())
+        if error:
+            return error
+        
+        # Cancel every matching leave, credit balances and log the ledger in one statement
+        cancelled = await self.request_ops.cancel_leaves_in_range(employee_id, start_date, end_date)
+        
+        if not cancelled:
+            return build_no_leaves_result(start_date, end_date)
+        
+        cancelled_leaves = [
+            build_cancelled_entry(leave_id, leave_type, lstart, lend, days, float(balance_after))
+            for leave_id, leave_type, lstart, lend, days, balance_after in cancelled
+        ]
+        total_restored = sum(float(row[4]) for row in cancelled)
+        
+        return True, {
+            'employee_id': employee_id,
+            'cancelled_leaves': cancelled_leaves,
+            'total_restored': total_restored
+        }
+    
+    async def check_leave_eligibility_for_date(self, employee_id, leave_type, target_date, days_requested=1):
+        """
+        Check if employee is eligible for leave on a specific date
+        Returns (eligible, reason_data)
+        """
+        current_balance = await self.balance_ops.get_balance(employee_id, leave_type)
+        return evaluate_date_eligibility(
+            target_date, current_balance, days_requested, datetime.now().date(),
+            await self.business_calendar(employee_id)
+        )
+    
+    async def business_calendar(self, employee_id):
+        """
+        Business calendar that applies to an employee
+        The department is only looked up when HOLIDAY_CONFIG maps departments
+        """
+        if not HOLIDAY_CONFIG['departments']:
+            return get_calendar()
+        return employee_calendar(await self.employee_ops.get_employee(employee_id))
+    
+    async def count_leave_days(self, employee_id, start_date, end_date):
+        """Leave days charged to an employee for a date range (weekends and holidays excluded)"""
+        calendar = await self.business_calendar(employee_id)
+        return calendar.business_days(start_date, end_date, include_weekends=BUSINESS_RULES['weekend_counts'])
@@ -1,6 +1,7 @@
 """
 Leave management business logic
 """
+import base64
 from datetime import datetime, timedelta
 from leave_management_ai.database.operations import (
     EmployeeOperations,
@@ -9,9 +10,265 @@ from leave_management_ai.database.operations import (
     LeaveTransactionOperations,
     PendingConfirmationOperations
 )
-from leave_management_ai.config.settings import LEAVE_TYPES, BUSINESS_RULES
+from leave_management_ai.database.connection import query_cache
+from leave_management_ai.database.employee_directory import EmployeeDirectory
+from leave_management_ai.business_calendar import calendar_for_department, get_calendar
+from leave_management_ai.config.settings import LEAVE_TYPES, BUSINESS_RULES, HOLIDAY_CONFIG, QUERY_CONFIG
+from leave_management_ai.tracing import traced_methods
 
 
+# Pure business rules shared by LeaveService and AsyncLeaveService.
+# They take rows/values already fetched from the database and never do I/O.
+
+def evaluate_eligibility(current_balance, days_requested):
+    """
+    Apply the minimum balance rule
+    Returns (is_eligible, current_balance, remaining_balance)
+    """
+    remaining_balance = current_balance - days_requested
+    
+    # Check minimum balance rule
+    min_balance = BUSINESS_RULES['min_leave_balance']
+    is_eligible = remaining_balance >= min_balance
+    
+    return is_eligible, current_balance, remaining_balance
+
+
+def build_overlap_result(employee_id, overlapping):
+    """Build the create_leave_request result for overlapping leave rows"""
+    overlap_details = []
+    for leave in overlapping:
+        leave_id, ltype, lstart, lend, ldays = leave
+        overlap_details.append({
+            'id': leave_id,
+            'leave_type': LEAVE_TYPES.get(ltype, ltype),
+            'start_date': lstart.strftime('%Y-%m-%d'),
+            'end_date': lend.strftime('%Y-%m-%d'),
+            'days': float(ldays)
+        })
+    
+    return {
+        'employee_id': employee_id,
+        'has_overlap': True,
+        'overlapping_leaves': overlap_details,
+        'error': 'You already have approved leave(s) for these dates'
+    }
+
+
+def build_request_summary(employee_id, leave_type, start_date, end_date, days_count,
+                          is_eligible, current_balance, remaining_balance):
+    """Build the create_leave_request result for a new pending request"""
+    return {
+        'employee_id': employee_id,
+        'leave_type': LEAVE_TYPES.get(leave_type, leave_type),
+        'start_date': start_date.strftime('%Y-%m-%d'),
+        'end_date': end_date.strftime('%Y-%m-%d'),
+        'days': days_count,
+        'current_balance': current_balance,
+        'remaining_balance': remaining_balance,
+        'is_eligible': is_eligible,
+        'has_overlap': False,
+        'shortage': days_count - current_balance if not is_eligible else 0
+    }
+
+
+def build_insufficient_balance_result(current_balance, days_count):
+    """Build the confirm_leave_request error for an insufficient balance"""
+    return {
+        'error': 'Insufficient leave balance',
+        'current_balance': current_balance,
+        'requested': days_count,
+        # days_count may be the database Decimal; the balance is a float
+        'shortage': float(days_count) - current_balance
+    }
+
+
+def build_confirmation_result(request_id, employee_id, leave_type, start_date, end_date,
+                              days_count, new_balance):
+    """Build the confirm_leave_request result for an applied leave"""
+    return {
+        'request_id': request_id,
+        'employee_id': employee_id,
+        'leave_type': LEAVE_TYPES.get(leave_type, leave_type),
+        'start_date': start_date.strftime('%Y-%m-%d'),
+        'end_date': end_date.strftime('%Y-%m-%d'),
+        'days': days_count,
+        'remaining_balance': new_balance
+    }
+
+
+def build_balance_summary(employee_id, balances):
+    """Build the get_leave_balance result from a {leave_type: balance} dict"""
+    balance_details = []
+    for leave_type, balance in balances.items():
+        # Add visual indicator for balance level
+        if balance >= 10:
+            indicator = "🟢"
+        elif balance >= 5:
+            indicator = "🟡"
+        else:
+            indicator = "🔴"
+        
+        balance_details.append(
+            f"{indicator} {LEAVE_TYPES.get(leave_type, leave_type)}: {balance} days"
+        )
+    
+    return {
+        'employee_id': employee_id,
+        'balances': balances,
+        'balance_details': '\n'.join(balance_details) if balance_details else 'No leave balance found'
+    }
+
+
+def build_history_entry(req):
+    """Format one leave_requests history row"""
+    req_id, leave_type, start_date, end_date, days, status, requested_at = req
+    return {
+        'id': req_id,
+        'leave_type': LEAVE_TYPES.get(leave_type, leave_type),
+        'start_date': start_date.strftime('%Y-%m-%d'),
+        'end_date': end_date.strftime('%Y-%m-%d'),
+        'days': float(days),
+        'status': status,
+        'requested_at': requested_at.strftime('%Y-%m-%d %H:%M')
+    }
+
+
+def encode_history_cursor(req):
+    """Opaque page cursor pointing just after a leave_requests history row"""
+    raw = f"{req[6].isoformat()}|{req[0]}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_history_cursor(cursor):
+    """
+    Turn a page cursor back into the (requested_at, id) keyset position
+    Returns None for no cursor; raises ValueError for a malformed one
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        requested_at, request_id = raw.split('|')
+        return datetime.fromisoformat(requested_at), int(request_id)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid history cursor: {cursor}") from e
+
+
+def build_history_page(employee_id, requests, limit):
+    """
+    Build the get_leave_history result from up to limit + 1 rows; the extra
+    row only tells whether another page exists
+    """
+    page = requests[:limit]
+    return {
+        'employee_id': employee_id,
+        'history': [build_history_entry(req) for req in page],
+        'next_cursor': encode_history_cursor(page[-1]) if len(requests) > limit else None
+    }
+
+
+def check_cancellable(start_date, today):
+    """
+    Check that a cancellation range lies in the future
+    Returns None if it does, else the (False, result_dict) error
+    """
+    if start_date <= today:
+        return False, {
+            'error': 'past_leave',
+            'message': 'You can only cancel future leaves. Past or current leaves cannot be cancelled.'
+        }
+    return None
+
+
+def build_no_leaves_result(start_date, end_date):
+    """Build the cancel_approved_leaves error when nothing matches"""
+    return False, {
+        'error': 'no_leaves',
+        'message': f'No approved leaves found between {start_date.strftime("%Y-%m-%d")} and {end_date.strftime("%Y-%m-%d")}'
+    }
+
+
+def build_cancelled_entry(leave_id, leave_type, start_date, end_date, days, restored_balance):
+    """Format one cancelled leave for the cancel_approved_leaves result"""
+    return {
+        'id': leave_id,
+        'leave_type': LEAVE_TYPES.get(leave_type, leave_type),
+        'start_date': start_date.strftime('%Y-%m-%d'),
+        'end_date': end_date.strftime('%Y-%m-%d'),
+        'days': float(days),
+        'restored_balance': restored_balance
+    }
+
+
+def employee_calendar(employee):
+    """Business calendar for an employee row: holidays follow the department"""
+    return calendar_for_department(employee[3] if employee else None)
+
+
+def evaluate_date_eligibility(target_date, current_balance, days_requested, today, calendar=None):
+    """
+    Decide whether a single date can be taken as leave
+    `calendar` supplies public holidays (default: the default business calendar)
+    Returns (eligible, reason_data)
+    """
+    calendar = calendar or get_calendar()
+    
+    # Check if it's a weekend
+    is_weekend = target_date.weekday() >= 5  # Saturday=5, Sunday=6
+    holiday = calendar.holiday(target_date)
+    
+    # Prepare response data
+    date_str = target_date.strftime('%Y-%m-%d')
+    day_name = target_date.strftime('%A')
+    
+    # Determine date phrase for response
+    if target_date == today:
+        date_phrase = "today"
+    elif target_date == today + timedelta(days=1):
+        date_phrase = "tomorrow"
+    else:
+        date_phrase = f"on {target_date.strftime('%B %d')}"
+    
+    # Case 1: Weekend (not eligible)
+    if is_weekend and not BUSINESS_RULES['weekend_counts']:
+        return False, {
+            'type': 'weekend',
+            'date': date_str,
+            'day_name': day_name
+        }
+    
+    # Case 1b: Public holiday (not eligible, nothing to charge)
+    if holiday:
+        return False, {
+            'type': 'holiday',
+            'date': date_str,
+            'day_name': day_name,
+            'holiday': holiday
+        }
+    
+    # Case 2: Insufficient balance
+    if current_balance < days_requested:
+        return False, {
+            'type': 'no_balance',
+            'date': date_str,
+            'day_name': day_name,
+            'balance': current_balance,
+            'required': days_requested
+        }
+    
+    # Case 3: Eligible!
+    return True, {
+        'type': 'eligible',
+        'date': date_str,
+        'day_name': day_name,
+        'balance': current_balance,
+        'after_balance': current_balance - days_requested,
+        'date_phrase': date_phrase
+    }
+
+
+@traced_methods('service')
 class LeaveService:
     """Business logic for leave management"""
     
@@ -21,6 +278,7 @@ class LeaveService:
         self.request_ops = LeaveRequestOperations()
         self.transaction_ops = LeaveTransactionOperations()
         self.pending_ops = PendingConfirmationOperations()
+        self.employee_directory = EmployeeDirectory.instance()
     
     def validate_employee(self, employee_id):
         """
@@ -30,10 +288,11 @@ class LeaveService:
         if not employee_id:
             return False, "Employee ID is required"
         
-        if not self.employee_ops.employee_exists(employee_id):
+        # Cached lookup: at most one query, none for known or filtered-out IDs
+        employee = self.employee_directory.get(employee_id)
+        if employee is None:
             return False, f"Employee {employee_id} not found in the system"
         
-        employee = self.employee_ops.get_employee(employee_id)
         return True, employee
     
     def check_leave_eligibility(self, employee_id, leave_type, days_requested):
@@ -42,13 +301,7 @@ class LeaveService:
         Returns (is_eligible, current_balance, remaining_balance/shortage)
         """
         current_balance = self.balance_ops.get_balance(employee_id, leave_type)
-        remaining_balance = current_balance - days_requested
-        
-        # Check minimum balance rule
-        min_balance = BUSINESS_RULES['min_leave_balance']
-        is_eligible = remaining_balance >= min_balance
-        
-        return is_eligible, current_balance, remaining_balance
+        return evaluate_eligibility(current_balance, days_requested)
     
     def create_leave_request(self, employee_id, leave_type, start_date, end_date, days_count):
         """
@@ -59,24 +312,7 @@ class LeaveService:
         overlapping = self.request_ops.check_overlapping_leaves(employee_id, start_date, end_date)
         
         if overlapping:
-            # Format overlapping leave details
-            overlap_details = []
-            for leave in overlapping:
-                leave_id, ltype, lstart, lend, ldays = leave
-                overlap_details.append({
-                    'id': leave_id,
-                    'leave_type': LEAVE_TYPES.get(ltype, ltype),
-                    'start_date': lstart.strftime('%Y-%m-%d'),
-                    'end_date': lend.strftime('%Y-%m-%d'),
-                    'days': float(ldays)
-                })
-            
-            return {
-                'employee_id': employee_id,
-                'has_overlap': True,
-                'overlapping_leaves': overlap_details,
-                'error': 'You already have approved leave(s) for these dates'
-            }
+            return build_overlap_result(employee_id, overlapping)
         
         # Check eligibility
         is_eligible, current_balance, remaining_balance = self.check_leave_eligibility(
@@ -88,76 +324,55 @@ class LeaveService:
             employee_id, leave_type, start_date, end_date, days_count
         )
         
-        return {
-            'employee_id': employee_id,
-            'leave_type': LEAVE_TYPES.get(leave_type, leave_type),
-            'start_date': start_date.strftime('%Y-%m-%d'),
-            'end_date': end_date.strftime('%Y-%m-%d'),
-            'days': days_count,
-            'current_balance': current_balance,
-            'remaining_balance': remaining_balance,
-            'is_eligible': is_eligible,
-            'has_overlap': False,
-            'shortage': days_count - current_balance if not is_eligible else 0
-        }
+        return build_request_summary(
+            employee_id, leave_type, start_date, end_date, days_count,
+            is_eligible, current_balance, remaining_balance
+        )
     
     def confirm_leave_request(self, employee_id):
         """
         Confirm and apply pending leave request
         Returns (success, result_dict)
         """
-        # Get pending confirmation
-        pending = self.pending_ops.get_pending(employee_id)
-        
-        if not pending:
-            return False, {
-                'error': 'No pending leave request found. Please create a new leave request first.'
-            }
-        
-        leave_type, start_date, end_date, days_count = pending
+        min_balance = BUSINESS_RULES['min_leave_balance']
         
-        # Check eligibility again (balance might have changed)
-        is_eligible, current_balance, remaining_balance = self.check_leave_eligibility(
-            employee_id, leave_type, days_count
-        )
+        # Re-check the balance, record the request, deduct and log in a single
+        # transaction on the server
+        # Strongly consistent path: never serve cached reads here
+        with query_cache.bypass():
+            if self.pending_ops.in_database():
+                # The pending row is read and cleared inside the same transaction
+                outcome, request_id, leave_type, start_date, end_date, days_count, balance_before, new_balance = (
+                    self.request_ops.confirm_pending_request(employee_id, min_balance)
+                )
+            else:
+                pending = self.pending_ops.get_pending(employee_id)
+                if not pending:
+                    return False, {
+                        'error': 'No pending leave request found. Please create a new leave request first.'
+                    }
+                outcome, request_id, leave_type, start_date, end_date, days_count, balance_before, new_balance = (
+                    self.request_ops.apply_leave_request(employee_id, *pending, min_balance)
+                )
+                self.pending_ops.clear_pending(employee_id)
         
-        if not is_eligible:
-            self.pending_ops.clear_pending(employee_id)
+        if outcome == 'no_pending':
             return False, {
-                'error': 'Insufficient leave balance',
-                'current_balance': current_balance,
-                'requested': days_count,
-                'shortage': days_count - current_balance
+                'error': 'No pending leave request found. Please create a new leave request first.'
             }
         
-        # Apply leave
-        # 1. Create leave request record
-        request_id = self.request_ops.create_request(
-            employee_id, leave_type, start_date, end_date, days_count
-        )
+        if outcome == 'overlap':
+            # A concurrent confirm approved a leave for these dates first
+            overlapping = self.request_ops.check_overlapping_leaves(employee_id, start_date, end_date)
+            return False, build_overlap_result(employee_id, overlapping)
         
-        # 2. Deduct from balance
-        new_balance = self.balance_ops.deduct_balance(employee_id, leave_type, days_count)
+        if outcome == 'insufficient_balance':
+            return False, build_insufficient_balance_result(float(balance_before), days_count)
         
-        # 3. Log transaction
-        self.transaction_ops.log_transaction(
-            employee_id, leave_type, 'debit', days_count,
-            current_balance, new_balance,
-            f"Leave from {start_date} to {end_date}"
+        return True, build_confirmation_result(
+            request_id, employee_id, leave_type, start_date, end_date,
+            float(days_count), float(new_balance)
         )
-        
-        # 4. Clear pending confirmation
-        self.pending_ops.clear_pending(employee_id)
-        
-        return True, {
-            'request_id': request_id,
-            'employee_id': employee_id,
-            'leave_type': LEAVE_TYPES.get(leave_type, leave_type),
-            'start_date': start_date.strftime('%Y-%m-%d'),
-            'end_date': end_date.strftime('%Y-%m-%d'),
-            'days': days_count,
-            'remaining_balance': new_balance
-        }
     
     def get_leave_balance(self, employee_id):
         """
@@ -165,51 +380,34 @@ class LeaveService:
         Returns dict with balance details
         """
         balances = self.balance_ops.get_all_balances(employee_id)
-        
-        balance_details = []
-        for leave_type, balance in balances.items():
-            # Add visual indicator for balance level
-            if balance >= 10:
-                indicator = "🟢"
-            elif balance >= 5:
-                indicator = "🟡"
-            else:
-                indicator = "🔴"
-            
-            balance_details.append(
-                f"{indicator} {LEAVE_TYPES.get(leave_type, leave_type)}: {balance} days"
-            )
-        
-        return {
-            'employee_id': employee_id,
-            'balances': balances,
-            'balance_details': '\n'.join(balance_details) if balance_details else 'No leave balance found'
-        }
+        return build_balance_summary(employee_id, balances)
     
-    def get_leave_history(self, employee_id, limit=10):
+    def get_leave_history(self, employee_id, limit=None, cursor=None, status=None,
+                          leave_type=None, from_date=None, to_date=None):
         """
-        Get recent leave history for employee
-        Returns list of leave requests
+        Get one page of leave history for employee, newest first
+        Pass the returned next_cursor back as `cursor` to get the next page;
+        it is None on the last page. from_date/to_date keep leaves that
+        overlap that window.
+        Returns dict with the page of leave requests
         """
-        requests = self.request_ops.get_employee_requests(employee_id, limit)
-        
-        history = []
-        for req in requests:
-            req_id, leave_type, start_date, end_date, days, status, requested_at = req
-            history.append({
-                'id': req_id,
-                'leave_type': LEAVE_TYPES.get(leave_type, leave_type),
-                'start_date': start_date.strftime('%Y-%m-%d'),
-                'end_date': end_date.strftime('%Y-%m-%d'),
-                'days': float(days),
-                'status': status,
-                'requested_at': requested_at.strftime('%Y-%m-%d %H:%M')
-            })
-        
-        return {
-            'employee_id': employee_id,
-            'history': history
-        }
+        limit = limit or QUERY_CONFIG['history_page_size']
+        requests = self.request_ops.get_employee_requests_page(
+            employee_id, limit + 1, decode_history_cursor(cursor),
+            status, leave_type, from_date, to_date
+        )
+        return build_history_page(employee_id, requests, limit)
+    
+    def stream_leave_history(self, employee_id, status=None, leave_type=None,
+                             from_date=None, to_date=None):
+        """
+        Yield every history entry for employee, newest first, without
+        holding the whole history in memory
+        """
+        for req in self.request_ops.iter_employee_requests(
+            employee_id, status=status, leave_type=leave_type, from_date=from_date, to_date=to_date
+        ):
+            yield build_history_entry(req)
     
     def cancel_pending_request(self, employee_id):
         """Cancel any pending leave request"""
@@ -224,59 +422,22 @@ class LeaveService:
         Cancel approved leaves in a date range
         Returns (success, result_dict)
         """
-        from datetime import datetime
-        
-        today = datetime.now().date()
-        
         # Check if dates are in the future
-        if start_date <= today:
-            return False, {
-                'error': 'past_leave',
-                'message': 'You can only cancel future leaves. Past or current leaves cannot be cancelled.'
-            }
+        error = check_cancellable(start_date, datetime.now().date())
+        if error:
+            return error
         
-        # Get approved leaves in the range
-        leaves = self.request_ops.get_leaves_in_range(employee_id, start_date, end_date)
-        
-        if not leaves:
-            return False, {
-                'error': 'no_leaves',
-                'message': f'No approved leaves found between {start_date.strftime("%Y-%m-%d")} and {end_date.strftime("%Y-%m-%d")}'
-            }
+        # Cancel every matching leave, credit balances and log the ledger in one statement
+        cancelled = self.request_ops.cancel_leaves_in_range(employee_id, start_date, end_date)
         
-        # Cancel each leave and restore balance
-        cancelled_leaves = []
-        total_restored = 0
+        if not cancelled:
+            return build_no_leaves_result(start_date, end_date)
         
-        for leave in leaves:
-            leave_id, leave_type, lstart, lend, days = leave
-            
-            # Cancel the leave request
-            result = self.request_ops.cancel_leave_request(leave_id)
-            
-            if result:
-                # Restore balance
-                current_balance = self.balance_ops.get_balance(employee_id, leave_type)
-                new_balance = current_balance + float(days)
-                self.balance_ops.update_balance(employee_id, leave_type, new_balance)
-                
-                # Log transaction
-                self.transaction_ops.log_transaction(
-                    employee_id, leave_type, 'credit', float(days),
-                    current_balance, new_balance,
-                    f"Cancelled leave from {lstart} to {lend}"
-                )
-                
-                cancelled_leaves.append({
-                    'id': leave_id,
-                    'leave_type': LEAVE_TYPES.get(leave_type, leave_type),
-                    'start_date': lstart.strftime('%Y-%m-%d'),
-                    'end_date': lend.strftime('%Y-%m-%d'),
-                    'days': float(days),
-                    'restored_balance': new_balance
-                })
-                
-                total_restored += float(days)
+        cancelled_leaves = [
+            build_cancelled_entry(leave_id, leave_type, lstart, lend, days, float(balance_after))
+            for leave_id, leave_type, lstart, lend, days, balance_after in cancelled
+        ]
+        total_restored = sum(float(row[4]) for row in cancelled)
         
         return True, {
             'employee_id': employee_id,
@@ -289,51 +450,23 @@ class LeaveService:
         Check if employee is eligible for leave on a specific date
         Returns (eligible, reason_data)
         """
-        from datetime import datetime
-        
-        # Check if it's a weekend
-        is_weekend = target_date.weekday() >= 5  # Saturday=5, Sunday=6
-        
-        # Get current balance
         current_balance = self.balance_ops.get_balance(employee_id, leave_type)
-        
-        # Prepare response data
-        date_str = target_date.strftime('%Y-%m-%d')
-        day_name = target_date.strftime('%A')
-        
-        # Determine date phrase for response
-        today = datetime.now().date()
-        if target_date == today:
-            date_phrase = "today"
-        elif target_date == today + timedelta(days=1):
-            date_phrase = "tomorrow"
-        else:
-            date_phrase = f"on {target_date.strftime('%B %d')}"
-        
-        # Case 1: Weekend (not eligible)
-        if is_weekend and not BUSINESS_RULES['weekend_counts']:
-            return False, {
-                'type': 'weekend',
-                'date': date_str,
-                'day_name': day_name
-            }
-        
-        # Case 2: Insufficient balance
-        if current_balance < days_requested:
-            return False, {
-                'type': 'no_balance',
-                'date': date_str,
-                'day_name': day_name,
-                'balance': current_balance,
-                'required': days_requested
-            }
-        
-        # Case 3: Eligible!
-        return True, {
-            'type': 'eligible',
-            'date': date_str,
-            'day_name': day_name,
-            'balance': current_balance,
-            'after_balance': current_balance - days_requested,
-            'date_phrase': date_phrase
-        }
\ No newline at end of file
+        return evaluate_date_eligibility(
+            target_date, current_balance, days_requested, datetime.now().date(),
+            self.business_calendar(employee_id)
+        )
+    
+    def business_calendar(self, employee_id):
+        """
+        Business calendar that applies to an employee
+        The department is only looked up when HOLIDAY_CONFIG maps departments
+        """
+        if not HOLIDAY_CONFIG['departments']:
+            return get_calendar()
+        return employee_calendar(self.employee_directory.get(employee_id))
+    
+    def count_leave_days(self, employee_id, start_date, end_date):
+        """Leave days charged to an employee for a date range (weekends and holidays excluded)"""
+        return self.business_calendar(employee_id).business_days(
+            start_date, end_date, include_weekends=BUSINESS_RULES['weekend_counts']
+        )
@@ -1,11 +1,23 @@
 """
 Database setup and initialization script
 Run this script to create tables and populate sample data
+
+    python setup_db.py                    # full setup with sample data
+    python setup_db.py migrate            # apply pending schema migrations only
+    python setup_db.py migrate --dry-run  # show the steps migrate would run
+    python setup_db.py status             # list migrations and their state
+    python setup_db.py import --employees hr.csv --balances balances.jsonl [--rejects rejects.csv]
+    python setup_db.py generate --employees 100000 [--years 3] [--seed 42] [--output-dir data/]
 """
+import argparse
 from datetime import datetime, timedelta
 
+from leave_management_ai.database.bulk_import import BulkImporter
 from leave_management_ai.database.connection import DatabaseConnection, execute_query
-from leave_management_ai.database.models import ALL_TABLES, CREATE_INDEXES, INSERT_LEAVE_BALANCE, INSERT_SAMPLE_EMPLOYEE
+from leave_management_ai.database.migrations import MigrationRunner
+from leave_management_ai.database.partitions import LedgerPartitionManager
+from leave_management_ai.database.synthetic import SyntheticDataGenerator
+from leave_management_ai.database.models import ALL_TABLES, ALL_FUNCTIONS, INSERT_LEAVE_BALANCE, INSERT_SAMPLE_EMPLOYEE
 
 
 def create_tables():
@@ -23,20 +35,56 @@ def create_tables():
     return True
 
 
-def create_indexes():
-    """Create database indexes"""
-    print("\nCreating indexes...")
+def create_functions():
+    """Create server-side functions (e.g. the atomic leave confirmation)"""
+    print("\nCreating functions...")
     
-    for index_sql in CREATE_INDEXES:
+    for function_sql in ALL_FUNCTIONS:
         try:
-            execute_query(index_sql)
-            print("✓ Index created successfully")
+            execute_query(function_sql)
+            print("✓ Function created successfully")
         except Exception as e:
-            print(f"⚠ Warning creating index: {e}")
+            print(f"✗ Error creating function: {e}")
+            return False
+    
+    return True
+
+
+def run_migrations(dry_run=False):
+    """Apply pending schema migrations (indexes are built without blocking writes)"""
+    runner = MigrationRunner()
+    
+    if dry_run:
+        plan = runner.plan()
+        if not plan:
+            print("✓ Schema is up to date")
+        for version, name, step in plan:
+            print(f"{version:04d} {name}: {step}")
+        return True
+    
+    print("\nApplying migrations...")
+    try:
+        applied = runner.migrate()
+    except Exception as e:
+        print(f"✗ Migration failed: {e}")
+        print("  Fix the cause and re-run; completed steps are not repeated.")
+        return False
+    
+    if not applied:
+        print("✓ Schema is up to date")
     
+    created = LedgerPartitionManager().ensure()
+    if created:
+        print(f"✓ Ledger partitions ready: {', '.join(created)}")
     return True
 
 
+def show_migration_status():
+    """Print every known migration and whether it has been applied"""
+    for version, name, state in MigrationRunner().status():
+        print(f"{version:04d} {name:<40} {state}")
+
+
 def insert_sample_data():
     """Insert sample employees and leave balances"""
     print("\nInserting sample data...")
@@ -96,6 +144,56 @@ def insert_sample_data():
     return True
 
 
+def import_data(employees_path=None, balances_path=None, rejects_path=None):
+    """
+    Bulk-load employees and/or leave balances from CSV or JSONL files
+    (COPY into staging tables, then one upsert transaction)
+    """
+    print("\nImporting data...")
+    
+    try:
+        report = BulkImporter().run(employees_path, balances_path, rejects_path)
+    except Exception as e:
+        print(f"✗ Import failed, nothing was loaded: {e}")
+        return False
+    
+    for source in ('employees', 'balances'):
+        counts = report[source]
+        if counts:
+            print(f"✓ {source}: {counts['staged']} row(s) read, {counts['upserted']} loaded, "
+                  f"{counts['rejected']} rejected")
+    
+    for source, row_number, employee_id, reason in report['rejects']:
+        print(f"  ⚠ {source} row {row_number} ({employee_id or '-'}): {reason}")
+    if rejects_path:
+        print(f"  All rejected rows written to {rejects_path}")
+    
+    return True
+
+
+def generate_data(employees, years, seed, end_year=None, output_dir=None):
+    """
+    Generate a seeded synthetic dataset (employees, leave requests, ledger and
+    balances) and bulk-load it, or write it as CSV files to output_dir
+    """
+    generator = SyntheticDataGenerator(employees=employees, years=years, seed=seed, end_year=end_year)
+    
+    if output_dir:
+        print(f"\nWriting synthetic data to {output_dir}...")
+        counts = generator.write_files(output_dir)
+    else:
+        print("\nLoading synthetic data...")
+        try:
+            counts = generator.load()
+        except Exception as e:
+            print(f"✗ Load failed, nothing was loaded: {e}")
+            return False
+    
+    for table, count in counts.items():
+        print(f"✓ {table}: {count} row(s)")
+    return True
+
+
 def verify_setup():
     """Verify database setup"""
     print("\nVerifying setup...")
@@ -130,8 +228,15 @@ def main():
             print("\n❌ Failed to create tables. Please check your database connection.")
             return
         
-        # Create indexes
-        create_indexes()
+        # Create functions
+        if not create_functions():
+            print("\n❌ Failed to create functions.")
+            return
+        
+        # Apply migrations (indexes, later schema changes)
+        if not run_migrations():
+            print("\n❌ Failed to apply migrations.")
+            return
         
         # Insert sample data
         insert_sample_data()
@@ -163,5 +268,46 @@ def main():
         db.close_all_connections()
 
 
+def cli():
+    """Parse the command line and run the requested command"""
+    parser = argparse.ArgumentParser(description="Leave Management AI database setup")
+    subcommands = parser.add_subparsers(dest='command')
+    migrate_parser = subcommands.add_parser('migrate', help='apply pending schema migrations')
+    migrate_parser.add_argument('--dry-run', action='store_true', help='print the plan without applying it')
+    subcommands.add_parser('status', help='list migrations and their state')
+    import_parser = subcommands.add_parser('import', help='bulk-load employees and balances (CSV or JSONL)')
+    import_parser.add_argument('--employees', help='file with employee_id, name, email, department, join_date')
+    import_parser.add_argument('--balances', help='file with employee_id, leave_type, balance')
+    import_parser.add_argument('--rejects', help='write every rejected row to this CSV file')
+    generate_parser = subcommands.add_parser('generate', help='generate a seeded synthetic dataset')
+    generate_parser.add_argument('--employees', type=int, default=10000)
+    generate_parser.add_argument('--years', type=int, default=3)
+    generate_parser.add_argument('--seed', type=int, default=42)
+    generate_parser.add_argument('--end-year', type=int, help='last year of history (default: this year)')
+    generate_parser.add_argument('--output-dir', help='write CSV files here instead of loading the database')
+    args = parser.parse_args()
+    
+    if args.command == 'import' and not (args.employees or args.balances):
+        parser.error("import needs --employees and/or --balances")
+    
+    if args.command is None:
+        main()
+        return
+    
+    try:
+        if args.command == 'migrate':
+            run_migrations(dry_run=args.dry_run)
+        elif args.command == 'status':
+            show_migration_status()
+        elif args.command == 'import':
+            import_data(args.employees, args.balances, args.rejects)
+        elif args.command == 'generate':
+            generate_data(args.employees, args.years, args.seed, args.end_year, args.output_dir)
+    finally:
+        # Writing files never opens the pool; don't create one just to close it
+        if DatabaseConnection._instance is not None:
+            DatabaseConnection().close_all_connections()
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    cli()
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Train and evaluate the hashed n-gram intent model
+Select it with NLP_CONFIG['intent_backend'] = 'ngram'
+
+    python train_intent_model.py train [--data FILE] [--output models/intent_ngram.npz]
+    python train_intent_model.py evaluate [--model models/intent_ngram.npz]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks.corpus import CORPUS
+from leave_management_ai.config.settings import NLP_CONFIG
+from leave_management_ai.nlp.intent_classifier import IntentClassifier
+from leave_management_ai.nlp.ngram_model import (
+    DEFAULT_DIMENSIONS, NgramIntentClassifier, NgramIntentModel, read_utterances
+)
+
+
+DEFAULT_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'leave_management_ai', 'nlp', 'data', 'intent_utterances.jsonl')
+
+
+def train(data_path, output_path, dimensions, epochs):
+    """Fit the model on a labelled JSONL file and save it"""
+    texts, intents = read_utterances(data_path)
+    started = time.perf_counter()
+    model = NgramIntentModel.fit(texts, intents, dimensions=dimensions, epochs=epochs)
+    elapsed = time.perf_counter() - started
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    model.save(output_path)
+    accuracy = np.mean([label == intent for label, intent in
+                        zip(NgramIntentClassifier(model=model).classify_many(texts), intents)])
+    print(f"✓ Trained on {len(texts)} utterances, {len(model.labels)} intents in {elapsed:.1f}s "
+          f"(training accuracy {accuracy:.1%}, temperature {model.temperature})")
+    print(f"✓ Saved to {output_path} ({os.path.getsize(output_path) / 1024:.0f} KB)")
+
+
+def expected_calibration_error(confidences, correct, bins=10):
+    """Average gap between confidence and accuracy, weighted by bin size"""
+    confidences, correct = np.asarray(confidences), np.asarray(correct, dtype=float)
+    edges = np.linspace(0, 1, bins + 1)
+    error = 0.0
+    for lower, upper in zip(edges[:-1], edges[1:]):
+        in_bin = (confidences > lower) & (confidences <= upper)
+        if in_bin.any():
+            error += in_bin.mean() * abs(confidences[in_bin].mean() - correct[in_bin].mean())
+    return error
+
+
+def evaluate(model_path):
+    """Score the model on the benchmark corpus, next to the regex classifier"""
+    started = time.perf_counter()
+    classifier = NgramIntentClassifier(model_path)
+    load_ms = (time.perf_counter() - started) * 1000
+
+    labelled = [entry for entry in CORPUS if entry['intent']]
+    texts = [entry['text'] for entry in labelled]
+    expected = [entry['intent'] for entry in labelled]
+
+    predictions = classifier.classify_many(texts, with_confidence=True)
+    regex = IntentClassifier().classify_many(texts)
+    correct = [intent == truth for (intent, _), truth in zip(predictions, expected)]
+
+    probabilities = classifier.model.predict_proba(texts)
+    top_confidence = probabilities.max(axis=1)
+    top_correct = [classifier.model.labels[label] == truth
+                   for label, truth in zip(probabilities.argmax(axis=1), expected)]
+
+    batch = [entry['text'] for entry in CORPUS] * 100
+    started = time.perf_counter()
+    classifier.classify_many(batch)
+    batch_seconds = time.perf_counter() - started
+
+    print(f"Model loaded in {load_ms:.1f} ms ({len(classifier.model.labels)} intents, "
+          f"{classifier.model.dimensions} buckets)")
+    print(f"Accuracy on the benchmark corpus: {np.mean(correct):.1%} "
+          f"(regex classifier: {np.mean([r == t for r, t in zip(regex, expected)]):.1%})")
+    print(f"Expected calibration error: {expected_calibration_error(top_confidence, top_correct):.3f}; "
+          f"threshold {classifier.threshold}")
+    print(f"Batch inference: {len(batch)} messages in {batch_seconds * 1000:.0f} ms "
+          f"({len(batch) / batch_seconds:.0f}/s)")
+    for (intent, confidence), truth, text in zip(predictions, expected, texts):
+        if intent != truth:
+            print(f"  ✗ {text[:50]!r}: {intent} ({confidence:.2f}), expected {truth}")
+
+
+def main():
+    """Parse the command line and run the requested command"""
+    parser = argparse.ArgumentParser(description="Hashed n-gram intent model")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    train_parser = subcommands.add_parser('train', help='train on labelled utterances and save the model')
+    train_parser.add_argument('--data', default=DEFAULT_DATA, help='JSONL with text and intent fields')
+    train_parser.add_argument('--output', default=NLP_CONFIG['intent_model_path'])
+    train_parser.add_argument('--dimensions', type=int, default=DEFAULT_DIMENSIONS, help='hash buckets')
+    train_parser.add_argument('--epochs', type=int, default=300)
+
+    evaluate_parser = subcommands.add_parser('evaluate', help='score the model on the benchmark corpus')
+    evaluate_parser.add_argument('--model', default=NLP_CONFIG['intent_model_path'])
+
+    args = parser.parse_args()
+    if args.command == 'train':
+        train(args.data, args.output, args.dimensions, args.epochs)
+    elif args.command == 'evaluate':
+        evaluate(args.model)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,10 @@
 Generate user-friendly responses
 """
 from leave_management_ai.config.settings import RESPONSE_TEMPLATES
+from leave_management_ai.tracing import traced_methods
 
 
+@traced_methods('render')
 class ResponseGenerator:
     """Generate formatted responses for users"""
     
@@ -28,24 +30,33 @@ class ResponseGenerator:
     @staticmethod
     def generate_history_response(history_data):
         """Generate response for leave history"""
-        if not history_data['history']:
-            return "📋 No leave history found.\n\nYou haven't taken any leaves yet."
-        
-        response = (
-            f"📋 Your Leave History:\n"
-            f"{'━' * 70}\n\n"
-        )
-        
-        for i, req in enumerate(history_data['history'], 1):
+        response = ''.join(ResponseGenerator.iter_history_response(history_data['history']))
+        if history_data.get('next_cursor'):
+            response += "\n\nShowing your most recent leaves. Older leaves are available on the next page."
+        return response
+    
+    @staticmethod
+    def iter_history_response(entries):
+        """
+        Yield the leave history response chunk by chunk, for printing or
+        sending a long history as it is read (e.g. from stream_leave_history)
+        """
+        count = 0
+        for req in entries:
+            count += 1
+            if count == 1:
+                yield f"📋 Your Leave History:\n{'━' * 70}\n\n"
             status_emoji = "✅" if req['status'] == 'approved' else "⏳"
-            response += (
-                f"{i}. {status_emoji} {req['leave_type']}\n"
+            yield (
+                f"{count}. {status_emoji} {req['leave_type']}\n"
                 f"   📅 {req['start_date']} → {req['end_date']} ({req['days']} days)\n"
                 f"   🕐 Requested on {req['requested_at']}\n\n"
             )
         
-        response += f"{'━' * 70}"
-        return response.strip()
+        if count == 0:
+            yield "📋 No leave history found.\n\nYou haven't taken any leaves yet."
+        else:
+            yield f"{'━' * 70}"
     
     @staticmethod
     def generate_error_response(error_message):
@@ -85,6 +96,11 @@ class ResponseGenerator:
         """Generate weekend eligibility response"""
         return RESPONSE_TEMPLATES['eligibility_no_weekend'].format(**eligibility_data)
     
+    @staticmethod
+    def generate_eligibility_no_holiday_response(eligibility_data):
+        """Generate public holiday eligibility response"""
+        return RESPONSE_TEMPLATES['eligibility_no_holiday'].format(**eligibility_data)
+    
     @staticmethod
     def generate_eligibility_no_balance_response(eligibility_data):
         """Generate insufficient balance eligibility response"""